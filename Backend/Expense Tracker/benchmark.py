@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Expense Tracker.
+
+``add`` builds synthetic stores of growing size for each storage engine and
+times adding one expense the way the CLI does: open the tracker, add, close.
+With the JSON store the cost grows with the file; with SQLite and the
+partitioned store it stays flat.
+
+``render`` times listing output written to the null device: the old
+print-per-row table against the buffered renderer in every list format.
+
+Examples:
+  python benchmark.py add
+  python benchmark.py add --sizes 1k,10k,100k --storage json,sqlite --ops 20
+  python benchmark.py render --rows 200k
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+from expense_tracker import (STORAGE_BACKENDS, TABLE_FORMATS, SqliteExpenseTracker, display_expenses,
+                             format_currency, from_minor_units, make_tracker)
+
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+CATEGORIES = ["Food", "Rent", "Transport", "Fun", "Health", "General"]
+
+
+def make_expense_dicts(count: int) -> List[Dict]:
+    """Generate ``count`` expenses in the JSON layout written by expense_tracker.py."""
+    rng = random.Random(count)
+    start = date(2020, 1, 1)
+    return [{
+        'id': i,
+        'description': f"Synthetic expense {i}",
+        'amount_cents': rng.randint(100, 20000),
+        'currency': 'USD',
+        'category': rng.choice(CATEGORIES),
+        'date': (start + timedelta(days=i * 1500 // count)).isoformat()
+    } for i in range(1, count + 1)]
+
+
+def parse_size(value: str) -> int:
+    """Parse '1k', '100k' or '1m' into an expense count."""
+    value = value.strip().lower()
+    if value and value[-1] in SIZE_SUFFIXES:
+        return int(float(value[:-1]) * SIZE_SUFFIXES[value[-1]])
+    return int(value)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def build_store(directory: str, count: int, storage: str) -> str:
+    """Write a synthetic store of ``count`` expenses into ``directory``; returns the data file."""
+    data_file = os.path.join(directory, "expenses.json")
+    with open(data_file, 'w', encoding='utf-8') as file:
+        json.dump(make_expense_dicts(count), file, indent=2)
+    if storage == "json":
+        make_tracker(data_file, storage).rebuild_rollups()
+        return data_file
+    tracker = make_tracker(data_file, storage)
+    tracker.import_json(data_file)
+    if isinstance(tracker, SqliteExpenseTracker):
+        tracker.conn.close()
+    os.remove(data_file)
+    return data_file
+
+
+def bench_add(count: int, storage: str, ops: int) -> Dict:
+    """Time ``ops`` open-add-close cycles against a store of ``count`` expenses."""
+    directory = tempfile.mkdtemp(prefix="expense-bench-")
+    try:
+        data_file = build_store(directory, count, storage)
+        samples = []
+        for i in range(ops):
+            start = time.perf_counter()
+            tracker = make_tracker(data_file, storage)
+            tracker.add_expense(f"Benchmark expense {i}", 12.5, "Food")
+            tracker.flush()
+            samples.append(time.perf_counter() - start)
+        return {
+            "p50_ms": round(percentile(samples, 50) * 1000, 3),
+            "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def print_per_row(expenses: List[Dict]) -> None:
+    """The table as display_expenses printed it before buffered rendering."""
+    print(f"{'ID':<4} {'Date':<12} {'Description':<20} {'Amount':<10} {'Category':<15}")
+    print("-" * 70)
+    for expense in expenses:
+        print(f"{expense['id']:<4} {expense['date']:<12} "
+              f"{expense['description'][:18]:<20} "
+              f"{format_currency(from_minor_units(expense['amount_cents'], expense['currency']), expense['currency']):<10} "
+              f"{expense['category'][:13]:<15}")
+
+
+def bench_render(count: int) -> Dict[str, float]:
+    """Seconds to list ``count`` expenses to the null device, per renderer."""
+    expenses = make_expense_dicts(count)
+    results = {}
+    with open(os.devnull, 'w', encoding='utf-8') as sink:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(sink):
+            print_per_row(expenses)
+        results["print per row"] = time.perf_counter() - start
+        for fmt in TABLE_FORMATS:
+            start = time.perf_counter()
+            display_expenses(expenses, fmt, sink)
+            results[fmt] = time.perf_counter() - start
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Expense Tracker benchmarks")
+    subparsers = parser.add_subparsers(dest="command")
+
+    add_parser = subparsers.add_parser("add", help="Time add_expense as the store grows")
+    add_parser.add_argument("--sizes", default="1k,10k,100k", help="Comma-separated store sizes (e.g. 1k,100k)")
+    add_parser.add_argument("--storage", default=",".join(STORAGE_BACKENDS),
+                            help="Comma-separated storage engines")
+    add_parser.add_argument("--ops", type=int, default=20, help="Adds timed per measurement")
+    
+    render_parser = subparsers.add_parser("render", help="Time list output per format")
+    render_parser.add_argument("--rows", default="200k", help="Expenses to list (e.g. 200k)")
+
+    args = parser.parse_args()
+    if args.command == "add":
+        engines = [engine.strip() for engine in args.storage.split(",")]
+        unknown = [engine for engine in engines if engine not in STORAGE_BACKENDS]
+        if unknown:
+            parser.error(f"unknown storage engine(s): {', '.join(unknown)}")
+        print(f"{'storage':<12} {'expenses':>10} {'p50 ms':>10} {'p99 ms':>10}")
+        for engine in engines:
+            for size in (parse_size(size) for size in args.sizes.split(",")):
+                result = bench_add(size, engine, args.ops)
+                print(f"{engine:<12} {size:>10} {result['p50_ms']:>10.3f} {result['p99_ms']:>10.3f}")
+    elif args.command == "render":
+        count = parse_size(args.rows)
+        results = bench_render(count)
+        baseline = results["print per row"]
+        print(f"{'renderer':<14} {'rows':>10} {'seconds':>10} {'rows/s':>12} {'speedup':>8}")
+        for name, seconds in results.items():
+            print(f"{name:<14} {count:>10} {seconds:>10.3f} {count / seconds:>12,.0f} {baseline / seconds:>7.1f}x")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
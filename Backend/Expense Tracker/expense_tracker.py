@@ -6,32 +6,686 @@ Expense Tracker - A simple command-line application to manage personal finances.
 import argparse
 import json
 import csv
+import glob
+import gzip
+import io
 import os
-from datetime import datetime, date
-from typing import Dict, List, Optional
+import sqlite3
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import sys
 
+from shared.durability import GroupCommitter, atomic_write
+from shared.rendering import TABLE_FORMATS, render_records, render_rows, tsv_cell, write_chunked
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; summaries fall back to plain Python
+    np = None
+
+SUMMARY_ENGINES = ('auto', 'rollup', 'python', 'numpy')
+EXPORT_FORMATS = ('csv', 'ndjson')
+EXPENSE_HEADERS = ('ID', 'Date', 'Description', 'Amount', 'Category')
+EXPENSE_WIDTHS = (4, 12, 20, 10, 15)
+CSV_FIELDS = ['ID', 'Date', 'Description', 'Amount', 'Currency', 'Category']
+DEFAULT_CURRENCY = 'USD'
+# Digits after the decimal point in each currency's minor unit (ISO 4217); others use 2
+MINOR_UNITS = {'BHD': 3, 'JPY': 0, 'KRW': 0, 'KWD': 3, 'VND': 0}
+CURRENCY_SYMBOLS = {'USD': '$', 'EUR': '€', 'GBP': '£', 'INR': '₹', 'JPY': '¥'}
+
+
+def to_minor_units(amount, currency: str = DEFAULT_CURRENCY, exact: bool = True) -> int:
+    """Convert an amount in major units (``"12.34"``, ``12.34`` or a Decimal) to integer minor units.
+    
+    With ``exact`` an amount finer than the currency's minor unit is rejected;
+    otherwise it is rounded half up (used when converting legacy float files).
+    """
+    try:
+        value = Decimal(str(amount).strip())
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount '{amount}'")
+    if not value.is_finite():
+        raise ValueError(f"Invalid amount '{amount}'")
+    places = MINOR_UNITS.get(currency, 2)
+    scaled = value.scaleb(places)
+    minor = scaled.to_integral_value(rounding=ROUND_HALF_UP)
+    if exact and minor != scaled:
+        raise ValueError(f"Amount {amount} has more than {places} decimal places")
+    return int(minor)
+
+
+def from_minor_units(minor: int, currency: str = DEFAULT_CURRENCY) -> Decimal:
+    """Convert integer minor units back to an exact Decimal amount in major units."""
+    return Decimal(minor).scaleb(-MINOR_UNITS.get(currency, 2))
+
+
+def upgrade_expense(expense: Dict) -> Dict:
+    """Return ``expense`` with its amount in integer minor units.
+    
+    Records written before amounts were stored as ``amount_cents`` carry a float
+    ``amount``; it is converted by its decimal representation, rounding half up.
+    """
+    if 'amount_cents' in expense:
+        return expense
+    currency = expense.get('currency', DEFAULT_CURRENCY)
+    upgraded = {}
+    for key, value in expense.items():
+        if key == 'amount':
+            upgraded['amount_cents'] = to_minor_units(value, currency, exact=False)
+            upgraded['currency'] = currency
+        elif key != 'currency':
+            upgraded[key] = value
+    return upgraded
+
+
+class ExpenseColumns:
+    """Columnar copy of the expenses for vectorized summaries (requires NumPy).
+    
+    Amounts are an int64 array of minor units, dates are day ordinals and
+    categories are dictionary-encoded as int codes into ``self.categories``.
+    """
+    
+    def __init__(self, expenses: List[Dict]):
+        count = len(expenses)
+        self.amounts = np.fromiter((exp['amount_cents'] for exp in expenses), dtype=np.int64, count=count)
+        self.days = np.fromiter((datetime.fromisoformat(exp['date']).toordinal() for exp in expenses),
+                                dtype=np.int64, count=count)
+        self.categories: List[str] = []
+        codes_by_name: Dict[str, int] = {}
+        codes = []
+        for exp in expenses:
+            code = codes_by_name.get(exp['category'])
+            if code is None:
+                code = codes_by_name[exp['category']] = len(self.categories)
+                self.categories.append(exp['category'])
+            codes.append(code)
+        self.codes = np.array(codes, dtype=np.int64)
+    
+    def summarize(self, first_day: Optional[int] = None, last_day: Optional[int] = None) -> Tuple:
+        """Return (total, count, category_totals) in minor units for expenses between two day ordinals."""
+        amounts, codes = self.amounts, self.codes
+        if first_day is not None or last_day is not None:
+            mask = np.ones(len(amounts), dtype=bool)
+            if first_day is not None:
+                mask &= self.days >= first_day
+            if last_day is not None:
+                mask &= self.days <= last_day
+            amounts, codes = amounts[mask], codes[mask]
+        if not len(amounts):
+            return 0, 0, {}
+        
+        # Integer reductions are exact, so results match the Python loop to the cent
+        total = int(amounts.sum())
+        sums = np.zeros(len(self.categories), dtype=np.int64)
+        np.add.at(sums, codes, amounts)
+        present, first_seen = np.unique(codes, return_index=True)
+        category_totals = {
+            self.categories[code]: int(sums[code])
+            for code in present[np.argsort(first_seen)]
+        }
+        return total, len(amounts), category_totals
+
+
+class ExpenseIndex:
+    """Sorted date index and category index over the expenses.
+    
+    ``dates`` is kept in step with ``rows`` (the expenses ordered by date), so a
+    date range is two bisects plus a slice: O(log N + k). Building the index
+    sorts every expense; after that ``add``, ``remove`` and ``recategorize``
+    keep it current, so a tracker that stays open never sorts again.
+    """
+    
+    def __init__(self, expenses: List[Dict]):
+        self.rows = sorted(expenses, key=lambda exp: exp['date'])
+        self.dates = [exp['date'] for exp in self.rows]
+        self.by_category: Dict[str, List[Dict]] = {}
+        for exp in expenses:
+            self.by_category.setdefault(exp['category'].lower(), []).append(exp)
+    
+    def between(self, first: Optional[str] = None, last: Optional[str] = None) -> List[Dict]:
+        """Expenses dated from ``first`` to ``last`` inclusive (ISO dates, either may be open)."""
+        lo = bisect_left(self.dates, first) if first is not None else 0
+        hi = bisect_right(self.dates, last) if last is not None else len(self.dates)
+        return self.rows[lo:hi]
+    
+    def category(self, name: str) -> List[Dict]:
+        """Expenses in category ``name`` (case-insensitive), in ID order."""
+        return self.by_category.get(name.lower(), [])
+    
+    def add(self, expense: Dict):
+        """Index a new expense, which has the highest ID so far."""
+        position = bisect_right(self.dates, expense['date'])
+        self.rows.insert(position, expense)
+        self.dates.insert(position, expense['date'])
+        self.by_category.setdefault(expense['category'].lower(), []).append(expense)
+    
+    def remove(self, expense: Dict):
+        """Drop an expense from both indexes."""
+        position = bisect_left(self.dates, expense['date'])
+        while self.rows[position] is not expense:
+            position += 1
+        del self.rows[position]
+        del self.dates[position]
+        self._drop_category(expense['category'], expense)
+    
+    def recategorize(self, expense: Dict, old_category: str):
+        """Move an expense whose category changed from ``old_category``."""
+        if old_category.lower() == expense['category'].lower():
+            return
+        self._drop_category(old_category, expense)
+        members = self.by_category.setdefault(expense['category'].lower(), [])
+        ids = [member['id'] for member in members]
+        members.insert(bisect_left(ids, expense['id']), expense)
+    
+    def _drop_category(self, category: str, expense: Dict):
+        members = self.by_category[category.lower()]
+        members.remove(expense)
+        if not members:
+            del self.by_category[category.lower()]
+
+
+def _period_bounds(year: int, month: Optional[int] = None) -> Tuple[date, date]:
+    """First and last day of a calendar month, or of the whole year when ``month`` is None."""
+    if month is None:
+        return date(year, 1, 1), date(year, 12, 31)
+    following = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return date(year, month, 1), following - timedelta(days=1)
+
+
+def _whole_months(start: date, end: date) -> Optional[List[str]]:
+    """The ``YYYY-MM`` keys covering ``start``..``end`` if it spans whole months, else None."""
+    if start.day != 1 or (end + timedelta(days=1)).day != 1 or start > end:
+        return None
+    keys = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        keys.append(f"{year}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return keys
+
+
+def _aggregate(expenses: List[Dict]) -> Tuple[int, int, Dict[str, int]]:
+    """Return ``(total, count, category_totals)`` in minor units over raw expense rows."""
+    total = sum(exp['amount_cents'] for exp in expenses)
+    category_totals = {}
+    for exp in expenses:
+        cat = exp['category']
+        category_totals[cat] = category_totals.get(cat, 0) + exp['amount_cents']
+    return total, len(expenses), category_totals
+
+
+def iter_json_array(path: str, chunk_size: int = 1 << 16) -> Iterator[Dict]:
+    """Yield the objects of a top-level JSON array one at a time.
+    
+    The file is read in ``chunk_size`` pieces, so memory stays bounded by the
+    largest single object rather than the size of the file.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r') as f:
+        buffer, pos = '', 0
+        while True:
+            chunk = f.read(chunk_size)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n,[]':
+                    pos += 1
+                if pos == len(buffer):
+                    break
+                try:
+                    item, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if not chunk:
+                        raise
+                    break  # the object continues in the next chunk
+                yield item
+            if not chunk:
+                return
+
+
+@contextmanager
+def open_stream(path: str, mode: str, compress: bool = False):
+    """Open ``path`` for text reading or writing; ``-`` means stdin/stdout, ``compress`` adds gzip."""
+    if path == '-':
+        raw = sys.stdin.buffer if mode == 'r' else sys.stdout.buffer
+        if compress:
+            raw = gzip.GzipFile(fileobj=raw, mode=mode + 'b')
+        stream = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+        try:
+            yield stream
+        finally:
+            stream.detach()  # flushes, but leaves the process's stdin/stdout open
+            if compress:
+                raw.close()  # writes the gzip trailer; the underlying stream stays open
+        return
+    if compress:
+        stream = gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    else:
+        stream = open(path, mode, encoding='utf-8', newline='')
+    with stream:
+        yield stream
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> Tuple[str, bool]:
+    """Return ``(format, gzipped)`` for ``path``, from its extension unless ``fmt`` is given."""
+    name = path.lower()
+    compress = name.endswith('.gz')
+    if compress:
+        name = name[:-3]
+    if fmt is None:
+        fmt = 'ndjson' if name.endswith(('.ndjson', '.jsonl')) else 'csv'
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format must be one of: {', '.join(EXPORT_FORMATS)}")
+    return fmt, compress
+
+
+def write_expenses(stream, expenses: Iterable[Dict], fmt: str) -> int:
+    """Write expenses to ``stream`` one record at a time; returns how many were written."""
+    count = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for expense in expenses:
+            writer.writerow({
+                'ID': expense['id'],
+                'Date': expense['date'],
+                'Description': expense['description'],
+                'Amount': from_minor_units(expense['amount_cents'], expense['currency']),
+                'Currency': expense['currency'],
+                'Category': expense['category']
+            })
+            count += 1
+    else:
+        for expense in expenses:
+            stream.write(json.dumps(expense, default=str))
+            stream.write('\n')
+            count += 1
+    return count
+
+
+def read_records(stream, fmt: str) -> Iterator[Tuple[int, Dict]]:
+    """Yield ``(line_number, record)`` pairs with lowercased keys from a CSV or NDJSON stream."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {str(key).strip().lower(): value for key, value in row.items()}
+        return
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, {'_error': f"invalid JSON ({e.msg})"}
+            continue
+        if not isinstance(record, dict):
+            yield line_number, {'_error': "expected a JSON object"}
+            continue
+        yield line_number, {str(key).lower(): value for key, value in record.items()}
+
+
+def validate_record(record: Dict, currency: str = DEFAULT_CURRENCY) -> Dict:
+    """Check a record imported into a ``currency`` ledger and return its expense fields.
+    
+    Raises ValueError when the record is invalid or in another currency.
+    """
+    if '_error' in record:
+        raise ValueError(record['_error'])
+    description = str(record.get('description') or '').strip()
+    if not description:
+        raise ValueError("missing description")
+    record_currency = str(record.get('currency') or currency).strip().upper()
+    if record_currency != currency:
+        raise ValueError(f"currency {record_currency} does not match the ledger's {currency}")
+    if record.get('amount_cents') not in (None, ''):
+        try:
+            amount_cents = int(record['amount_cents'])
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid amount_cents {record['amount_cents']!r}")
+    else:
+        try:
+            amount_cents = to_minor_units(record.get('amount'), currency)
+        except ValueError:
+            raise ValueError(f"invalid amount {record.get('amount')!r}")
+    if amount_cents <= 0:
+        raise ValueError("amount must be positive")
+    category = str(record.get('category') or '').strip() or 'General'
+    raw_date = str(record.get('date') or '').strip()
+    try:
+        expense_date = date.fromisoformat(raw_date[:10]) if raw_date else date.today()
+    except ValueError:
+        raise ValueError(f"invalid date {raw_date!r}")
+    return {
+        'description': description,
+        'amount_cents': amount_cents,
+        'currency': currency,
+        'category': category,
+        'date': expense_date.isoformat()
+    }
+
+
+def _file_signature(path: str) -> Optional[List[int]]:
+    """Size and mtime of ``path``, used to tell whether derived files are stale."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class ExpenseRollups:
+    """Materialized ``"YYYY-MM" -> category -> [sum, count]`` totals (sums in minor units).
+    
+    The rollups are persisted next to the expenses file together with the
+    signature of the expenses file they describe, so a stale or missing
+    rollup file is detected on load and rebuilt from the raw rows.
+    """
+    
+    VERSION = 3  # version 1 held float sums; version 2 was built without checking currencies
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.months: Dict[str, Dict[str, List]] = {}
+        self.ready = False
+    
+    def load(self, source: Optional[List[int]]) -> bool:
+        """Load persisted rollups; returns whether they match ``source``."""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        if not isinstance(data, dict) or data.get('version') != self.VERSION or data.get('source') != source:
+            return False
+        self.months = data.get('months', {})
+        self.ready = True
+        return True
+    
+    def save(self, source: Optional[List[int]]):
+        """Persist the rollups, tagged with the signature of the expenses file."""
+        atomic_write(self.path, json.dumps({'version': self.VERSION, 'source': source, 'months': self.months}))
+    
+    def rebuild(self, expenses: List[Dict]):
+        """Recompute every rollup from the raw expenses."""
+        self.months = {}
+        for expense in expenses:
+            self.add(expense)
+        self.ready = True
+    
+    def add(self, expense: Dict, sign: int = 1):
+        """Fold one expense into its month/category cell (``sign=-1`` takes it out)."""
+        month = self.months.setdefault(expense['date'][:7], {})
+        cell = month.setdefault(expense['category'], [0, 0])
+        cell[0] += sign * expense['amount_cents']
+        cell[1] += sign
+        if cell[1] <= 0:
+            del month[expense['category']]
+            if not month:
+                del self.months[expense['date'][:7]]
+    
+    def remove(self, expense: Dict):
+        """Take one expense back out of the rollups."""
+        self.add(expense, -1)
+    
+    def summarize(self, month_keys: Optional[List[str]] = None) -> Tuple[int, int, Dict[str, int]]:
+        """Return ``(total, count, category_totals)`` for the given months, or for all months."""
+        if month_keys is not None:
+            months = [self.months[key] for key in month_keys if key in self.months]
+        else:
+            months = self.months.values()
+        total, count, category_totals = 0, 0, {}
+        for month in months:
+            for category, (amount, items) in month.items():
+                total += amount
+                count += items
+                category_totals[category] = category_totals.get(category, 0) + amount
+        return total, count, category_totals
+
+
+def _shift_month(month_key: str, months: int) -> str:
+    """Move a ``YYYY-MM`` key by ``months`` (negative for earlier months)."""
+    index = int(month_key[:4]) * 12 + int(month_key[5:7]) - 1 + months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+class ExpenseBudgets:
+    """Monthly budgets per category and the spending spike rule.
+    
+    Limits are kept in minor units, keyed by lowercased category, in a small
+    JSON file next to the expenses file. A spike is a month whose spending in
+    a category exceeds ``spike_factor`` times the average of the previous
+    ``spike_months`` months; a factor of 0 turns spike alerts off.
+    """
+    
+    WARN_RATIO = 0.8  # warn once a budget is 80% used
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.limits: Dict[str, Tuple[str, int]] = {}  # lowercased category -> (name, limit)
+        self.spike_factor = 2.0
+        self.spike_months = 3
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        self.limits = {name.lower(): (name, limit) for name, limit in data.get('limits', {}).items()}
+        spike = data.get('spike', {})
+        self.spike_factor = spike.get('factor', self.spike_factor)
+        self.spike_months = spike.get('months', self.spike_months)
+    
+    def save(self):
+        atomic_write(self.path, json.dumps({
+            'limits': {name: limit for name, limit in self.limits.values()},
+            'spike': {'factor': self.spike_factor, 'months': self.spike_months}
+        }, indent=2))
+    
+    def limit(self, category: str) -> Optional[int]:
+        entry = self.limits.get(category.lower())
+        return entry[1] if entry else None
+    
+    def evaluate(self, category: str, month_key: str, added: int,
+                 month_total: Callable[[str, str], int]) -> List[Tuple[str, int, int]]:
+        """Return the rules crossed by adding ``added`` minor units to one month/category.
+        
+        ``month_total(month_key, category)`` must already include the change.
+        Each alert is ``(kind, spent, reference)`` with kind ``'budget'`` or
+        ``'warning'`` (reference: the limit) or ``'spike'`` (reference: the
+        trailing monthly average). Only crossings are reported, so a budget
+        that is already exceeded does not alert again on every write. The cost
+        is ``spike_months + 1`` total lookups, whatever the size of the store.
+        """
+        if added <= 0:
+            return []
+        spent = month_total(month_key, category)
+        before = spent - added
+        alerts = []
+        limit = self.limit(category)
+        if limit is not None:
+            warn_at = limit * self.WARN_RATIO
+            if before <= limit < spent:
+                alerts.append(('budget', spent, limit))
+            elif before < warn_at <= spent <= limit:
+                alerts.append(('warning', spent, limit))
+        if self.spike_factor > 0 and self.spike_months > 0:
+            history = sum(month_total(_shift_month(month_key, -offset), category)
+                          for offset in range(1, self.spike_months + 1))
+            threshold = history * self.spike_factor / self.spike_months
+            if history > 0 and before <= threshold < spent:
+                alerts.append(('spike', spent, history // self.spike_months))
+        return alerts
+
 
 class ExpenseTracker:
-    def __init__(self, data_file: str = "expenses.json"):
+    def __init__(self, data_file: str = "expenses.json", commit_window: Optional[float] = None,
+                 engine: str = 'auto', currency: Optional[str] = None, read_only: bool = False):
+        """Open the ledger stored in ``data_file``.
+        
+        A ``read_only`` tracker is for reports over ledgers it does not own:
+        an unreadable file raises ValueError instead of reading as empty,
+        and rollups rebuilt for a summary are not written back to disk.
+        """
+        if engine not in SUMMARY_ENGINES:
+            raise ValueError(f"Engine must be one of: {', '.join(SUMMARY_ENGINES)}")
+        if engine == 'numpy' and np is None:
+            raise ValueError("The numpy engine requires NumPy (pip install numpy)")
         self.data_file = data_file
-        self.expenses = self.load_expenses()
-        self.next_id = self._get_next_id()
+        self.read_only = read_only
+        if commit_window is None:
+            commit_window = float(os.environ.get("EXPENSE_FSYNC_WINDOW", "0"))
+        self.committer = GroupCommitter(commit_window)
+        self.engine = engine
+        self._requested_currency = currency.upper() if currency else None
+        self._currency: Optional[str] = None
+        self._columns: Optional[ExpenseColumns] = None
+        self._index: Optional[ExpenseIndex] = None
+        self._queried = False
+        self._expenses: Optional[List[Dict]] = None
+        self._next_id: Optional[int] = None
+        self._rollups: Optional[ExpenseRollups] = None
+        self._budgets: Optional[ExpenseBudgets] = None
+        self.alerts: List[str] = []
+    
+    @property
+    def currency(self) -> str:
+        """The ledger's single currency.
+        
+        A ledger that holds expenses is in the currency of its first one; an
+        empty ledger uses the requested currency, else EXPENSE_CURRENCY, else
+        USD. Requesting a currency other than the stored one raises ValueError.
+        """
+        if self._currency is None:
+            stored = self._stored_currency()
+            requested = self._requested_currency
+            if stored is not None and requested is not None and stored != requested:
+                raise ValueError(f"{self.data_file} holds {stored} amounts, not {requested}")
+            self._currency = stored or requested or os.environ.get('EXPENSE_CURRENCY', DEFAULT_CURRENCY).upper()
+        return self._currency
+    
+    def _stored_currency(self) -> Optional[str]:
+        """Currency of the first stored expense, or None for an empty ledger."""
+        if self._expenses is not None:
+            return self._expenses[0]['currency'] if self._expenses else None
+        try:
+            first = next(iter_json_array(self.data_file), None)
+        except (OSError, ValueError):
+            return None
+        return upgrade_expense(first)['currency'] if first is not None else None
+    
+    def _check_currency(self, expense: Dict):
+        """Raise ValueError for an expense in another currency than the ledger's."""
+        if expense['currency'] != self.currency:
+            raise ValueError(f"Expense {expense['id']} is in {expense['currency']} but the ledger "
+                             f"is in {self.currency}; a ledger holds a single currency")
+    
+    def _same_currency(self, expenses: Iterable[Dict]) -> Iterator[Dict]:
+        """Yield expenses being copied into this ledger, checking their currency.
+        
+        Unless a currency was requested, an empty ledger takes on the currency
+        of the first expense copied into it.
+        """
+        for expense in expenses:
+            if self._currency is None and self._requested_currency is None and self._stored_currency() is None:
+                self._currency = expense['currency']
+            self._check_currency(expense)
+            yield expense
+    
+    @property
+    def expenses(self) -> List[Dict]:
+        """The raw expense rows, loaded on first use."""
+        if self._expenses is None:
+            self._expenses = self.load_expenses()
+        return self._expenses
+    
+    @property
+    def rollups(self) -> ExpenseRollups:
+        """The JSON ledger's persisted rollups, loaded on first use.
+        
+        The SQLite and partitioned stores keep their totals elsewhere and
+        never read this file.
+        """
+        if self._rollups is None:
+            self._rollups = ExpenseRollups(os.path.splitext(self.data_file)[0] + ".rollups.json")
+            self._rollups.load(_file_signature(self.data_file))
+        return self._rollups
+    
+    @property
+    def budgets(self) -> ExpenseBudgets:
+        """Budgets and the spike rule, loaded on the first write or budget command."""
+        if self._budgets is None:
+            self._budgets = ExpenseBudgets(os.path.splitext(self.data_file)[0] + ".budgets.json")
+        return self._budgets
+    
+    @property
+    def next_id(self) -> int:
+        if self._next_id is None:
+            self._next_id = self._get_next_id()
+        return self._next_id
+    
+    @next_id.setter
+    def next_id(self, value: int):
+        self._next_id = value
     
     def load_expenses(self) -> List[Dict]:
-        """Load expenses from JSON file."""
+        """Load expenses from JSON file, converting legacy float amounts to minor units."""
         if os.path.exists(self.data_file):
             try:
                 with open(self.data_file, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
+                    expenses = [upgrade_expense(expense) for expense in json.load(f)]
+            except (json.JSONDecodeError, FileNotFoundError) as e:
+                if self.read_only:
+                    raise ValueError(f"Cannot read {self.data_file}: {e}")
                 return []
+            currencies = {expense['currency'] for expense in expenses}
+            if len(currencies) > 1:
+                raise ValueError(f"{self.data_file} mixes currencies ({', '.join(sorted(currencies))}); "
+                                 f"a ledger holds a single currency")
+            return expenses
         return []
     
     def save_expenses(self):
-        """Save expenses to JSON file."""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.expenses, f, indent=2, default=str)
+        """Save expenses to JSON file.
+        
+        The file is replaced atomically, so a crash never leaves a truncated
+        store. With a commit window, saves within the window share one write.
+        """
+        self._columns = None
+        self.committer.submit(self.data_file, self._write_expenses)
+    
+    def _write_expenses(self):
+        """Atomically write the current expenses, then the rollups describing them."""
+        atomic_write(self.data_file, json.dumps(self.expenses, indent=2, default=str))
+        if self._rollups is not None and self._rollups.ready:
+            self.rollups.save(_file_signature(self.data_file))
+    
+    def _ensure_rollups(self) -> ExpenseRollups:
+        """Return up-to-date rollups, rebuilding them from the rows if they are stale."""
+        if not self.rollups.ready:
+            self.rebuild_rollups()
+        return self.rollups
+    
+    def rebuild_rollups(self) -> int:
+        """Recompute the rollups from the raw expenses and persist them.
+        
+        Returns the number of month/category cells written.
+        """
+        self.rollups.rebuild(self.expenses)
+        if not self.read_only:
+            self.rollups.save(_file_signature(self.data_file))
+        return sum(len(month) for month in self.rollups.months.values())
+    
+    def flush(self):
+        """Write out any save still waiting in the commit window."""
+        self.committer.flush()
+    
+    def compact(self) -> int:
+        raise ValueError("Only the partitioned store can be compacted")
     
     def _get_next_id(self) -> int:
         """Get the next available ID for expenses."""
@@ -39,41 +693,56 @@ class ExpenseTracker:
             return 1
         return max(expense['id'] for expense in self.expenses) + 1
     
-    def add_expense(self, description: str, amount: float, category: str = "General") -> int:
-        """Add a new expense."""
-        if amount <= 0:
+    def add_expense(self, description: str, amount, category: str = "General") -> int:
+        """Add a new expense; ``amount`` is in major units (e.g. ``"12.34"``)."""
+        amount_cents = to_minor_units(amount, self.currency)
+        if amount_cents <= 0:
             raise ValueError("Amount must be positive")
         
         expense = {
             'id': self.next_id,
             'description': description,
-            'amount': amount,
+            'amount_cents': amount_cents,
+            'currency': self.currency,
             'category': category,
             'date': date.today().isoformat()
         }
         
+        self._ensure_rollups().add(expense)
         self.expenses.append(expense)
+        if self._index is not None:
+            self._index.add(expense)
         self.next_id += 1
         self.save_expenses()
+        self._check_alerts(category, expense['date'][:7], amount_cents)
         return expense['id']
     
     def update_expense(self, expense_id: int, description: str = None, 
-                      amount: float = None, category: str = None) -> bool:
+                      amount=None, category: str = None) -> bool:
         """Update an existing expense."""
         expense = self.get_expense_by_id(expense_id)
         if not expense:
             return False
+        if amount is not None:
+            amount_cents = to_minor_units(amount, expense['currency'])
+            if amount_cents <= 0:
+                raise ValueError("Amount must be positive")
         
+        rollups = self._ensure_rollups()
+        rollups.remove(expense)
+        old_category, old_cents = expense['category'], expense['amount_cents']
         if description is not None:
             expense['description'] = description
         if amount is not None:
-            if amount <= 0:
-                raise ValueError("Amount must be positive")
-            expense['amount'] = amount
+            expense['amount_cents'] = amount_cents
         if category is not None:
             expense['category'] = category
+        rollups.add(expense)
+        if self._index is not None:
+            self._index.recategorize(expense, old_category)
         
         self.save_expenses()
+        self._check_update_alerts(expense, old_category, old_cents)
         return True
     
     def delete_expense(self, expense_id: int) -> bool:
@@ -82,10 +751,84 @@ class ExpenseTracker:
         if not expense:
             return False
         
+        self._ensure_rollups().remove(expense)
         self.expenses.remove(expense)
+        if self._index is not None:
+            self._index.remove(expense)
         self.save_expenses()
         return True
     
+    def month_total(self, month_key: str, category: str) -> int:
+        """Minor units spent in one ``YYYY-MM`` month and category (case-insensitive), from the rollups."""
+        month = self._ensure_rollups().months.get(month_key, {})
+        category = category.lower()
+        return sum(cell[0] for name, cell in month.items() if name.lower() == category)
+    
+    def _check_alerts(self, category: str, month_key: str, added: int):
+        """Evaluate the budget rules for one write and keep the messages in ``self.alerts``."""
+        self.alerts = []
+        for kind, spent, threshold in self.budgets.evaluate(category, month_key, added, self.month_total):
+            spent_text = format_currency(from_minor_units(spent, self.currency), self.currency)
+            threshold_text = format_currency(from_minor_units(threshold, self.currency), self.currency)
+            if kind == 'budget':
+                self.alerts.append(f"{category} is over its {month_key} budget: {spent_text} of {threshold_text}")
+            elif kind == 'warning':
+                self.alerts.append(f"{category} has used {spent * 100 // threshold}% of its "
+                                   f"{month_key} budget: {spent_text} of {threshold_text}")
+            else:
+                self.alerts.append(f"{category} spending in {month_key} ({spent_text}) is more than "
+                                   f"{self.budgets.spike_factor:g}x its {self.budgets.spike_months}-month "
+                                   f"average ({threshold_text})")
+    
+    def _check_update_alerts(self, expense: Dict, old_category: str, old_cents: int):
+        """Evaluate the rules for the amount an update added to the expense's category."""
+        same = old_category.lower() == expense['category'].lower()
+        added = expense['amount_cents'] - old_cents if same else expense['amount_cents']
+        self._check_alerts(expense['category'], expense['date'][:7], added)
+    
+    def budget_status(self, month: int = None, year: int = None) -> List[Dict]:
+        """Utilization of every budget for one month (the current month by default)."""
+        today = date.today()
+        month_key = f"{year or today.year}-{month or today.month:02d}"
+        status = []
+        for name, limit in sorted(self.budgets.limits.values()):
+            spent = self.month_total(month_key, name)
+            months = self.budgets.spike_months
+            history = sum(self.month_total(_shift_month(month_key, -offset), name)
+                          for offset in range(1, months + 1))
+            status.append({
+                'category': name,
+                'month': month_key,
+                'limit': from_minor_units(limit, self.currency),
+                'spent': from_minor_units(spent, self.currency),
+                'used_percent': spent * 100 / limit if limit else 0.0,
+                'trailing_average': from_minor_units(history // months if months else 0, self.currency)
+            })
+        return status
+    
+    def set_budget(self, category: str, limit) -> None:
+        """Set the monthly budget for a category (amount in major units)."""
+        limit_cents = to_minor_units(limit, self.currency)
+        if limit_cents <= 0:
+            raise ValueError("Budget must be positive")
+        self.budgets.limits[category.lower()] = (category, limit_cents)
+        self.budgets.save()
+    
+    def remove_budget(self, category: str) -> bool:
+        """Remove a category's budget; returns whether one was set."""
+        if self.budgets.limits.pop(category.lower(), None) is None:
+            return False
+        self.budgets.save()
+        return True
+    
+    def set_spike_rule(self, factor: float, months: int) -> None:
+        """Alert when a month exceeds ``factor`` times the average of the previous ``months`` months."""
+        if factor < 0 or months < 1:
+            raise ValueError("Spike factor must be >= 0 (0 disables) and months must be at least 1")
+        self.budgets.spike_factor = factor
+        self.budgets.spike_months = months
+        self.budgets.save()
+    
     def get_expense_by_id(self, expense_id: int) -> Optional[Dict]:
         """Get expense by ID."""
         for expense in self.expenses:
@@ -93,96 +836,1090 @@ class ExpenseTracker:
                 return expense
         return None
     
-    def list_expenses(self, category: str = None) -> List[Dict]:
-        """List all expenses, optionally filtered by category."""
+    def list_expenses(self, category: str = None, start: date = None,
+                      end: date = None) -> List[Dict]:
+        """List all expenses, optionally filtered by category and an inclusive date range.
+        
+        A date range is returned in date order; otherwise expenses are in ID order.
+        """
+        if start is None and end is None:
+            if category:
+                index = self._get_index()
+                if index is None:
+                    name = category.lower()
+                    return [exp for exp in self.expenses if exp['category'].lower() == name]
+                return list(index.category(category))
+            return self.expenses
+        
+        expenses = self._between(start and start.isoformat(), end and end.isoformat())
         if category:
-            return [exp for exp in self.expenses if exp['category'].lower() == category.lower()]
-        return self.expenses
-    
-    def get_summary(self, month: int = None) -> Dict:
-        """Get summary of expenses, optionally for a specific month."""
-        if month is not None:
-            if month < 1 or month > 12:
-                raise ValueError("Month must be between 1 and 12")
-            
-            current_year = datetime.now().year
-            filtered_expenses = [
-                exp for exp in self.expenses 
-                if datetime.fromisoformat(exp['date']).month == month
-                and datetime.fromisoformat(exp['date']).year == current_year
-            ]
-        else:
-            filtered_expenses = self.expenses
+            expenses = [exp for exp in expenses if exp['category'].lower() == category.lower()]
+        return expenses
+    
+    def _get_index(self) -> Optional[ExpenseIndex]:
+        """Return the date/category index, or None for the tracker's first query.
+        
+        Building the index sorts every expense, which costs more than the one
+        scan a single CLI command needs, so the first query scans and the
+        index is built when the same tracker is queried again.
+        """
+        if self._index is None:
+            if not self._queried:
+                self._queried = True
+                return None
+            self._index = ExpenseIndex(self.expenses)
+        return self._index
+    
+    def _between(self, first: Optional[str], last: Optional[str]) -> List[Dict]:
+        """Expenses dated ``first``..``last`` (inclusive ISO dates, either open), in date order."""
+        index = self._get_index()
+        if index is not None:
+            return index.between(first, last)
+        return sorted((exp for exp in self.expenses
+                       if (first is None or exp['date'] >= first) and (last is None or exp['date'] <= last)),
+                      key=lambda exp: exp['date'])
+    
+    def get_summary(self, month: int = None, year: int = None, start: date = None,
+                    end: date = None, last_days: int = None) -> Dict:
+        """Get summary of expenses for all time, a month, a year, a date range or the last N days.
         
-        total = sum(exp['amount'] for exp in filtered_expenses)
-        category_totals = {}
-        for exp in filtered_expenses:
-            cat = exp['category']
-            category_totals[cat] = category_totals.get(cat, 0) + exp['amount']
+        ``month`` without ``year`` means that month of the current year. ``start``
+        and ``end`` are inclusive and either may be left open.
+        """
+        if month is not None and (month < 1 or month > 12):
+            raise ValueError("Month must be between 1 and 12")
         
+        if last_days is not None:
+            if last_days < 1:
+                raise ValueError("Number of days must be positive")
+            if any(value is not None for value in (month, year, start, end)):
+                raise ValueError("A rolling window cannot be combined with other periods")
+            end = date.today()
+            start = end - timedelta(days=last_days - 1)
+        elif start is not None or end is not None:
+            if month is not None or year is not None:
+                raise ValueError("A date range cannot be combined with a month or year")
+            if start is not None and end is not None and start > end:
+                raise ValueError("Start date must not be after end date")
+        elif month is not None or year is not None:
+            if year is None:
+                year = datetime.now().year
+            start, end = _period_bounds(year, month)
+        
+        total, count, category_totals = self._summarize(start, end)
         return {
-            'total': total,
-            'count': len(filtered_expenses),
-            'category_totals': category_totals,
-            'month': month
+            'total': from_minor_units(total, self.currency),
+            'total_cents': total,
+            'count': count,
+            'category_totals': {cat: from_minor_units(amount, self.currency)
+                                for cat, amount in category_totals.items()},
+            'category_cents': category_totals,
+            'currency': self.currency,
+            'month': month,
+            'year': year,
+            'start': start,
+            'end': end,
+            'last_days': last_days
         }
     
+    def _summarize(self, start: Optional[date], end: Optional[date]) -> Tuple[int, int, Dict[str, int]]:
+        """Aggregate the expenses dated ``start``..``end`` in minor units with the configured engine."""
+        first = start.isoformat() if start is not None else None
+        last = end.isoformat() if end is not None else None
+        
+        if self.engine == 'numpy':
+            if self._columns is None:
+                self._columns = ExpenseColumns(self.expenses)
+            return self._columns.summarize(start and start.toordinal(), end and end.toordinal())
+        
+        if self.engine == 'python':
+            return _aggregate([
+                exp for exp in self.expenses
+                if (first is None or exp['date'] >= first) and (last is None or exp['date'] <= last)
+            ])
+        
+        # Whole months come straight from the rollups; anything else bisects the date index
+        if start is None and end is None:
+            return self._ensure_rollups().summarize()
+        month_keys = _whole_months(start, end) if start is not None and end is not None else None
+        if month_keys is not None:
+            return self._ensure_rollups().summarize(month_keys)
+        return _aggregate(self._between(first, last))
+    
+    def iter_expenses(self, category: str = None, start: date = None,
+                      end: date = None) -> Iterator[Dict]:
+        """Yield expenses, optionally filtered, without loading the store if it is not loaded yet."""
+        if self._expenses is not None:
+            source: Iterable[Dict] = self._expenses
+        elif os.path.exists(self.data_file):
+            source = map(upgrade_expense, iter_json_array(self.data_file))
+        else:
+            source = ()
+        first = start.isoformat() if start is not None else None
+        last = end.isoformat() if end is not None else None
+        category = category.lower() if category else None
+        for expense in source:
+            if category is not None and expense['category'].lower() != category:
+                continue
+            if (first is not None and expense['date'] < first) or (last is not None and expense['date'] > last):
+                continue
+            yield expense
+    
+    def export_expenses(self, filename: str = None, fmt: str = None, compress: bool = False,
+                        category: str = None, start: date = None, end: date = None) -> Tuple[str, int]:
+        """Stream expenses to a CSV or NDJSON file (``-`` for stdout), optionally gzipped.
+        
+        Returns the filename and the number of expenses written.
+        """
+        if not filename:
+            extension = 'ndjson' if fmt == 'ndjson' else 'csv'
+            filename = f"expenses_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+            if compress:
+                filename += '.gz'
+        fmt, gzipped = detect_format(filename, fmt)
+        with open_stream(filename, 'w', compress or gzipped) as stream:
+            count = write_expenses(stream, self.iter_expenses(category, start, end), fmt)
+        return filename, count
+    
     def export_to_csv(self, filename: str = None) -> str:
         """Export expenses to CSV file."""
-        if not filename:
-            filename = f"expenses_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        return self.export_expenses(filename, 'csv')[0]
+    
+    def import_expenses(self, filename: str, fmt: str = None, batch_size: int = 1000,
+                        compress: bool = False) -> Tuple[int, List[Tuple[int, str]]]:
+        """Stream expenses in from a CSV or NDJSON file (``-`` for stdin).
         
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['ID', 'Date', 'Description', 'Amount', 'Category']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            for expense in self.expenses:
-                writer.writerow({
-                    'ID': expense['id'],
-                    'Date': expense['date'],
-                    'Description': expense['description'],
-                    'Amount': expense['amount'],
-                    'Category': expense['category']
-                })
+        Rows are validated one at a time and new IDs are assigned. Valid rows
+        are saved every ``batch_size`` rows, so an interrupted import keeps the
+        batches already committed. Returns the number imported and a list of
+        ``(line_number, error)`` pairs for rejected rows.
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be positive")
+        fmt, gzipped = detect_format(filename, fmt)
+        imported, batch, errors = 0, [], []
+        with open_stream(filename, 'r', compress or gzipped) as stream:
+            for line_number, record in read_records(stream, fmt):
+                try:
+                    batch.append(validate_record(record, self.currency))
+                except ValueError as e:
+                    errors.append((line_number, str(e)))
+                    continue
+                if len(batch) == batch_size:
+                    self._import_batch(batch)
+                    imported += len(batch)
+                    batch = []
+        if batch:
+            self._import_batch(batch)
+            imported += len(batch)
+        return imported, errors
+    
+    def _import_batch(self, batch: List[Dict]):
+        """Append validated expense fields under new IDs and save them as one commit."""
+        rollups = self._ensure_rollups()
+        for fields in batch:
+            expense = {'id': self.next_id, **fields}
+            rollups.add(expense)
+            self.expenses.append(expense)
+            self.next_id += 1
+        # Re-sorting once is cheaper than inserting a whole batch one row at a time
+        self._index = None
+        self.save_expenses()
+
+
+class SqliteExpenseTracker(ExpenseTracker):
+    """
+    ExpenseTracker stored in a SQLite database (``expenses.db`` next to ``expenses.json``).
+    
+    Every command reads only the rows it needs: ``date`` and ``category`` are
+    indexed, filters become WHERE clauses and summaries run as SUM/GROUP BY,
+    so adding an expense costs the same however large the store grows.
+    """
+    
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS expenses (
+            id INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            amount_cents INTEGER NOT NULL,
+            currency TEXT NOT NULL,
+            category TEXT NOT NULL,
+            date TEXT NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses (date)",
+        "CREATE INDEX IF NOT EXISTS idx_expenses_category ON expenses (category COLLATE NOCASE, date)",
+        # Per month/category totals kept current by triggers, for O(1) budget checks
+        """CREATE TABLE IF NOT EXISTS monthly_totals (
+            month TEXT NOT NULL,
+            category TEXT NOT NULL,
+            amount_cents INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (month, category)
+        ) WITHOUT ROWID""",
+        """CREATE TRIGGER IF NOT EXISTS expenses_total_insert AFTER INSERT ON expenses BEGIN
+            INSERT INTO monthly_totals (month, category, amount_cents, count)
+            VALUES (substr(NEW.date, 1, 7), NEW.category, NEW.amount_cents, 1)
+            ON CONFLICT (month, category) DO UPDATE
+            SET amount_cents = amount_cents + excluded.amount_cents, count = count + 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS expenses_total_delete AFTER DELETE ON expenses BEGIN
+            UPDATE monthly_totals SET amount_cents = amount_cents - OLD.amount_cents, count = count - 1
+            WHERE month = substr(OLD.date, 1, 7) AND category = OLD.category;
+            DELETE FROM monthly_totals
+            WHERE month = substr(OLD.date, 1, 7) AND category = OLD.category AND count <= 0;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS expenses_total_update
+        AFTER UPDATE OF amount_cents, category, date ON expenses BEGIN
+            UPDATE monthly_totals SET amount_cents = amount_cents - OLD.amount_cents, count = count - 1
+            WHERE month = substr(OLD.date, 1, 7) AND category = OLD.category;
+            DELETE FROM monthly_totals
+            WHERE month = substr(OLD.date, 1, 7) AND category = OLD.category AND count <= 0;
+            INSERT INTO monthly_totals (month, category, amount_cents, count)
+            VALUES (substr(NEW.date, 1, 7), NEW.category, NEW.amount_cents, 1)
+            ON CONFLICT (month, category) DO UPDATE
+            SET amount_cents = amount_cents + excluded.amount_cents, count = count + 1;
+        END""",
+    ]
+    COLUMNS = ('id', 'description', 'amount_cents', 'currency', 'category', 'date')
+    SELECT = "SELECT id, description, amount_cents, currency, category, date FROM expenses"
+    INSERT = "INSERT INTO expenses (description, amount_cents, currency, category, date) VALUES (?, ?, ?, ?, ?)"
+    
+    def __init__(self, data_file: str = "expenses.json", commit_window: Optional[float] = None,
+                 engine: str = 'auto', currency: Optional[str] = None, read_only: bool = False):
+        # Each write is its own transaction, so commit_window has nothing to merge
+        super().__init__(data_file, 0.0, engine, currency, read_only)
+        self.db_file = os.path.splitext(data_file)[0] + ".db"
+        self.conn = sqlite3.connect(self.db_file)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._upgrade_schema()
+        for statement in self.SCHEMA:
+            self.conn.execute(statement)
+        self.conn.commit()
+        has_totals = self.conn.execute("SELECT EXISTS (SELECT 1 FROM monthly_totals)").fetchone()[0]
+        if not has_totals and self.conn.execute("SELECT EXISTS (SELECT 1 FROM expenses)").fetchone()[0]:
+            self.rebuild_rollups()
+    
+    def _upgrade_schema(self):
+        """Rewrite a table with a REAL ``amount`` column into integer minor units."""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(expenses)")}
+        if 'amount' not in columns:
+            return
+        legacy = self.conn.execute("SELECT id, description, amount, category, date FROM expenses").fetchall()
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.execute("DROP TABLE expenses")
+            for statement in self.SCHEMA:
+                self.conn.execute(statement)
+            self.conn.executemany(
+                "INSERT INTO expenses (id, description, amount_cents, currency, category, date) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(expense_id, description, to_minor_units(amount, DEFAULT_CURRENCY, exact=False),
+                  DEFAULT_CURRENCY, category, day)
+                 for expense_id, description, amount, category, day in legacy])
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+    
+    def _rows(self, where: str = "", params: tuple = (), order: str = "id") -> Iterator[Dict]:
+        for row in self.conn.execute(f"{self.SELECT} {where} ORDER BY {order}", params):
+            yield dict(zip(self.COLUMNS, row))
+    
+    def load_expenses(self) -> List[Dict]:
+        """Read every expense row (only needed by the python and numpy engines)."""
+        return list(self._rows())
+    
+    def _stored_currency(self) -> Optional[str]:
+        row = self.conn.execute("SELECT currency FROM expenses ORDER BY id LIMIT 1").fetchone()
+        return row[0] if row else None
+    
+    def save_expenses(self):
+        """Every write is committed as it happens."""
+    
+    def flush(self):
+        """Every write is committed as it happens."""
+    
+    def rebuild_rollups(self) -> int:
+        """Recompute the trigger-maintained monthly_totals table; returns the number of cells."""
+        with self.conn:
+            self.conn.execute("DELETE FROM monthly_totals")
+            self.conn.execute(
+                "INSERT INTO monthly_totals (month, category, amount_cents, count) "
+                "SELECT substr(date, 1, 7), category, SUM(amount_cents), COUNT(*) "
+                "FROM expenses GROUP BY substr(date, 1, 7), category")
+        return self.conn.execute("SELECT COUNT(*) FROM monthly_totals").fetchone()[0]
+    
+    def month_total(self, month_key: str, category: str) -> int:
+        """Minor units spent in one month and category, read from monthly_totals."""
+        row = self.conn.execute(
+            "SELECT SUM(amount_cents) FROM monthly_totals WHERE month = ? AND category = ? COLLATE NOCASE",
+            (month_key, category)).fetchone()
+        return row[0] or 0
+    
+    def add_expense(self, description: str, amount, category: str = "General") -> int:
+        """Add a new expense; ``amount`` is in major units (e.g. ``"12.34"``)."""
+        amount_cents = to_minor_units(amount, self.currency)
+        if amount_cents <= 0:
+            raise ValueError("Amount must be positive")
+        today = date.today().isoformat()
+        with self.conn:
+            cursor = self.conn.execute(self.INSERT, (description, amount_cents, self.currency, category, today))
+        self._check_alerts(category, today[:7], amount_cents)
+        return cursor.lastrowid
+    
+    def update_expense(self, expense_id: int, description: str = None,
+                      amount=None, category: str = None) -> bool:
+        """Update an existing expense."""
+        expense = self.get_expense_by_id(expense_id)
+        if expense is None:
+            return False
+        amount_cents = None
+        if amount is not None:
+            amount_cents = to_minor_units(amount, expense['currency'])
+            if amount_cents <= 0:
+                raise ValueError("Amount must be positive")
+        changes = {'description': description, 'amount_cents': amount_cents, 'category': category}
+        changes = {column: value for column, value in changes.items() if value is not None}
+        if not changes:
+            return True
+        assignments = ", ".join(f"{column} = ?" for column in changes)
+        with self.conn:
+            self.conn.execute(f"UPDATE expenses SET {assignments} WHERE id = ?", (*changes.values(), expense_id))
+        old_category, old_cents = expense['category'], expense['amount_cents']
+        expense.update(changes)
+        self._check_update_alerts(expense, old_category, old_cents)
+        return True
+    
+    def delete_expense(self, expense_id: int) -> bool:
+        """Delete an expense by ID."""
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
+        return cursor.rowcount > 0
+    
+    def get_expense_by_id(self, expense_id: int) -> Optional[Dict]:
+        """Get expense by ID."""
+        return next(self._rows("WHERE id = ?", (expense_id,)), None)
+    
+    @staticmethod
+    def _where(category: str = None, start: date = None, end: date = None) -> Tuple[str, tuple]:
+        """Build the WHERE clause for an optional category and inclusive date range."""
+        clauses, params = [], []
+        if category:
+            clauses.append("category = ? COLLATE NOCASE")
+            params.append(category)
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            clauses.append("date <= ?")
+            params.append(end.isoformat())
+        return ("WHERE " + " AND ".join(clauses) if clauses else ""), tuple(params)
+    
+    def list_expenses(self, category: str = None, start: date = None,
+                      end: date = None) -> List[Dict]:
+        """List expenses, filtering by category and date range in SQL."""
+        where, params = self._where(category, start, end)
+        order = "date, id" if start is not None or end is not None else "id"
+        return list(self._rows(where, params, order))
+    
+    def iter_expenses(self, category: str = None, start: date = None,
+                      end: date = None) -> Iterator[Dict]:
+        """Stream filtered expenses straight from a database cursor."""
+        where, params = self._where(category, start, end)
+        return self._rows(where, params)
+    
+    def _summarize(self, start: Optional[date], end: Optional[date]) -> Tuple[int, int, Dict[str, int]]:
+        """Aggregate with integer SUM/GROUP BY over the date index (python/numpy engines scan all rows)."""
+        if self.engine in ('python', 'numpy'):
+            return super()._summarize(start, end)
+        where, params = self._where(start=start, end=end)
+        rows = self.conn.execute(
+            f"SELECT category, SUM(amount_cents), COUNT(*) FROM expenses {where} "
+            f"GROUP BY category ORDER BY MIN(id)", params).fetchall()
+        category_totals = {category: amount for category, amount, _ in rows}
+        return sum(category_totals.values()), sum(count for _, _, count in rows), category_totals
+    
+    def _import_batch(self, batch: List[Dict]):
+        """Insert validated expense fields in a single transaction."""
+        with self.conn:
+            self.conn.executemany(self.INSERT, [
+                (fields['description'], fields['amount_cents'], fields['currency'],
+                 fields['category'], fields['date'])
+                for fields in batch])
+    
+    def import_json(self, json_file: str, batch_size: int = 10000) -> int:
+        """Copy every expense from an expenses.json file, keeping IDs; returns the count.
         
-        return filename
+        The file is streamed and inserted in batches inside one transaction, so
+        a failed migration leaves the database unchanged.
+        """
+        count = 0
+        insert = ("INSERT OR REPLACE INTO expenses (id, description, amount_cents, currency, category, date) "
+                  "VALUES (?, ?, ?, ?, ?, ?)")
+        batch = []
+        with self.conn:
+            for expense in self._same_currency(map(upgrade_expense, iter_json_array(json_file))):
+                batch.append(tuple(expense[column] for column in self.COLUMNS))
+                if len(batch) == batch_size:
+                    self.conn.executemany(insert, batch)
+                    count += len(batch)
+                    batch = []
+            self.conn.executemany(insert, batch)
+        # INSERT OR REPLACE does not fire the delete trigger for replaced rows
+        self.rebuild_rollups()
+        return count + len(batch)
 
 
-def format_currency(amount: float) -> str:
-    """Format amount as currency."""
-    return f"${amount:.2f}"
+def _partition_stats(rows: List[Dict]) -> Dict:
+    """Currency, ID range and per-category ``[sum, count]`` totals of one partition's rows."""
+    currency = rows[0]['currency']
+    categories: Dict[str, List[int]] = {}
+    for expense in rows:
+        if expense['currency'] != currency:
+            raise ValueError(f"Partition {expense['date'][:7]} mixes {currency} and {expense['currency']} expenses")
+        cell = categories.setdefault(expense['category'], [0, 0])
+        cell[0] += expense['amount_cents']
+        cell[1] += 1
+    return {
+        'currency': currency,
+        'count': len(rows),
+        'min_id': min(expense['id'] for expense in rows),
+        'max_id': max(expense['id'] for expense in rows),
+        'categories': categories
+    }
 
 
-def display_expenses(expenses: List[Dict]):
-    """Display expenses in a formatted table."""
-    if not expenses:
-        print("No expenses found.")
-        return
+def to_column_partition(rows: List[Dict]) -> Dict:
+    """Encode rows column by column, sorted by date, with dictionary-encoded categories."""
+    rows = sorted(rows, key=lambda exp: (exp['date'], exp['id']))
+    codes: Dict[str, int] = {}
+    return {
+        'id': [exp['id'] for exp in rows],
+        'description': [exp['description'] for exp in rows],
+        'amount_cents': [exp['amount_cents'] for exp in rows],
+        'currency': [exp['currency'] for exp in rows],
+        'date': [exp['date'] for exp in rows],
+        'category': [codes.setdefault(exp['category'], len(codes)) for exp in rows],
+        'categories': list(codes)
+    }
+
+
+def from_column_partition(data: Dict) -> List[Dict]:
+    """Decode a columnar partition back into expense rows in ID order."""
+    names = data['categories']
+    rows = [
+        {'id': expense_id, 'description': description, 'amount_cents': amount_cents,
+         'currency': currency, 'category': names[code], 'date': day}
+        for expense_id, description, amount_cents, currency, code, day in zip(
+            data['id'], data['description'], data['amount_cents'], data['currency'],
+            data['category'], data['date'])
+    ]
+    rows.sort(key=lambda exp: exp['id'])
+    return rows
+
+
+class PartitionedExpenseTracker(ExpenseTracker):
+    """
+    ExpenseTracker stored as one file per month under ``expenses.parts/``.
+    
+    ``manifest.json`` lists every month with its file, ID range and
+    per-category totals. A write rewrites only its month's file and the
+    manifest; whole-month summaries and budget checks read the manifest
+    alone, and date ranges open only the months they overlap. Closed months
+    can be compacted into a columnar file that loads and aggregates faster.
+    """
+    
+    def __init__(self, data_file: str = "expenses.json", commit_window: Optional[float] = None,
+                 engine: str = 'auto', currency: Optional[str] = None, read_only: bool = False):
+        super().__init__(data_file, commit_window, engine, currency, read_only)
+        self.directory = os.path.splitext(data_file)[0] + ".parts"
+        self.manifest_file = os.path.join(self.directory, "manifest.json")
+        self.manifest = self._load_manifest()
+        self.partitions: Dict[str, List[Dict]] = {}  # months read so far, in ID order
+        self.opened: List[str] = []  # months loaded from disk, in load order
+        self._columns_cache: Dict[str, Dict] = {}
+        self._dirty: set = set()
+        self._obsolete: List[str] = []
+    
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_file, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            if self.read_only and os.path.exists(self.manifest_file):
+                raise ValueError(f"Cannot read {self.manifest_file}: {e}")
+            return {'version': 1, 'next_id': 1, 'partitions': {}}
+    
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self.directory, file_name)
+    
+    def _get_next_id(self) -> int:
+        return self.manifest['next_id']
+    
+    def _read_file(self, month: str, entry: Dict):
+        """Load one partition file: a list of rows, or a columnar dict when compacted."""
+        with open(self._path(entry['file']), 'r') as f:
+            data = json.load(f)
+        self.opened.append(month)
+        return data
+    
+    def _read_partition(self, month: str) -> List[Dict]:
+        """Rows of one month in ID order, read from disk at most once."""
+        rows = self.partitions.get(month)
+        if rows is None:
+            entry = self.manifest['partitions'].get(month)
+            if entry is None:
+                rows = []
+            elif entry.get('compacted'):
+                rows = from_column_partition(self._read_columns(month))
+            else:
+                rows = self._read_file(month, entry)
+            self.partitions[month] = rows
+        return rows
+    
+    def _read_columns(self, month: str) -> Dict:
+        """The columnar form of a compacted month."""
+        data = self._columns_cache.get(month)
+        if data is None:
+            data = self._columns_cache[month] = self._read_file(month, self.manifest['partitions'][month])
+        return data
+    
+    def _entry(self, month: str) -> Optional[Dict]:
+        """Manifest entry for ``month``, refreshed first if its file changed behind the manifest's back."""
+        entry = self.manifest['partitions'].get(month)
+        if entry is None or month in self._dirty:
+            return entry
+        if entry.get('signature') != _file_signature(self._path(entry['file'])):
+            self.partitions.pop(month, None)
+            self._columns_cache.pop(month, None)
+            if os.path.exists(self._path(entry['file'])):
+                entry['signature'] = None  # read the file itself, whatever the manifest claims
+                self._mark_dirty(month, self._read_partition(month))
+            else:
+                print(f"Warning: {self._path(entry['file'])} is missing; dropping {month} from the manifest",
+                      file=sys.stderr)
+                self._mark_dirty(month, [])
+            if not self.read_only:
+                self.committer.submit(self.manifest_file, self._write_dirty)
+        return self.manifest['partitions'].get(month)
+    
+    def _months(self, start: date = None, end: date = None) -> List[str]:
+        """Months in the manifest overlapping ``start``..``end``, oldest first.
+        
+        Each entry is refreshed on the way, so a month whose file has gone
+        missing is dropped from the manifest rather than read.
+        """
+        first = start.isoformat()[:7] if start is not None else None
+        last = end.isoformat()[:7] if end is not None else None
+        return [month for month in sorted(self.manifest['partitions'])
+                if (first is None or month >= first) and (last is None or month <= last)
+                and self._entry(month) is not None]
+    
+    def _mark_dirty(self, month: str, rows: List[Dict]):
+        """Record a month's new rows and refresh its manifest entry; the write is deferred."""
+        self.partitions[month] = rows
+        self._columns_cache.pop(month, None)
+        partitions = self.manifest['partitions']
+        if rows:
+            entry = partitions.setdefault(month, {'file': f"{month}.json", 'compacted': False})
+            entry.update(_partition_stats(rows))
+        elif month in partitions:
+            self._obsolete.append(partitions.pop(month)['file'])
+        self._dirty.add(month)
+    
+    def _save(self, months: Iterable[str]):
+        """Queue the given months and the manifest for writing."""
+        for month in months:
+            self._mark_dirty(month, self.partitions[month])
+        self._columns = None
+        self._index = None
+        self._expenses = None
+        self.committer.submit(self.manifest_file, self._write_dirty)
+    
+    def _write_dirty(self):
+        """Write every changed partition, then the manifest, then drop replaced files."""
+        os.makedirs(self.directory, exist_ok=True)
+        dirty, self._dirty = self._dirty, set()
+        for month in sorted(dirty):
+            entry = self.manifest['partitions'].get(month)
+            if entry is None:
+                continue
+            rows = self.partitions[month]
+            payload = to_column_partition(rows) if entry['compacted'] else rows
+            path = self._path(entry['file'])
+            atomic_write(path, json.dumps(payload))
+            entry['signature'] = _file_signature(path)
+        atomic_write(self.manifest_file, json.dumps(self.manifest, indent=2))
+        obsolete, self._obsolete = self._obsolete, []
+        live = {entry['file'] for entry in self.manifest['partitions'].values()}
+        for file_name in obsolete:
+            if file_name not in live and os.path.exists(self._path(file_name)):
+                os.remove(self._path(file_name))
+    
+    def _stored_currency(self) -> Optional[str]:
+        for month in sorted(self.manifest['partitions']):
+            entry = self._entry(month)
+            if entry is not None:
+                return entry.get('currency') or self._read_partition(month)[0]['currency']
+        return None
+    
+    def load_expenses(self) -> List[Dict]:
+        """Read every partition (only needed by the python and numpy engines)."""
+        expenses = [expense for month in self._months() for expense in self._read_partition(month)]
+        expenses.sort(key=lambda exp: exp['id'])
+        return expenses
+    
+    def save_expenses(self):
+        """Writes go through ``_save`` for the months they touch."""
+    
+    def _find(self, expense_id: int) -> Tuple[Optional[str], Optional[Dict]]:
+        """Locate an expense using the manifest's ID ranges; opens only candidate months.
+        
+        IDs normally grow with the date, so the months with the narrowest
+        matching range are tried first.
+        """
+        candidates = [(entry['max_id'] - entry['min_id'], month)
+                      for month, entry in self.manifest['partitions'].items()
+                      if entry['min_id'] <= expense_id <= entry['max_id']]
+        for _, month in sorted(candidates):
+            for expense in self._read_partition(month):
+                if expense['id'] == expense_id:
+                    return month, expense
+        return None, None
+    
+    def get_expense_by_id(self, expense_id: int) -> Optional[Dict]:
+        """Get expense by ID."""
+        return self._find(expense_id)[1]
+    
+    def add_expense(self, description: str, amount, category: str = "General") -> int:
+        """Add a new expense to the current month's partition."""
+        amount_cents = to_minor_units(amount, self.currency)
+        if amount_cents <= 0:
+            raise ValueError("Amount must be positive")
+        today = date.today().isoformat()
+        expense = {
+            'id': self.manifest['next_id'],
+            'description': description,
+            'amount_cents': amount_cents,
+            'currency': self.currency,
+            'category': category,
+            'date': today
+        }
+        self._read_partition(today[:7]).append(expense)
+        self.manifest['next_id'] += 1
+        self._save([today[:7]])
+        self._check_alerts(category, today[:7], amount_cents)
+        return expense['id']
+    
+    def update_expense(self, expense_id: int, description: str = None,
+                      amount=None, category: str = None) -> bool:
+        """Update an existing expense, rewriting only its month."""
+        month, expense = self._find(expense_id)
+        if expense is None:
+            return False
+        if amount is not None:
+            amount_cents = to_minor_units(amount, expense['currency'])
+            if amount_cents <= 0:
+                raise ValueError("Amount must be positive")
+        old_category, old_cents = expense['category'], expense['amount_cents']
+        if description is not None:
+            expense['description'] = description
+        if amount is not None:
+            expense['amount_cents'] = amount_cents
+        if category is not None:
+            expense['category'] = category
+        self._save([month])
+        self._check_update_alerts(expense, old_category, old_cents)
+        return True
+    
+    def delete_expense(self, expense_id: int) -> bool:
+        """Delete an expense by ID, rewriting only its month."""
+        month, expense = self._find(expense_id)
+        if expense is None:
+            return False
+        self.partitions[month].remove(expense)
+        self._save([month])
+        return True
+    
+    def list_expenses(self, category: str = None, start: date = None,
+                      end: date = None) -> List[Dict]:
+        """List expenses, opening only the months a date range overlaps."""
+        expenses = list(self.iter_expenses(category, start, end))
+        if start is None and end is None:
+            expenses.sort(key=lambda exp: exp['id'])
+        else:
+            expenses.sort(key=lambda exp: (exp['date'], exp['id']))
+        return expenses
+    
+    def iter_expenses(self, category: str = None, start: date = None,
+                      end: date = None) -> Iterator[Dict]:
+        """Yield filtered expenses month by month."""
+        first = start.isoformat() if start is not None else None
+        last = end.isoformat() if end is not None else None
+        category = category.lower() if category else None
+        for month in self._months(start, end):
+            if category is not None and not any(name.lower() == category
+                                                for name in self._entry(month)['categories']):
+                continue
+            for expense in self._read_partition(month):
+                if category is not None and expense['category'].lower() != category:
+                    continue
+                if (first is not None and expense['date'] < first) or (last is not None and expense['date'] > last):
+                    continue
+                yield expense
+    
+    def month_total(self, month_key: str, category: str) -> int:
+        """Minor units spent in one month and category, from the manifest."""
+        entry = self._entry(month_key)
+        if entry is None:
+            return 0
+        category = category.lower()
+        return sum(cell[0] for name, cell in entry['categories'].items() if name.lower() == category)
+    
+    def _summarize(self, start: Optional[date], end: Optional[date]) -> Tuple[int, int, Dict[str, int]]:
+        """Whole months come from the manifest; only the partial months at either end are opened."""
+        if self.engine in ('python', 'numpy'):
+            return super()._summarize(start, end)
+        first = start.isoformat() if start is not None else None
+        last = end.isoformat() if end is not None else None
+        total, count, category_totals = 0, 0, {}
+        for month in self._months(start, end):
+            month_start, month_end = _period_bounds(int(month[:4]), int(month[5:7]))
+            whole = ((first is None or first <= month_start.isoformat()) and
+                     (last is None or last >= month_end.isoformat()))
+            if whole:
+                cells = self._entry(month)['categories'].items()
+            else:
+                cells = self._aggregate_month(month, first, last).items()
+            for name, (amount, items) in cells:
+                total += amount
+                count += items
+                category_totals[name] = category_totals.get(name, 0) + amount
+        return total, count, category_totals
+    
+    def _aggregate_month(self, month: str, first: Optional[str], last: Optional[str]) -> Dict[str, List[int]]:
+        """Per-category totals of one month's expenses dated ``first``..``last``."""
+        cells: Dict[str, List[int]] = {}
+        entry = self._entry(month)
+        if entry.get('compacted') and month not in self.partitions:
+            # Columnar months are sorted by date: bisect the range and sum the slices
+            data = self._read_columns(month)
+            lo = bisect_left(data['date'], first) if first is not None else 0
+            hi = bisect_right(data['date'], last) if last is not None else len(data['date'])
+            names = data['categories']
+            for code, amount in zip(data['category'][lo:hi], data['amount_cents'][lo:hi]):
+                cell = cells.setdefault(names[code], [0, 0])
+                cell[0] += amount
+                cell[1] += 1
+            return cells
+        for expense in self._read_partition(month):
+            if (first is None or expense['date'] >= first) and (last is None or expense['date'] <= last):
+                cell = cells.setdefault(expense['category'], [0, 0])
+                cell[0] += expense['amount_cents']
+                cell[1] += 1
+        return cells
+    
+    def _import_batch(self, batch: List[Dict]):
+        """Append validated expense fields to their months' partitions as one commit."""
+        months = set()
+        for fields in batch:
+            month = fields['date'][:7]
+            self._read_partition(month).append({'id': self.manifest['next_id'], **fields})
+            self.manifest['next_id'] += 1
+            months.add(month)
+        self._save(months)
+    
+    def import_json(self, json_file: str) -> int:
+        """Split an expenses.json file into monthly partitions, keeping IDs; returns the count."""
+        if self.manifest['partitions']:
+            raise ValueError(f"{self.directory} already holds expenses")
+        months: Dict[str, List[Dict]] = {}
+        count = 0
+        for expense in self._same_currency(map(upgrade_expense, iter_json_array(json_file))):
+            months.setdefault(expense['date'][:7], []).append(expense)
+            self.manifest['next_id'] = max(self.manifest['next_id'], expense['id'] + 1)
+            count += 1
+        for month, rows in months.items():
+            rows.sort(key=lambda exp: exp['id'])
+            self.partitions[month] = rows
+        self._save(months)
+        self.flush()
+        return count
+    
+    def rebuild_rollups(self) -> int:
+        """Rebuild the manifest from the partition files on disk; returns the month/category cells."""
+        self.flush()
+        self.manifest['partitions'] = {}
+        self.partitions, self._columns_cache = {}, {}
+        files = sorted(os.listdir(self.directory)) if os.path.isdir(self.directory) else []
+        for file_name in files:
+            if file_name == "manifest.json" or not file_name.endswith(".json"):
+                continue
+            month, compacted = file_name.split(".")[0], file_name.endswith(".cols.json")
+            entry = {'file': file_name, 'compacted': compacted}
+            with open(self._path(file_name), 'r') as f:
+                data = json.load(f)
+            rows = from_column_partition(data) if compacted else [upgrade_expense(row) for row in data]
+            if not rows:
+                continue
+            self.manifest['partitions'][month] = entry
+            self.partitions[month] = rows
+            self.manifest['next_id'] = max(self.manifest['next_id'], max(row['id'] for row in rows) + 1)
+        self._save(list(self.manifest['partitions']))
+        self.flush()
+        return sum(len(entry['categories']) for entry in self.manifest['partitions'].values())
+    
+    def compact(self) -> int:
+        """Rewrite every month before the current one in columnar form; returns how many changed."""
+        current = date.today().isoformat()[:7]
+        months = [month for month in self._months()
+                  if month < current and not self.manifest['partitions'][month].get('compacted')]
+        for month in months:
+            self._read_partition(month)  # loaded so _save rewrites it in columnar form
+            entry = self.manifest['partitions'][month]
+            self._obsolete.append(entry['file'])
+            entry.update(file=f"{month}.cols.json", compacted=True)
+        self._save(months)
+        self.flush()
+        return len(months)
+
+
+STORAGE_BACKENDS = {
+    'json': ExpenseTracker,
+    'sqlite': SqliteExpenseTracker,
+    'partitioned': PartitionedExpenseTracker,
+}
+
+
+def make_tracker(data_file: str = "expenses.json", storage: Optional[str] = None,
+                 **kwargs) -> ExpenseTracker:
+    """Create a tracker for the storage named by ``storage`` or the EXPENSE_STORAGE env var."""
+    storage = (storage or os.environ.get("EXPENSE_STORAGE", "json")).lower()
+    if storage not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage '{storage}'. Must be one of: {', '.join(STORAGE_BACKENDS)}")
+    return STORAGE_BACKENDS[storage](data_file, **kwargs)
+
+
+# Files that sit next to a ledger but are not ledgers themselves
+LEDGER_SIDECARS = ('.rollups.json', '.budgets.json', 'manifest.json', '.db-wal', '.db-shm', '.tmp')
+
+
+def find_ledgers(pattern: str) -> List[Tuple[str, str, str]]:
+    """Expand a glob into ``(path, data_file, storage)`` triples, one per ledger.
+    
+    ``.db`` files are SQLite ledgers, ``.parts`` directories partitioned ones
+    and anything else a JSON ledger; rollup and budget files are skipped.
+    """
+    ledgers = []
+    for path in sorted(glob.glob(pattern, recursive=True)):
+        if path.endswith(LEDGER_SIDECARS):
+            continue
+        base = os.path.splitext(path)[0]
+        if path.endswith('.db'):
+            ledgers.append((path, base + ".json", 'sqlite'))
+        elif path.endswith('.parts') and os.path.isdir(path):
+            ledgers.append((path, base + ".json", 'partitioned'))
+        elif os.path.isfile(path):
+            ledgers.append((path, path, 'json'))
+    return ledgers
+
+
+def summarize_ledger(task: Tuple[str, str, str, str, Dict]) -> Dict:
+    """Map step: summarize one ledger in a worker process and time it.
+    
+    Returns the ledger's summary with ``ledger`` and ``seconds`` added, or
+    just those keys and ``error`` if the ledger could not be read.
+    """
+    path, data_file, storage, engine, period = task
+    start = time.perf_counter()
+    try:
+        summary = make_tracker(data_file, storage, engine=engine, read_only=True).get_summary(**period)
+    except (ValueError, OSError, sqlite3.Error) as e:
+        summary = {'error': str(e)}
+    summary['ledger'] = path
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def merge_summaries(summaries: List[Dict]) -> Dict:
+    """Reduce step: add per-ledger partial aggregates into one summary."""
+    currencies = {summary['currency'] for summary in summaries}
+    if len(currencies) > 1:
+        raise ValueError(f"Ledgers use different currencies: {', '.join(sorted(currencies))}")
+    currency = currencies.pop() if currencies else DEFAULT_CURRENCY
+    total, count, category_cents = 0, 0, {}
+    for summary in summaries:
+        total += summary['total_cents']
+        count += summary['count']
+        for category, amount in summary['category_cents'].items():
+            category_cents[category] = category_cents.get(category, 0) + amount
+    merged = dict(summaries[0]) if summaries else {'month': None}
+    merged.update({
+        'total': from_minor_units(total, currency),
+        'total_cents': total,
+        'count': count,
+        'category_totals': {cat: from_minor_units(amount, currency) for cat, amount in category_cents.items()},
+        'category_cents': category_cents,
+        'currency': currency,
+        'ledgers': len(summaries)
+    })
+    merged.pop('ledger', None)
+    merged.pop('seconds', None)
+    return merged
+
+
+def summarize_ledgers(pattern: str, period: Dict, engine: str = 'auto',
+                      workers: Optional[int] = None) -> Tuple[Dict, List[Dict], float]:
+    """Summarize every ledger matching ``pattern`` in a process pool and merge the results.
     
-    print(f"{'ID':<4} {'Date':<12} {'Description':<20} {'Amount':<10} {'Category':<15}")
-    print("-" * 70)
+    Returns the merged summary, the per-ledger results (in ledger order) and
+    the wall-clock seconds taken.
+    """
+    ledgers = find_ledgers(pattern)
+    if not ledgers:
+        raise ValueError(f"No ledgers match '{pattern}'")
+    tasks = [(path, data_file, storage, engine, period) for path, data_file, storage in ledgers]
+    start = time.perf_counter()
+    if workers == 1 or len(tasks) == 1:
+        results = [summarize_ledger(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(pool.map(summarize_ledger, tasks, chunksize=chunksize))
+    merged = merge_summaries([result for result in results if 'error' not in result])
+    return merged, results, time.perf_counter() - start
+
+
+def format_currency(amount, currency: str = DEFAULT_CURRENCY) -> str:
+    """Format an amount in major units as currency."""
+    places = MINOR_UNITS.get(currency, 2)
+    symbol = CURRENCY_SYMBOLS.get(currency)
+    if symbol:
+        return f"{symbol}{amount:.{places}f}"
+    return f"{amount:.{places}f} {currency}"
+
+
+@lru_cache(maxsize=65536)
+def format_minor_units(minor: int, currency: str = DEFAULT_CURRENCY, symbol: bool = True) -> str:
+    """Format integer minor units like format_currency, without a Decimal round trip.
     
-    for expense in expenses:
-        print(f"{expense['id']:<4} {expense['date']:<12} "
-              f"{expense['description'][:18]:<20} {format_currency(expense['amount']):<10} "
-              f"{expense['category'][:13]:<15}")
+    With ``symbol=False`` only the number is returned (``1234`` -> ``"12.34"``).
+    Listings repeat the same amounts a lot, so labels are cached.
+    """
+    places = MINOR_UNITS.get(currency, 2)
+    if places:
+        whole, fraction = divmod(abs(minor), 10 ** places)
+        number = f"{'-' if minor < 0 else ''}{whole}.{fraction:0{places}d}"
+    else:
+        number = str(minor)
+    if not symbol:
+        return number
+    prefix = CURRENCY_SYMBOLS.get(currency)
+    return f"{prefix}{number}" if prefix else f"{number} {currency}"
+
+
+def render_expense_table(expenses: Iterable[Dict], fmt: str = 'table') -> Iterator[str]:
+    """Yield an expense listing line by line in one of TABLE_FORMATS."""
+    if fmt in ('json', 'ndjson'):
+        return render_records(expenses, fmt)
+    if fmt == 'tsv':
+        return render_rows(tuple(CSV_FIELDS), ((exp['id'], exp['date'], tsv_cell(exp['description']),
+                                                format_minor_units(exp['amount_cents'], exp['currency'], False),
+                                                exp['currency'], tsv_cell(exp['category']))
+                                               for exp in expenses))
+    return render_rows(EXPENSE_HEADERS, ((exp['id'], exp['date'], exp['description'][:18],
+                                          format_minor_units(exp['amount_cents'], exp['currency']),
+                                          exp['category'][:13])
+                                         for exp in expenses), EXPENSE_WIDTHS)
+
+
+def display_expenses(expenses: Iterable[Dict], fmt: str = 'table', stream=None):
+    """Display expenses as a table, TSV, JSON or NDJSON."""
+    stream = stream if stream is not None else sys.stdout
+    if fmt == 'table' and not expenses:
+        print("No expenses found.", file=stream)
+        return
+    write_chunked(render_expense_table(expenses, fmt), stream)
 
 
 def display_summary(summary: Dict):
     """Display expense summary."""
-    if summary['month']:
+    currency = summary.get('currency', DEFAULT_CURRENCY)
+    if summary.get('last_days'):
+        print(f"Total expenses for the last {summary['last_days']} days: {format_currency(summary['total'], currency)}")
+    elif summary['month']:
         month_name = datetime(2024, summary['month'], 1).strftime('%B')
-        print(f"Total expenses for {month_name}: {format_currency(summary['total'])}")
+        if summary.get('year') not in (None, datetime.now().year):
+            month_name += f" {summary['year']}"
+        print(f"Total expenses for {month_name}: {format_currency(summary['total'], currency)}")
+    elif summary.get('year'):
+        print(f"Total expenses for {summary['year']}: {format_currency(summary['total'], currency)}")
+    elif summary.get('start') or summary.get('end'):
+        first = summary['start'].isoformat() if summary['start'] else 'the beginning'
+        last = summary['end'].isoformat() if summary['end'] else 'today'
+        print(f"Total expenses from {first} to {last}: {format_currency(summary['total'], currency)}")
     else:
-        print(f"Total expenses: {format_currency(summary['total'])}")
+        print(f"Total expenses: {format_currency(summary['total'], currency)}")
     
     print(f"Number of expenses: {summary['count']}")
     
     if summary['category_totals']:
         print("\nBy category:")
         for category, total in summary['category_totals'].items():
-            print(f"  {category}: {format_currency(total)}")
+            print(f"  {category}: {format_currency(total, currency)}")
+
+
+def display_budgets(status: List[Dict], currency: str = DEFAULT_CURRENCY):
+    """Display budget utilization in a formatted table."""
+    if not status:
+        print("No budgets set.")
+        return
+    
+    print(f"Budgets for {status[0]['month']}")
+    print(f"{'Category':<15} {'Budget':>12} {'Spent':>12} {'Used':>7} {'Trailing avg':>14}")
+    print("-" * 64)
+    
+    for row in status:
+        print(f"{row['category'][:13]:<15} {format_currency(row['limit'], currency):>12} "
+              f"{format_currency(row['spent'], currency):>12} {row['used_percent']:>6.0f}% "
+              f"{format_currency(row['trailing_average'], currency):>14}")
+
+
+def display_ledger_timings(results: List[Dict], wall_seconds: float):
+    """Display per-ledger counts, totals and timings, then the wall-clock time."""
+    print(f"{'Ledger':<40} {'Expenses':>9} {'Total':>14} {'Time':>10}")
+    print("-" * 76)
+    
+    for result in results:
+        ledger = result['ledger'] if len(result['ledger']) <= 40 else "..." + result['ledger'][-37:]
+        if 'error' in result:
+            print(f"{ledger:<40} Error: {result['error']}")
+            continue
+        print(f"{ledger:<40} {result['count']:>9} "
+              f"{format_currency(result['total'], result['currency']):>14} {result['seconds'] * 1000:>8.1f}ms")
+    
+    busy = sum(result['seconds'] for result in results)
+    print(f"\n{len(results)} ledgers in {wall_seconds * 1000:.1f}ms wall clock "
+          f"({busy * 1000:.1f}ms summed across ledgers)\n")
+
+
+def parse_amount(value: str) -> Decimal:
+    """argparse type for amounts, kept exact as Decimal."""
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise argparse.ArgumentTypeError(f"invalid amount '{value}'")
+    if not amount.is_finite():
+        raise argparse.ArgumentTypeError(f"invalid amount '{value}'")
+    return amount
+
+
+def parse_date(value: str) -> date:
+    """argparse type for YYYY-MM-DD dates."""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}' (expected YYYY-MM-DD)")
 
 
 def main():
@@ -196,25 +1933,44 @@ Examples:
   expense-tracker list
   expense-tracker summary
   expense-tracker summary --month 8
+  expense-tracker summary --month 8 --year 2023
+  expense-tracker summary --from 2024-01-15 --to 2024-03-15
+  expense-tracker summary --last 30
+  expense-tracker summary --ledgers "teams/*.json" --year 2024
   expense-tracker update --id 1 --amount 25
   expense-tracker delete --id 2
   expense-tracker export
+  expense-tracker export --format ndjson --gzip --from 2024-01-01 --filename 2024.ndjson.gz
+  expense-tracker export --category Food --filename -
+  expense-tracker import old_expenses.csv
+  expense-tracker rebuild-rollups
+  expense-tracker migrate
+  expense-tracker migrate --to partitioned
+  expense-tracker --storage partitioned compact
+  expense-tracker budget set --category Food --limit 300
+  expense-tracker budget show --month 8
+  expense-tracker --storage sqlite summary --year 2024
         """
     )
     
+    parser.add_argument('--storage', choices=list(STORAGE_BACKENDS),
+                        help='Storage engine (default: $EXPENSE_STORAGE or json)')
+    parser.add_argument('--currency', type=str.upper,
+                        help="Currency of a new ledger (default: $EXPENSE_CURRENCY or USD); "
+                             "an existing ledger keeps the currency of its expenses")
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
     # Add command
     add_parser = subparsers.add_parser('add', help='Add a new expense')
     add_parser.add_argument('--description', required=True, help='Expense description')
-    add_parser.add_argument('--amount', type=float, required=True, help='Expense amount')
+    add_parser.add_argument('--amount', type=parse_amount, required=True, help='Expense amount')
     add_parser.add_argument('--category', default='General', help='Expense category')
     
     # Update command
     update_parser = subparsers.add_parser('update', help='Update an existing expense')
     update_parser.add_argument('--id', type=int, required=True, help='Expense ID')
     update_parser.add_argument('--description', help='New description')
-    update_parser.add_argument('--amount', type=float, help='New amount')
+    update_parser.add_argument('--amount', type=parse_amount, help='New amount')
     update_parser.add_argument('--category', help='New category')
     
     # Delete command
@@ -224,14 +1980,73 @@ Examples:
     # List command
     list_parser = subparsers.add_parser('list', help='List all expenses')
     list_parser.add_argument('--category', help='Filter by category')
+    list_parser.add_argument('--from', dest='start', type=parse_date, help='First date (YYYY-MM-DD)')
+    list_parser.add_argument('--to', dest='end', type=parse_date, help='Last date (YYYY-MM-DD)')
+    list_parser.add_argument('--format', dest='fmt', choices=TABLE_FORMATS, default='table',
+                             help='Output format (default: table)')
     
     # Summary command
     summary_parser = subparsers.add_parser('summary', help='Show expense summary')
     summary_parser.add_argument('--month', type=int, help='Month (1-12) for monthly summary')
+    summary_parser.add_argument('--year', type=int, help='Year for a yearly summary, or the year of --month')
+    summary_parser.add_argument('--from', dest='start', type=parse_date, help='First date (YYYY-MM-DD)')
+    summary_parser.add_argument('--to', dest='end', type=parse_date, help='Last date (YYYY-MM-DD)')
+    summary_parser.add_argument('--last', dest='last_days', type=int, metavar='DAYS',
+                                help='Rolling window ending today, e.g. 7, 30 or 90')
+    summary_parser.add_argument('--engine', choices=SUMMARY_ENGINES, default='auto',
+                                help='Aggregation engine (auto answers from the stored rollups)')
+    summary_parser.add_argument('--ledgers', metavar='GLOB',
+                                help='Summarize every ledger matching GLOB in parallel and merge the totals')
+    summary_parser.add_argument('--workers', type=int,
+                                help='Processes used with --ledgers (default: one per CPU)')
+    
+    # Budget command
+    budget_parser = subparsers.add_parser('budget', help='Set monthly budgets and show utilization')
+    budget_subparsers = budget_parser.add_subparsers(dest='budget_command')
+    budget_set = budget_subparsers.add_parser('set', help='Set the monthly budget for a category')
+    budget_set.add_argument('--category', required=True, help='Category')
+    budget_set.add_argument('--limit', type=parse_amount, required=True, help='Monthly limit')
+    budget_remove = budget_subparsers.add_parser('remove', help="Remove a category's budget")
+    budget_remove.add_argument('--category', required=True, help='Category')
+    budget_spike = budget_subparsers.add_parser('spike', help='Configure spending spike alerts')
+    budget_spike.add_argument('--factor', type=float, required=True,
+                              help='Alert when a month exceeds this multiple of the trailing average (0 disables)')
+    budget_spike.add_argument('--months', type=int, default=3, help='Months in the trailing average (default: 3)')
+    budget_show = budget_subparsers.add_parser('show', help='Show budget utilization (the default)')
+    budget_show.add_argument('--month', type=int, help='Month (1-12, default: current month)')
+    budget_show.add_argument('--year', type=int, help='Year (default: current year)')
+    
+    # Migrate command
+    migrate_parser = subparsers.add_parser('migrate', help='Copy expenses.json into the SQLite or partitioned store')
+    migrate_parser.add_argument('json_file', nargs='?', default='expenses.json',
+                                help='JSON store to migrate (default: expenses.json)')
+    migrate_parser.add_argument('--to', choices=['sqlite', 'partitioned'], default='sqlite',
+                                help='Store to migrate into (default: sqlite)')
+    
+    # Compact command
+    subparsers.add_parser('compact', help='Rewrite closed months of the partitioned store in columnar form')
+    
+    # Rebuild rollups command
+    subparsers.add_parser('rebuild-rollups', help='Recompute the stored summary rollups')
     
     # Export command
-    export_parser = subparsers.add_parser('export', help='Export expenses to CSV')
-    export_parser.add_argument('--filename', help='Output filename (optional)')
+    export_parser = subparsers.add_parser('export', help='Export expenses to CSV or NDJSON')
+    export_parser.add_argument('--filename', help="Output filename (optional, '-' for stdout)")
+    export_parser.add_argument('--format', choices=EXPORT_FORMATS,
+                               help='Output format (default: from the filename, else csv)')
+    export_parser.add_argument('--gzip', action='store_true', help='Compress the output with gzip')
+    export_parser.add_argument('--category', help='Only export this category')
+    export_parser.add_argument('--from', dest='start', type=parse_date, help='First date (YYYY-MM-DD)')
+    export_parser.add_argument('--to', dest='end', type=parse_date, help='Last date (YYYY-MM-DD)')
+    
+    # Import command
+    import_parser = subparsers.add_parser('import', help='Import expenses from CSV or NDJSON')
+    import_parser.add_argument('filename', help="Input file ('-' for stdin; .gz files are decompressed)")
+    import_parser.add_argument('--format', choices=EXPORT_FORMATS,
+                               help='Input format (default: from the filename, else csv)')
+    import_parser.add_argument('--gzip', action='store_true', help='Input is gzip-compressed')
+    import_parser.add_argument('--batch-size', type=int, default=1000,
+                               help='Rows saved per commit (default: 1000)')
     
     args = parser.parse_args()
     
@@ -239,12 +2054,20 @@ Examples:
         parser.print_help()
         return
     
-    tracker = ExpenseTracker()
+    try:
+        storage = args.to if args.command == 'migrate' else args.storage
+        tracker = make_tracker(storage=storage, engine=getattr(args, 'engine', 'auto'),
+                               currency=args.currency)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     
     try:
         if args.command == 'add':
             expense_id = tracker.add_expense(args.description, args.amount, args.category)
             print(f"Expense added successfully (ID: {expense_id})")
+            for alert in tracker.alerts:
+                print(f"Alert: {alert}")
         
         elif args.command == 'update':
             if not any([args.description, args.amount, args.category]):
@@ -253,6 +2076,8 @@ Examples:
             
             if tracker.update_expense(args.id, args.description, args.amount, args.category):
                 print(f"Expense updated successfully (ID: {args.id})")
+                for alert in tracker.alerts:
+                    print(f"Alert: {alert}")
             else:
                 print(f"Error: Expense with ID {args.id} not found")
         
@@ -263,20 +2088,85 @@ Examples:
                 print(f"Error: Expense with ID {args.id} not found")
         
         elif args.command == 'list':
-            expenses = tracker.list_expenses(args.category)
-            display_expenses(expenses)
+            expenses = tracker.list_expenses(args.category, args.start, args.end)
+            display_expenses(expenses, args.fmt)
+        
+        elif args.command == 'summary' and args.ledgers:
+            if args.workers is not None and args.workers < 1:
+                raise ValueError("Workers must be at least 1")
+            period = {'month': args.month, 'year': args.year, 'start': args.start,
+                      'end': args.end, 'last_days': args.last_days}
+            merged, results, wall_seconds = summarize_ledgers(args.ledgers, period, args.engine, args.workers)
+            display_ledger_timings(results, wall_seconds)
+            display_summary(merged)
+            if any('error' in result for result in results):
+                sys.exit(1)
         
         elif args.command == 'summary':
-            summary = tracker.get_summary(args.month)
+            summary = tracker.get_summary(args.month, args.year, args.start, args.end, args.last_days)
             display_summary(summary)
         
+        elif args.command == 'budget':
+            if args.budget_command == 'set':
+                tracker.set_budget(args.category, args.limit)
+                print(f"Budget for {args.category} set to {format_currency(args.limit, tracker.currency)} per month")
+            elif args.budget_command == 'remove':
+                if tracker.remove_budget(args.category):
+                    print(f"Budget for {args.category} removed")
+                else:
+                    print(f"Error: No budget set for {args.category}")
+            elif args.budget_command == 'spike':
+                tracker.set_spike_rule(args.factor, args.months)
+                if args.factor:
+                    print(f"Spike alerts at {args.factor:g}x the {args.months}-month average")
+                else:
+                    print("Spike alerts disabled")
+            else:
+                if args.budget_command == 'show' and args.month is not None and not 1 <= args.month <= 12:
+                    raise ValueError("Month must be between 1 and 12")
+                month = getattr(args, 'month', None)
+                year = getattr(args, 'year', None)
+                display_budgets(tracker.budget_status(month, year), tracker.currency)
+        
+        elif args.command == 'migrate':
+            if not os.path.exists(args.json_file):
+                print(f"Error: {args.json_file} not found")
+                sys.exit(1)
+            count = tracker.import_json(args.json_file)
+            target = tracker.db_file if args.to == 'sqlite' else tracker.directory
+            print(f"Migrated {count} expenses from {args.json_file} to {target}")
+            print(f"Use --storage {args.to} or set EXPENSE_STORAGE={args.to} to use it")
+        
+        elif args.command == 'compact':
+            count = tracker.compact()
+            print(f"Compacted {count} monthly partitions")
+        
+        elif args.command == 'rebuild-rollups':
+            cells = tracker.rebuild_rollups()
+            print(f"Rollups rebuilt ({cells} month/category totals)")
+        
         elif args.command == 'export':
-            filename = tracker.export_to_csv(args.filename)
-            print(f"Expenses exported to {filename}")
+            filename, count = tracker.export_expenses(args.filename, args.format, args.gzip,
+                                                      args.category, args.start, args.end)
+            if filename != '-':
+                print(f"{count} expenses exported to {filename}")
+        
+        elif args.command == 'import':
+            imported, errors = tracker.import_expenses(args.filename, args.format,
+                                                       args.batch_size, args.gzip)
+            for line_number, message in errors[:20]:
+                print(f"Skipped line {line_number}: {message}", file=sys.stderr)
+            if len(errors) > 20:
+                print(f"... and {len(errors) - 20} more invalid rows", file=sys.stderr)
+            print(f"Imported {imported} expenses ({len(errors)} rows skipped)")
     
     except ValueError as e:
         print(f"Error: {e}")
         sys.exit(1)
+    except BrokenPipeError:
+        # The reader of a streamed export went away (e.g. piped into head)
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
     except Exception as e:
         print(f"Unexpected error: {e}")
         sys.exit(1)
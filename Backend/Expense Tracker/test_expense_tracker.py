@@ -0,0 +1,546 @@
+"""Tests for the Expense Tracker (run with ``python -m pytest``)."""
+
+import contextlib
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+from expense_tracker import (CSV_FIELDS, STORAGE_BACKENDS, ExpenseTracker, _shift_month, iter_json_array, main,
+                             make_tracker, merge_summaries, np, summarize_ledgers, validate_record)
+
+
+class BudgetAlertTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="expense-test-")
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def tracker(self, storage, history=()):
+        """A fresh tracker for ``storage`` holding ``(months_ago, amount)`` Food expenses."""
+        directory = tempfile.mkdtemp(dir=self.directory)
+        legacy = os.path.join(directory, "legacy.json")
+        this_month = date.today().isoformat()[:7]
+        with open(legacy, 'w') as f:
+            json.dump([{'id': i, 'description': 'Groceries', 'amount': amount, 'category': 'Food',
+                        'date': _shift_month(this_month, -months_ago) + '-15'}
+                       for i, (months_ago, amount) in enumerate(history, 1)], f)
+        tracker = make_tracker(os.path.join(directory, "expenses.json"), storage)
+        if storage == 'json':
+            os.replace(legacy, tracker.data_file)
+            tracker = make_tracker(tracker.data_file, storage)
+        else:
+            tracker.import_json(legacy)
+        tracker.set_spike_rule(0, 3)
+        return tracker
+    
+    def alerts_after(self, tracker, amount, category="Food"):
+        tracker.add_expense("Groceries", amount, category)
+        return tracker.alerts
+    
+    def test_budget_alerts_fire_once_per_crossing(self):
+        for storage in STORAGE_BACKENDS:
+            with self.subTest(storage=storage):
+                tracker = self.tracker(storage)
+                tracker.set_budget("Food", 100)
+                self.assertEqual(self.alerts_after(tracker, 70), [])
+                self.assertEqual(self.alerts_after(tracker, 20, "Transport"), [])
+                [warning] = self.alerts_after(tracker, 15, "food")
+                self.assertIn("has used 85% of its", warning)
+                self.assertEqual(self.alerts_after(tracker, 10), [])
+                [over] = self.alerts_after(tracker, 10)
+                self.assertIn("is over its", over)
+                self.assertEqual(self.alerts_after(tracker, 5), [])
+                
+                [status] = tracker.budget_status()
+                self.assertEqual((status['category'], status['spent']), ("Food", 110))
+                self.assertTrue(tracker.remove_budget("FOOD"))
+                self.assertEqual(tracker.budget_status(), [])
+    
+    def test_update_that_crosses_budget_alerts(self):
+        tracker = self.tracker('json')
+        tracker.set_budget("Food", 50)
+        tracker.add_expense("Groceries", 30, "Food")
+        tracker.update_expense(1, amount=60)
+        [over] = tracker.alerts
+        self.assertIn("is over its", over)
+        tracker.update_expense(1, amount=40)
+        self.assertEqual(tracker.alerts, [])
+    
+    def test_spike_against_trailing_average(self):
+        for storage in STORAGE_BACKENDS:
+            with self.subTest(storage=storage):
+                # Trailing three-month average of 100; a fourth month back is ignored
+                tracker = self.tracker(storage, [(1, 90), (2, 100), (3, 110), (4, 5000)])
+                tracker.set_spike_rule(2, 3)
+                self.assertEqual(self.alerts_after(tracker, 150), [])
+                [spike] = self.alerts_after(tracker, 60)
+                self.assertIn("more than 2x its 3-month average ($100.00)", spike)
+                self.assertEqual(self.alerts_after(tracker, 10), [])
+                self.assertEqual(self.alerts_after(tracker, 500, "Travel"), [])
+                
+                tracker.set_spike_rule(0, 3)
+                reloaded = make_tracker(tracker.data_file, storage)
+                self.assertEqual(reloaded.budgets.spike_factor, 0)
+                self.assertEqual(self.alerts_after(reloaded, 1000), [])
+    
+    def test_invalid_budget_settings(self):
+        tracker = self.tracker('json')
+        with self.assertRaisesRegex(ValueError, "Budget must be positive"):
+            tracker.set_budget("Food", 0)
+        with self.assertRaisesRegex(ValueError, "Spike factor"):
+            tracker.set_spike_rule(-1, 3)
+
+
+class ListFormatTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="expense-test-")
+        self.cwd = os.getcwd()
+        os.chdir(self.directory)
+        tracker = ExpenseTracker("expenses.json")
+        tracker.add_expense("Lunch", "12.50", "Food")
+        tracker.add_expense("Bus\tticket", "2.25", "Transport")
+    
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def run_cli(self, *args):
+        # A StringIO is not a terminal, like a pipe or a redirected file
+        with mock.patch('sys.argv', ['expense_tracker.py', 'list', *args]), \
+                contextlib.redirect_stdout(io.StringIO()) as output:
+            main()
+        return output.getvalue()
+    
+    def test_piped_list_defaults_to_table(self):
+        output = self.run_cli()
+        self.assertEqual(output, self.run_cli('--format', 'table'))
+        self.assertRegex(output, r"^ID +Date +Description +Amount +Category +\n---")
+        self.assertIn("$12.50", output)
+        self.assertEqual(self.run_cli('--category', 'Travel'), "No expenses found.\n")
+    
+    def test_tsv(self):
+        lines = self.run_cli('--format', 'tsv').splitlines()
+        self.assertEqual(lines[0].split('\t'), CSV_FIELDS)
+        self.assertEqual([line.split('\t')[2:] for line in lines[1:]],
+                         [['Lunch', '12.50', 'USD', 'Food'], ['Bus ticket', '2.25', 'USD', 'Transport']])
+    
+    def test_json_and_ndjson(self):
+        expenses = json.loads(self.run_cli('--format', 'json'))
+        self.assertEqual([(exp['description'], exp['amount_cents']) for exp in expenses],
+                         [('Lunch', 1250), ('Bus\tticket', 225)])
+        lines = self.run_cli('--format', 'ndjson', '--category', 'food').splitlines()
+        self.assertEqual([json.loads(line) for line in lines], expenses[:1])
+
+
+class ExportImportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="expense-test-")
+        self.tracker = ExpenseTracker(os.path.join(self.directory, "expenses.json"))
+        for description, amount, category in (("Lunch", 12.5, "Food"), ("Bus, return", 2.25, "Transport"),
+                                              ('Say "cheese"', 9.75, "Fun")):
+            self.tracker.add_expense(description, amount, category)
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def path(self, name):
+        return os.path.join(self.directory, name)
+    
+    def fields(self, expenses):
+        return [(exp['description'], exp['amount_cents'], exp['currency'], exp['category'], exp['date'])
+                for exp in expenses]
+    
+    def assertRoundTrip(self, filename, **options):
+        _, count = ExpenseTracker(self.tracker.data_file).export_expenses(filename, **options)
+        self.assertEqual(count, 3)
+        target = ExpenseTracker(self.path("imported.json"))
+        imported, errors = target.import_expenses(filename, fmt=options.get('fmt'),
+                                                  compress=options.get('compress', False))
+        self.assertEqual((imported, errors), (3, []))
+        self.assertEqual(self.fields(ExpenseTracker(target.data_file).expenses), self.fields(self.tracker.expenses))
+        os.remove(target.data_file)
+    
+    def test_csv_and_ndjson_round_trip(self):
+        self.assertRoundTrip(self.path("out.csv"))
+        self.assertRoundTrip(self.path("out.ndjson"))
+    
+    def test_gzip_round_trip(self):
+        self.assertRoundTrip(self.path("out.ndjson.gz"))
+        self.assertRoundTrip(self.path("out.csv"), compress=True)
+        with gzip.open(self.path("out.ndjson.gz"), 'rt') as f:
+            self.assertEqual(json.loads(f.readline())['description'], "Lunch")
+    
+    def test_stdout_and_stdin_round_trip(self):
+        stdout = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+        with mock.patch('sys.stdout', stdout):
+            filename, count = self.tracker.export_expenses('-', 'ndjson', category='food')
+        self.assertEqual((filename, count), ('-', 1))
+        self.assertFalse(stdout.closed)
+        data = stdout.buffer.getvalue()
+        self.assertEqual(json.loads(data)['description'], "Lunch")
+        
+        target = ExpenseTracker(self.path("imported.json"))
+        stdin = io.TextIOWrapper(io.BytesIO(gzip.compress(data)), encoding='utf-8')
+        with mock.patch('sys.stdin', stdin):
+            self.assertEqual(target.import_expenses('-', 'ndjson', compress=True), (1, []))
+        self.assertEqual(self.fields(target.expenses), self.fields(self.tracker.expenses[:1]))
+    
+    def test_import_reports_invalid_rows_and_saves_in_batches(self):
+        source = self.path("in.ndjson")
+        with open(source, 'w') as f:
+            f.write('{"description": "Tea", "amount": 2}\n'
+                    'not json\n'
+                    '{"description": "Cake", "amount": -1}\n'
+                    '\n'
+                    '{"Description": "Soup", "Amount": "4.5", "Date": "2024-01-02"}\n')
+        saves = []
+        with mock.patch.object(ExpenseTracker, 'save_expenses', lambda tracker: saves.append(1)):
+            imported, errors = self.tracker.import_expenses(source, batch_size=1)
+        self.assertEqual(imported, 2)
+        self.assertEqual([line for line, _ in errors], [2, 3])
+        self.assertIn("amount must be positive", errors[1][1])
+        self.assertEqual(len(saves), 2)
+        self.assertEqual(self.tracker.expenses[-1]['date'], '2024-01-02')
+    
+    def test_json_array_is_read_in_chunks(self):
+        expenses = list(iter_json_array(self.tracker.data_file, chunk_size=7))
+        self.assertEqual(expenses, self.tracker.expenses)
+
+
+class RollupTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="expense-test-")
+        self.data_file = os.path.join(self.directory, "expenses.json")
+        self.rollup_file = os.path.join(self.directory, "expenses.rollups.json")
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def test_rollups_track_changes_and_survive_reload(self):
+        tracker = ExpenseTracker(self.data_file, engine='rollup')
+        tracker.add_expense("Lunch", 12.5, "Food")
+        tracker.add_expense("Bus", 2.5, "Transport")
+        tracker.add_expense("Dinner", 30.0, "Food")
+        tracker.update_expense(3, amount=20.0)
+        tracker.delete_expense(2)
+        expected = ExpenseTracker(self.data_file, engine='python').get_summary(month=date.today().month)
+        
+        reloaded = ExpenseTracker(self.data_file, engine='rollup')
+        self.assertTrue(reloaded.rollups.ready)
+        self.assertEqual(reloaded.get_summary(month=date.today().month), expected)
+        self.assertEqual(reloaded.get_summary()['category_totals'], {'Food': 32.5})
+        # Answered from the rollup file alone
+        self.assertIsNone(reloaded._expenses)
+    
+    def test_stale_rollups_are_rebuilt(self):
+        tracker = ExpenseTracker(self.data_file, engine='rollup')
+        tracker.add_expense("Lunch", 12.5, "Food")
+        # Edit the expenses file behind the tracker's back
+        with open(self.data_file) as f:
+            expenses = json.load(f)
+        expenses.append(dict(expenses[0], id=2, amount_cents=725, category='Coffee'))
+        with open(self.data_file, 'w') as f:
+            json.dump(expenses, f)
+        
+        reloaded = ExpenseTracker(self.data_file, engine='rollup')
+        self.assertFalse(reloaded.rollups.ready)
+        summary = reloaded.get_summary()
+        self.assertEqual((summary['total'], summary['count']), (19.75, 2))
+        self.assertEqual(summary['category_totals'], {'Food': 12.5, 'Coffee': 7.25})
+        with open(self.rollup_file) as f:
+            self.assertEqual(json.load(f)['source'], [os.path.getsize(self.data_file),
+                                                      os.stat(self.data_file).st_mtime_ns])
+        self.assertTrue(ExpenseTracker(self.data_file, engine='rollup').rollups.ready)
+    
+    def test_missing_rollup_file_is_rebuilt(self):
+        ExpenseTracker(self.data_file, engine='rollup').add_expense("Lunch", 12.5, "Food")
+        os.remove(self.rollup_file)
+        tracker = ExpenseTracker(self.data_file, engine='rollup')
+        self.assertEqual(tracker.get_summary()['total'], 12.5)
+        self.assertTrue(os.path.exists(self.rollup_file))
+    
+    def test_other_backends_leave_json_sidecars_unread(self):
+        tracker = ExpenseTracker(self.data_file)
+        tracker.add_expense("Lunch", 12.5, "Food")
+        tracker.set_budget("Food", 100)
+        for storage in ('sqlite', 'partitioned'):
+            with self.subTest(storage=storage):
+                tracker = STORAGE_BACKENDS[storage](self.data_file)
+                tracker.add_expense("Bus", 2.5, "Transport")
+                self.assertEqual(tracker.get_summary()['total'], 2.5)
+                self.assertEqual(len(tracker.list_expenses()), 1)
+                self.assertIsNone(tracker._rollups)
+                # Budgets are read for the alert check on a write, never on open
+                self.assertIsNotNone(tracker._budgets)
+                self.assertIsNone(STORAGE_BACKENDS[storage](self.data_file)._budgets)
+
+
+class DateRangeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="expense-test-")
+        self.data_file = os.path.join(self.directory, "expenses.json")
+        rows = [
+            ("Lunch", 12.5, "Food", "2023-12-31"),
+            ("Bus", 2.25, "Transport", "2024-01-01"),
+            ("Dinner", 40.0, "Food", "2024-01-15"),
+            ("Cinema", 9.75, "Fun", "2024-02-29"),
+            ("Coffee", 3.5, "food", "2024-03-01"),
+            ("Taxi", 18.0, "Transport", "2024-12-31"),
+        ]
+        expenses = [
+            {'id': i, 'description': d, 'amount': a, 'category': c, 'date': day}
+            for i, (d, a, c, day) in enumerate(rows, 1)
+        ]
+        with open(self.data_file, 'w') as f:
+            json.dump(expenses, f)
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def engines(self):
+        return ('rollup', 'python', 'numpy') if np is not None else ('rollup', 'python')
+    
+    def totals(self, **query):
+        """(total, count) of the summary for ``query``, checked to agree across engines."""
+        results = set()
+        for engine in self.engines():
+            summary = ExpenseTracker(self.data_file, engine=engine).get_summary(**query)
+            results.add((summary['total'], summary['count']))
+        self.assertEqual(len(results), 1, results)
+        return results.pop()
+    
+    def test_year(self):
+        self.assertEqual(self.totals(year=2024), (73.5, 5))
+        self.assertEqual(self.totals(year=2023), (12.5, 1))
+        self.assertEqual(self.totals(month=2, year=2024), (9.75, 1))
+    
+    def test_ranges(self):
+        # Whole months (answered from the rollups) and partial months (answered from the index)
+        self.assertEqual(self.totals(start=date(2024, 1, 1), end=date(2024, 2, 29)), (52.0, 3))
+        self.assertEqual(self.totals(start=date(2023, 12, 31), end=date(2024, 1, 1)), (14.75, 2))
+        self.assertEqual(self.totals(start=date(2024, 2, 29)), (31.25, 3))
+        self.assertEqual(self.totals(end=date(2024, 1, 14)), (14.75, 2))
+        self.assertEqual(self.totals(start=date(2025, 1, 1)), (0, 0))
+    
+    def test_last_days(self):
+        tracker = ExpenseTracker(self.data_file)
+        tracker.add_expense("Today", 4.0, "Food")
+        summary = tracker.get_summary(last_days=7)
+        self.assertEqual((summary['total'], summary['count']), (4.0, 1))
+        self.assertEqual(summary['start'], date.today() - timedelta(days=6))
+    
+    def test_invalid_periods(self):
+        tracker = ExpenseTracker(self.data_file)
+        with self.assertRaisesRegex(ValueError, "Start date must not be after end date"):
+            tracker.get_summary(start=date(2024, 2, 1), end=date(2024, 1, 1))
+        with self.assertRaisesRegex(ValueError, "cannot be combined"):
+            tracker.get_summary(year=2024, start=date(2024, 1, 1))
+        with self.assertRaisesRegex(ValueError, "cannot be combined"):
+            tracker.get_summary(last_days=7, month=1)
+        with self.assertRaisesRegex(ValueError, "must be positive"):
+            tracker.get_summary(last_days=0)
+    
+    def test_list_range_and_category(self):
+        tracker = ExpenseTracker(self.data_file)
+        listed = tracker.list_expenses(start=date(2024, 1, 1), end=date(2024, 3, 1))
+        self.assertEqual([exp['id'] for exp in listed], [2, 3, 4, 5])
+        listed = tracker.list_expenses(category="FOOD", start=date(2024, 1, 1))
+        self.assertEqual([exp['id'] for exp in listed], [3, 5])
+        tracker.delete_expense(3)
+        self.assertEqual([exp['id'] for exp in tracker.list_expenses(category="food")], [1, 5])
+
+
+@unittest.skipIf(np is None, "the numpy engine needs NumPy")
+class SummaryEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="expense-test-")
+        self.data_file = os.path.join(self.directory, "expenses.json")
+        year = date.today().year
+        rows = [
+            ("Lunch", 12.3, "Food", date(year, 1, 31)),
+            ("Bus", 2.75, "Transport", date(year, 2, 1)),
+            ("Dinner", 40.1, "Food", date(year, 2, 28)),
+            ("Cinema", 9.99, "Fun", date(year, 12, 31)),
+            ("Old lunch", 11.0, "Food", date(year - 1, 2, 14)),
+        ]
+        expenses = [
+            {'id': i, 'description': d, 'amount': a, 'category': c, 'date': day.isoformat()}
+            for i, (d, a, c, day) in enumerate(rows, 1)
+        ]
+        with open(self.data_file, 'w') as f:
+            json.dump(expenses, f)
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def assertEnginesAgree(self, **query):
+        python = ExpenseTracker(self.data_file, engine='python').get_summary(**query)
+        columns = ExpenseTracker(self.data_file, engine='numpy').get_summary(**query)
+        self.assertEqual(columns, python)
+        self.assertEqual(list(columns['category_totals']), list(python['category_totals']))
+        return columns
+    
+    def test_overall_summary(self):
+        summary = self.assertEnginesAgree()
+        self.assertEqual(summary['count'], 5)
+    
+    def test_month_summaries(self):
+        for month in range(1, 13):
+            with self.subTest(month=month):
+                self.assertEnginesAgree(month=month)
+        self.assertEqual(self.assertEnginesAgree(month=2)['count'], 2)
+        self.assertEqual(self.assertEnginesAgree(month=3)['count'], 0)
+    
+    def test_year_and_range_summaries(self):
+        year = date.today().year
+        self.assertEqual(self.assertEnginesAgree(year=year)['count'], 4)
+        self.assertEqual(self.assertEnginesAgree(year=year - 1)['count'], 1)
+        self.assertEqual(self.assertEnginesAgree(start=date(year, 1, 31), end=date(year, 2, 28))['count'], 3)
+        self.assertEnginesAgree(start=date(year, 2, 1))
+        self.assertEnginesAgree(end=date(year, 1, 31))
+    
+    def test_summary_after_add(self):
+        tracker = ExpenseTracker(self.data_file, engine='numpy')
+        tracker.get_summary()
+        tracker.add_expense("Coffee", 3.5, "Food")
+        self.assertEqual(tracker.get_summary()['count'], 6)
+        self.assertEnginesAgree(month=date.today().month)
+    
+    def test_currency_rounding(self):
+        # Legacy float amounts are rounded half up to the minor unit before any engine sums them
+        year = date.today().year
+        expenses = [
+            {'id': 1, 'description': 'A', 'amount': 0.1, 'category': 'Food', 'date': f"{year}-03-01"},
+            {'id': 2, 'description': 'B', 'amount': 0.2, 'category': 'Food', 'date': f"{year}-03-02"},
+            {'id': 3, 'description': 'C', 'amount': 2.675, 'category': 'Fun', 'date': f"{year}-03-03"},
+            {'id': 4, 'description': 'D', 'amount': 1.005, 'category': 'Fun', 'date': f"{year}-04-01"},
+        ]
+        with open(self.data_file, 'w') as f:
+            json.dump(expenses, f)
+        summary = self.assertEnginesAgree(month=3)
+        self.assertEqual(str(summary['total']), '2.98')
+        self.assertEqual(summary['category_cents'], {'Food': 30, 'Fun': 268})
+        summary = self.assertEnginesAgree(start=date(year, 3, 3), end=date(year, 4, 1))
+        self.assertEqual(str(summary['total']), '3.69')
+        rollup = ExpenseTracker(self.data_file, engine='rollup').get_summary(year=year)
+        self.assertEqual(rollup, self.assertEnginesAgree(year=year))
+        
+        with open(self.data_file, 'w') as f:
+            json.dump([dict(expenses[0], amount=1234.5, currency='JPY')], f)
+        python = ExpenseTracker(self.data_file, engine='python', currency='JPY').get_summary()
+        columns = ExpenseTracker(self.data_file, engine='numpy', currency='JPY').get_summary()
+        self.assertEqual(columns, python)
+        self.assertEqual(str(columns['total']), '1235')
+
+
+class CurrencyTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="expense-test-")
+        self.data_file = os.path.join(self.directory, "expenses.json")
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def write_ledger(self, path, expenses):
+        with open(path, 'w') as f:
+            json.dump(expenses, f)
+    
+    def expense(self, expense_id, amount_cents, currency):
+        return {'id': expense_id, 'description': 'Lunch', 'amount_cents': amount_cents,
+                'currency': currency, 'category': 'Food', 'date': '2024-03-05'}
+    
+    def test_ledger_uses_currency_of_its_expenses(self):
+        self.write_ledger(self.data_file, [self.expense(1, 100, 'JPY')])
+        summary = ExpenseTracker(self.data_file, commit_window=0).get_summary()
+        self.assertEqual(summary['currency'], 'JPY')
+        self.assertEqual(str(summary['total']), '100')
+    
+    def test_import_rejects_other_currency(self):
+        with self.assertRaisesRegex(ValueError, "does not match"):
+            validate_record({'description': 'Coffee', 'amount': '3.50', 'currency': 'USD'}, 'JPY')
+        fields = validate_record({'description': 'Sushi', 'amount': '100'}, 'JPY')
+        self.assertEqual((fields['amount_cents'], fields['currency']), (100, 'JPY'))
+    
+    def test_mixed_ledger_is_rejected(self):
+        self.write_ledger(self.data_file, [self.expense(1, 100, 'JPY'), self.expense(2, 350, 'USD')])
+        tracker = ExpenseTracker(self.data_file, commit_window=0)
+        with self.assertRaisesRegex(ValueError, "mixes currencies"):
+            tracker.get_summary(month=3, year=2024)
+    
+    def test_requested_currency_must_match(self):
+        self.write_ledger(self.data_file, [self.expense(1, 100, 'JPY')])
+        with self.assertRaisesRegex(ValueError, "holds JPY"):
+            ExpenseTracker(self.data_file, commit_window=0, currency='USD').get_summary()
+    
+    def test_migration_keeps_currency(self):
+        self.write_ledger(self.data_file, [self.expense(1, 100, 'JPY'), self.expense(2, 250, 'JPY')])
+        for storage in ('sqlite', 'partitioned'):
+            os.makedirs(os.path.join(self.directory, storage))
+            tracker = make_tracker(os.path.join(self.directory, storage, "expenses.json"), storage)
+            tracker.import_json(self.data_file)
+            summary = tracker.get_summary()
+            self.assertEqual((summary['currency'], summary['total_cents']), ('JPY', 350), storage)
+    
+    def test_merge_rejects_mixed_ledgers(self):
+        usd = os.path.join(self.directory, "usd.json")
+        self.write_ledger(self.data_file, [self.expense(1, 100, 'JPY')])
+        self.write_ledger(usd, [self.expense(1, 350, 'USD')])
+        summaries = [ExpenseTracker(path, commit_window=0).get_summary() for path in (self.data_file, usd)]
+        with self.assertRaisesRegex(ValueError, "different currencies"):
+            merge_summaries(summaries)
+
+
+class LedgerSummaryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="expense-test-")
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def test_corrupt_ledger_is_reported_and_nothing_is_written(self):
+        with open(os.path.join(self.directory, "good.json"), 'w') as f:
+            json.dump([{'id': 1, 'description': 'x', 'amount_cents': 250, 'currency': 'USD',
+                        'category': 'Food', 'date': '2024-01-10'}], f)
+        with open(os.path.join(self.directory, "bad.json"), 'w') as f:
+            f.write('[{"id": 1,')
+        merged, results, _ = summarize_ledgers(os.path.join(self.directory, "*.json"), {}, workers=1)
+        errors = {os.path.basename(result['ledger']): result.get('error') for result in results}
+        self.assertIn("Cannot read", errors['bad.json'])
+        self.assertIsNone(errors['good.json'])
+        self.assertEqual((merged['count'], merged['total_cents']), (1, 250))
+        self.assertEqual(sorted(os.listdir(self.directory)), ['bad.json', 'good.json'])
+
+
+class PartitionedStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="expense-test-")
+        self.data_file = os.path.join(self.directory, "expenses.json")
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def test_missing_partition_is_dropped(self):
+        with open(self.data_file, 'w') as f:
+            json.dump([{'id': i, 'description': 'x', 'amount_cents': 100 * i, 'currency': 'USD',
+                        'category': 'Food', 'date': f"2024-0{i}-10"} for i in (1, 2, 3)], f)
+        tracker = make_tracker(self.data_file, 'partitioned')
+        tracker.import_json(self.data_file)
+        os.remove(os.path.join(tracker.directory, "2024-02.json"))
+        
+        tracker = make_tracker(self.data_file, 'partitioned')
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(tracker.get_summary()['total_cents'], 400)
+        self.assertEqual([exp['id'] for exp in tracker.list_expenses(category='food')], [1, 3])
+        tracker.flush()
+        self.assertNotIn('2024-02', make_tracker(self.data_file, 'partitioned').manifest['partitions'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the GitHub User Activity CLI.
+
+``memory`` decodes a synthetic events response two ways and reports the
+peak memory and time of each: reading the whole body and calling
+``json.loads`` on it (the fetcher's old approach), and streaming it through
+``decode_events``, which keeps only a compact ``Event`` per event.
+
+``format`` measures formatting throughput for every GitHub event type: the
+old if/elif chain against the handler table, one event at a time and
+through the ``format_events`` fast path, all on the same event
+dictionaries. The ``records`` column formats the same events already
+decoded into Event records, as the CLI does. A last line starts both from
+the same response body: ``json.loads`` plus the chain, against
+``decode_events`` plus ``format_events``.
+
+Examples:
+  python benchmark.py memory
+  python benchmark.py memory --events 300 --repeat 5
+  python benchmark.py format --events 100000
+"""
+
+import argparse
+import gc
+import io
+import json
+import random
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from github_activity import ActivityFormatter, Event, decode_events
+
+EVENT_TYPES = ["PushEvent", "PullRequestEvent", "IssuesEvent", "IssueCommentEvent", "CreateEvent",
+               "WatchEvent", "ForkEvent", "ReleaseEvent"]
+# Every type the events API documents, plus StarEvent and one the formatter does not know
+ALL_EVENT_TYPES = ["CommitCommentEvent", "CreateEvent", "DeleteEvent", "ForkEvent", "GollumEvent",
+                   "IssueCommentEvent", "IssuesEvent", "MemberEvent", "PublicEvent", "PullRequestEvent",
+                   "PullRequestReviewEvent", "PullRequestReviewCommentEvent",
+                   "PullRequestReviewThreadEvent", "PushEvent", "ReleaseEvent", "SponsorshipEvent",
+                   "WatchEvent", "StarEvent", "GistEvent", "UnknownEvent"]
+
+
+def make_user(rng: random.Random) -> Dict:
+    """An actor/author object as the API embeds it in events."""
+    login = f"user{rng.randint(1, 10_000)}"
+    return {
+        "id": rng.randint(1, 10 ** 8),
+        "login": login,
+        "display_login": login,
+        "gravatar_id": "",
+        "url": f"https://api.github.com/users/{login}",
+        "avatar_url": f"https://avatars.githubusercontent.com/u/{rng.randint(1, 10 ** 8)}?",
+    }
+
+
+def make_events(count: int) -> List[Dict]:
+    """Generate ``count`` events shaped (and roughly sized) like the events API's."""
+    rng = random.Random(count)
+    events = []
+    for i in range(count):
+        event_type = EVENT_TYPES[i % len(EVENT_TYPES)]
+        repo = f"org{i % 7}/project{i % 13}"
+        text = " ".join(rng.choice(["fix", "add", "update", "refactor", "the", "parser", "cache", "tests",
+                                    "docs", "handle", "error", "when", "input", "is", "empty"])
+                        for _ in range(rng.randint(20, 120)))
+        if event_type == "PushEvent":
+            payload = {"push_id": rng.randint(1, 10 ** 10), "size": 3, "ref": "refs/heads/main",
+                       "head": f"{rng.getrandbits(160):040x}", "before": f"{rng.getrandbits(160):040x}",
+                       "commits": [{"sha": f"{rng.getrandbits(160):040x}",
+                                    "author": {"email": "dev@example.com", "name": "Dev"},
+                                    "message": text, "distinct": True,
+                                    "url": f"https://api.github.com/repos/{repo}/commits/{j}"}
+                                   for j in range(rng.randint(1, 5))]}
+        elif event_type in ("PullRequestEvent", "IssuesEvent", "IssueCommentEvent"):
+            payload = {"action": rng.choice(["opened", "closed", "created"]),
+                       "number": i,
+                       "issue": {"title": text[:80], "body": text * 3, "user": make_user(rng),
+                                 "labels": [{"name": "bug", "color": "d73a4a"}],
+                                 "url": f"https://api.github.com/repos/{repo}/issues/{i}"}}
+        elif event_type == "CreateEvent":
+            payload = {"ref": f"feature-{i}", "ref_type": "branch", "master_branch": "main",
+                       "description": text[:100], "pusher_type": "user"}
+        elif event_type == "ReleaseEvent":
+            payload = {"action": "published", "release": {"tag_name": f"v1.{i}", "body": text * 2,
+                                                          "author": make_user(rng)}}
+        else:
+            payload = {"action": "started"}
+        events.append({
+            "id": str(40_000_000_000 - i),
+            "type": event_type,
+            "actor": make_user(rng),
+            "repo": {"id": rng.randint(1, 10 ** 8), "name": repo,
+                     "url": f"https://api.github.com/repos/{repo}"},
+            "payload": payload,
+            "public": True,
+            "created_at": "2024-08-06T12:00:00Z",
+        })
+    return events
+
+
+def load_whole(stream) -> List[Dict]:
+    """Read the whole body, then parse it into dictionaries."""
+    return json.loads(stream.read().decode("utf-8"))
+
+
+def load_streaming(stream) -> List:
+    """Decode one event at a time, keeping only its projection."""
+    return list(decode_events(stream))
+
+
+def measure(body: bytes, load: Callable, repeat: int) -> Tuple[int, int, float]:
+    """Return (peak bytes, retained bytes, best seconds) for decoding ``body`` with ``load``."""
+    best = float("inf")
+    for _ in range(repeat):
+        stream = io.BytesIO(body)
+        start = time.perf_counter()
+        load(stream)
+        best = min(best, time.perf_counter() - start)
+
+    # The body sits in the BytesIO before tracing starts, as it would in the socket buffers
+    stream = io.BytesIO(body)
+    gc.collect()
+    tracemalloc.start()
+    events = load(stream)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del events
+    return peak, retained, best
+
+
+def compare_decoders(count: int, repeat: int) -> None:
+    """Print peak memory and time of both decoders for a ``count``-event response."""
+    body = json.dumps(make_events(count)).encode("utf-8")
+    whole = measure(body, load_whole, repeat)
+    streaming = measure(body, load_streaming, repeat)
+
+    print(f"Decoding {count:,} events ({len(body) / 2 ** 10:,.0f} KB response)")
+    print(f"{'Metric':<20} {'json.loads':>12} {'streaming':>12} {'ratio':>8}")
+    print("-" * 55)
+    rows = [
+        ("peak memory (KB)", whole[0] / 2 ** 10, streaming[0] / 2 ** 10),
+        ("retained (KB)", whole[1] / 2 ** 10, streaming[1] / 2 ** 10),
+        ("time (ms)", whole[2] * 1000, streaming[2] * 1000),
+    ]
+    for name, before, after in rows:
+        ratio = before / after if after else float("inf")
+        print(f"{name:<20} {before:>12,.1f} {after:>12,.1f} {ratio:>7.1f}x")
+
+
+def legacy_format_event(event: Dict) -> str:
+    """The if/elif chain format_event used before the handler table (with capitalize() fixed)."""
+    event_type = event.get('type', 'Unknown')
+    repo_name = event.get('repo', {}).get('name', 'Unknown repository')
+    payload = event.get('payload', {})
+    if event_type == 'PushEvent':
+        commit_count = len(payload.get('commits', []))
+        if commit_count == 1:
+            return f"Pushed 1 commit to {repo_name}"
+        return f"Pushed {commit_count} commits to {repo_name}"
+    elif event_type == 'CreateEvent':
+        return f"Created a new {payload.get('ref_type', 'item')} in {repo_name}"
+    elif event_type == 'DeleteEvent':
+        return f"Deleted a {payload.get('ref_type', 'item')} in {repo_name}"
+    elif event_type == 'IssuesEvent':
+        return f"{payload.get('action', 'modified').capitalize()} an issue in {repo_name}"
+    elif event_type == 'IssueCommentEvent':
+        return f"{payload.get('action', 'created').capitalize()} a comment on an issue in {repo_name}"
+    elif event_type == 'PullRequestEvent':
+        return f"{payload.get('action', 'opened').capitalize()} a pull request in {repo_name}"
+    elif event_type == 'PullRequestReviewEvent':
+        return f"{payload.get('action', 'submitted').capitalize()} a pull request review in {repo_name}"
+    elif event_type == 'ForkEvent':
+        return f"Forked {repo_name}"
+    elif event_type == 'WatchEvent':
+        return f"{payload.get('action', 'watched').capitalize()} {repo_name}"
+    elif event_type == 'StarEvent':
+        return f"{payload.get('action', 'starred').capitalize()} {repo_name}"
+    elif event_type == 'GistEvent':
+        return f"{payload.get('action', 'created').capitalize()} a gist"
+    elif event_type == 'CommitCommentEvent':
+        return f"Commented on a commit in {repo_name}"
+    elif event_type == 'ReleaseEvent':
+        return f"{payload.get('action', 'published').capitalize()} a release in {repo_name}"
+    elif event_type == 'MemberEvent':
+        return f"{payload.get('action', 'added').capitalize()} a member to {repo_name}"
+    return f"Performed {event_type} in {repo_name}"
+
+
+def make_typed_events(event_type: str, count: int) -> List[Dict]:
+    """``count`` small events of one type, with the payload fields the formatter reads."""
+    payload = {"action": "created", "ref_type": "branch", "commits": [{}, {}]}
+    return [{"id": str(i), "type": event_type, "repo": {"name": f"org/project{i % 13}"},
+             "payload": payload} for i in range(count)]
+
+
+def rate(func: Callable[[], object], count: int, repeat: int = 5) -> float:
+    """Best events per second over ``repeat`` runs of ``func``, which formats ``count`` events."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def compare_formatters(count: int) -> None:
+    """Print formatting throughput per event type for the old chain and the handler table, on the same dicts."""
+    format_event = ActivityFormatter.format_event
+    format_events = ActivityFormatter.format_events
+    print(f"Formatting {count:,} events per type (events/s; speedup is table over if/elif)")
+    print(f"{'Event type':<32} {'if/elif':>12} {'table':>12} {'batch':>12} {'records':>12} {'speedup':>8}")
+    print("-" * 93)
+    totals = [0.0, 0.0, 0.0, 0.0]
+    for event_type in ALL_EVENT_TYPES:
+        dicts = make_typed_events(event_type, count)
+        records = [Event.from_dict(event) for event in dicts]
+        chain = rate(lambda: [legacy_format_event(event) for event in dicts], count)
+        table = rate(lambda: [format_event(event) for event in dicts], count)
+        batch = rate(lambda: format_events(dicts, count), count)
+        decoded = rate(lambda: format_events(records, count), count)
+        for i, value in enumerate((chain, table, batch, decoded)):
+            totals[i] += count / value
+        print(f"{event_type:<32} {chain:>12,.0f} {table:>12,.0f} {batch:>12,.0f} {decoded:>12,.0f} "
+              f"{table / chain:>7.1f}x")
+    events = count * len(ALL_EVENT_TYPES)
+    chain, table, batch, decoded = (events / seconds for seconds in totals)
+    print("-" * 93)
+    print(f"{'all types':<32} {chain:>12,.0f} {table:>12,.0f} {batch:>12,.0f} {decoded:>12,.0f} "
+          f"{table / chain:>7.1f}x")
+
+    body = json.dumps([event for event_type in ALL_EVENT_TYPES
+                       for event in make_typed_events(event_type, count // 10 or 1)]).encode("utf-8")
+    events = (count // 10 or 1) * len(ALL_EVENT_TYPES)
+    chain = rate(lambda: "\n".join(legacy_format_event(event) for event in load_whole(io.BytesIO(body))), events)
+    batch = rate(lambda: format_events(load_streaming(io.BytesIO(body)), events), events)
+    print(f"{'from response body':<32} {chain:>12,.0f} {'':>12} {batch:>12,.0f} {'':>12} {batch / chain:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GitHub User Activity benchmarks",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog=__doc__.split("Examples:")[1])
+    subparsers = parser.add_subparsers(dest="command")
+
+    memory_parser = subparsers.add_parser("memory", help="Compare peak memory of the event decoders")
+    memory_parser.add_argument("--events", type=int, default=300,
+                               help="Events in the synthetic response (the API serves up to 300)")
+    memory_parser.add_argument("--repeat", type=int, default=3, help="Timed runs per decoder")
+
+    format_parser = subparsers.add_parser("format", help="Compare formatting throughput per event type")
+    format_parser.add_argument("--events", type=int, default=100_000, help="Events formatted per type")
+
+    args = parser.parse_args()
+    if args.command == "memory":
+        compare_decoders(args.events, args.repeat)
+    elif args.command == "format":
+        compare_formatters(args.events)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
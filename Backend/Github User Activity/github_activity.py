@@ -4,144 +4,916 @@ GitHub User Activity CLI
 Fetches and displays recent activity of a GitHub user using the GitHub API.
 """
 
+import argparse
+import base64
+import codecs
+import hashlib
+import http.client
+import importlib
+import os
+import re
+import string
 import sys
 import json
+import tempfile
+import threading
+import time
+import urllib.parse
 import urllib.request
-import urllib.error
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Dict, Any, Optional, Set, Tuple, Union
+
+from shared.durability import atomic_write
+
+
+LINK_PATTERN = re.compile(r'<([^>]*)>\s*;\s*rel="([^"]*)"')
+
+
+def parse_link_header(value: Optional[str]) -> Dict[str, str]:
+    """
+    Parse an RFC 8288 ``Link`` header into a ``{rel: url}`` mapping.
+    
+    Args:
+        value: Raw header value, e.g. ``<https://...&page=2>; rel="next"``
+        
+    Returns:
+        Dictionary mapping each relation (next, last, ...) to its URL
+    """
+    links = {}
+    for url, rels in LINK_PATTERN.findall(value or ""):
+        for rel in rels.split():
+            links[rel] = url
+    return links
+
+
+def page_number(url: str) -> Optional[int]:
+    """Return the ``page`` query parameter of a URL, if any."""
+    values = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query).get('page')
+    try:
+        return int(values[0]) if values else None
+    except ValueError:
+        return None
+
+
+def with_page(url: str, page: int) -> str:
+    """Return ``url`` with its ``page`` query parameter set to ``page``."""
+    parts = urllib.parse.urlsplit(url)
+    query = [(key, value) for key, value in urllib.parse.parse_qsl(parts.query) if key != 'page']
+    query.append(('page', str(page)))
+    return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(query)))
+
+
+class Event:
+    """
+    Compact projection of a GitHub event.
+    
+    An event from the API carries the actor, the full repository and an
+    often large payload (commit lists, issue and pull request bodies). The
+    formatter only needs the fields below, so everything else is dropped
+    as soon as an event is decoded. ``commits`` is the length of a push's
+    commit list; fields an event does not have are None.
+    
+    ``payload`` keeps the full payload only for the event types in
+    ``KEEP_PAYLOAD``, which handlers registered with ``payload=True`` add
+    to (see ActivityFormatter.register); for other types it is None.
+    """
+    
+    __slots__ = ('id', 'type', 'repo', 'action', 'ref_type', 'commits', 'payload')
+    
+    KEEP_PAYLOAD: Set[str] = set()
+    
+    def __init__(self, id: Optional[str], type: str, repo: Optional[str] = None,
+                 action: Optional[str] = None, ref_type: Optional[str] = None,
+                 commits: Optional[int] = None, payload: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.type = type
+        self.repo = repo
+        self.action = action
+        self.ref_type = ref_type
+        self.commits = commits
+        self.payload = payload
+    
+    @classmethod
+    def from_dict(cls, event: Dict[str, Any]) -> 'Event':
+        """Project an event dictionary from the API."""
+        payload = event.get('payload') or {}
+        commits = payload.get('commits')
+        event_type = event.get('type', 'Unknown')
+        return cls(event.get('id'), event_type, (event.get('repo') or {}).get('name'),
+                   payload.get('action'), payload.get('ref_type'),
+                   len(commits) if commits is not None else None,
+                   payload if event_type in cls.KEEP_PAYLOAD else None)
+    
+    def __repr__(self) -> str:
+        return f"Event(id={self.id!r}, type={self.type!r}, repo={self.repo!r})"
+
+
+def iter_json_array(stream: BinaryIO, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yield the items of a top-level JSON array read from a binary stream.
+    
+    The stream is read and decoded ``chunk_size`` bytes at a time, so
+    memory stays bounded by the largest single item rather than the size
+    of the whole response.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    buffer, pos = '', 0
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer = buffer[pos:] + text.decode(chunk, final=not chunk)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,[]':
+                pos += 1
+            if pos == len(buffer):
+                break
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if not chunk:
+                    raise
+                break  # the item continues in the next chunk
+            yield item
+        if not chunk:
+            return
+
+
+def decode_events(stream: BinaryIO) -> Iterator[Event]:
+    """
+    Decode an events response one event at a time, keeping only its projection.
+    
+    Raises:
+        ValueError: If the stream is not a JSON array of event objects
+    """
+    try:
+        for item in iter_json_array(stream):
+            yield Event.from_dict(item)
+    except (UnicodeDecodeError, json.JSONDecodeError, AttributeError, TypeError):
+        raise ValueError("Invalid response from GitHub API")
+
+
+class _TeeReader:
+    """Binary reader that copies everything read from ``source`` into ``sink``."""
+    
+    def __init__(self, source: BinaryIO, sink: BinaryIO):
+        self.source = source
+        self.sink = sink
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self.source.read(size)
+        self.sink.write(data)
+        return data
+
+
+class RateLimitError(ValueError):
+    """The API refused a request because a rate limit was exhausted."""
+    
+    def __init__(self, message: str, reset: Optional[float] = None):
+        super().__init__(message)
+        self.reset = reset
+
+
+def rate_limit_error(headers) -> Optional[RateLimitError]:
+    """
+    Build a RateLimitError from a 403/429 response's headers, if they show a rate limit.
+    
+    The primary limit sends ``X-RateLimit-Remaining: 0`` with the reset
+    time in ``X-RateLimit-Reset``; secondary limits send ``Retry-After``.
+    """
+    if headers.get('Retry-After', '').isdigit():
+        return rate_limited(time.time() + int(headers['Retry-After']))
+    if headers.get('X-RateLimit-Remaining') == '0' and headers.get('X-RateLimit-Reset', '').isdigit():
+        return rate_limited(float(headers['X-RateLimit-Reset']))
+    return None
+
+
+def rate_limited(reset: float) -> RateLimitError:
+    """Build the RateLimitError for a limit that resets at ``reset`` (epoch seconds)."""
+    wait = max(0, int(reset - time.time() + 59) // 60)
+    when = datetime.fromtimestamp(reset).strftime('%H:%M')
+    return RateLimitError(f"Rate limit exceeded. It resets at {when} "
+                          f"(in {wait} minute{'s' if wait != 1 else ''}).", reset)
+
+
+class RateLimitBudget:
+    """
+    Request budget shared by every thread of a fetcher.
+    
+    Each response's ``X-RateLimit-Remaining``/``X-RateLimit-Reset`` headers
+    set the budget, and each request takes one from it before it is sent,
+    so concurrent workers stop once the limit is used up instead of all
+    running into 403s. ``wait`` sleeps until the reset instead of raising
+    RateLimitError.
+    """
+    
+    def __init__(self, wait: bool = False):
+        self.wait = wait
+        self.remaining: Optional[int] = None
+        self.reset: Optional[float] = None
+        self.lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Take one request from the budget, waiting or raising when none are left."""
+        while True:
+            with self.lock:
+                if self.remaining is None or self.remaining > 0:
+                    if self.remaining is not None:
+                        self.remaining -= 1
+                    return
+                if self.reset is None or time.time() >= self.reset:
+                    # A new window has started; the next response tells how big it is
+                    self.remaining = None
+                    return
+                reset = self.reset
+            if not self.wait:
+                raise rate_limited(reset)
+            time.sleep(max(reset - time.time(), 0) + 1)
+    
+    def update(self, headers) -> None:
+        """Track the limit reported by a response."""
+        remaining = headers.get('X-RateLimit-Remaining', '')
+        reset = headers.get('X-RateLimit-Reset', '')
+        if not (remaining.isdigit() and reset.isdigit()):
+            return
+        remaining, reset = int(remaining), float(reset)
+        with self.lock:
+            if self.reset == reset and self.remaining is not None:
+                # Responses arrive out of order; within one window the lowest count is the latest
+                self.remaining = min(self.remaining, remaining)
+            elif self.reset is None or reset > self.reset:
+                self.remaining, self.reset = remaining, reset
+
+
+Response = namedtuple('Response', 'status reason headers body')
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections shared between threads.
+    
+    A request borrows an idle connection to the URL's host, or opens one,
+    and hands it back once the response has been read. A batch of requests
+    to one API host then pays for one TLS handshake per concurrent worker
+    instead of one per request. At most ``max_idle`` connections per host
+    are kept open.
+    
+    Proxies come from the environment (``HTTPS_PROXY``, ``HTTP_PROXY`` and
+    ``NO_PROXY``, as read by ``urllib.request.getproxies``) unless
+    ``proxies`` is given. HTTPS requests are tunneled through the proxy
+    with CONNECT; plain HTTP requests are sent to the proxy with the full
+    URL as the request target.
+    """
+    
+    MAX_REDIRECTS = 3
+    
+    def __init__(self, max_idle: int = 8, timeout: float = 30.0,
+                 proxies: Optional[Dict[str, str]] = None):
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.proxies = urllib.request.getproxies() if proxies is None else proxies
+        self.idle: Dict[Tuple[str, str, Optional[int]], List[http.client.HTTPConnection]] = {}
+        self.opened = 0
+        self.lock = threading.Lock()
+    
+    def request(self, url: str, headers: Dict[str, str]) -> Response:
+        """
+        Send a GET request and read the whole response, following redirects.
+        
+        Raises:
+            OSError, http.client.HTTPException: If the request fails
+        """
+        with self.open(url, headers) as response:
+            return Response(response.status, response.reason, response.msg, response.read())
+    
+    @contextmanager
+    def open(self, url: str, headers: Dict[str, str]) -> Iterator[http.client.HTTPResponse]:
+        """
+        Send a GET request and yield the response with its body still unread.
+        
+        Redirects are followed. The connection goes back to the pool when
+        the block exits, provided the body was read to the end.
+        
+        Raises:
+            OSError, http.client.HTTPException: If the request fails
+        """
+        for _ in range(self.MAX_REDIRECTS + 1):
+            key, connection, response = self._send(url, headers)
+            location = response.getheader('Location')
+            if response.status in (301, 302, 307, 308) and location:
+                response.read()
+                self._finish(key, connection, response)
+                url = urllib.parse.urljoin(url, location)
+                continue
+            try:
+                yield response
+            finally:
+                self._finish(key, connection, response)
+            return
+        raise http.client.HTTPException(f"Too many redirects for {url}")
+    
+    def _send(self, url: str, headers: Dict[str, str]):
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        proxy = self._proxy(parts.scheme, parts.hostname)
+        if proxy is not None and parts.scheme == 'http':
+            # A plain HTTP proxy takes the absolute URL as the request target
+            path = urllib.parse.urlunsplit(parts._replace(fragment=''))
+            headers = {**headers, **self._proxy_headers(proxy)}
+        while True:
+            connection, reused = self._acquire(key)
+            try:
+                connection.request('GET', path, headers=headers)
+                return key, connection, connection.getresponse()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                if reused:
+                    continue  # The server closed an idle keep-alive connection; retry on a new one
+                raise
+    
+    def _proxy(self, scheme: str, host: Optional[str]) -> Optional[urllib.parse.SplitResult]:
+        """Return the proxy URL to use for ``scheme://host``, or None to connect directly."""
+        proxy = self.proxies.get(scheme)
+        if not proxy or not host or urllib.request.proxy_bypass(host):
+            return None
+        if '://' not in proxy:
+            proxy = f"http://{proxy}"
+        return urllib.parse.urlsplit(proxy)
+    
+    @staticmethod
+    def _proxy_headers(proxy: urllib.parse.SplitResult) -> Dict[str, str]:
+        """Basic credentials for a proxy URL that carries a user name."""
+        if proxy.username is None:
+            return {}
+        credentials = f"{urllib.parse.unquote(proxy.username)}:{urllib.parse.unquote(proxy.password or '')}"
+        return {'Proxy-Authorization': f"Basic {base64.b64encode(credentials.encode()).decode('ascii')}"}
+    
+    def _finish(self, key, connection: http.client.HTTPConnection,
+                response: http.client.HTTPResponse) -> None:
+        """Pool the connection if the response was read completely, otherwise close it."""
+        if response.isclosed() and not response.will_close:
+            self._release(key, connection)
+        else:
+            connection.close()
+    
+    def _acquire(self, key) -> Tuple[http.client.HTTPConnection, bool]:
+        with self.lock:
+            idle = self.idle.get(key)
+            if idle:
+                return idle.pop(), True
+            self.opened += 1
+        scheme, host, port = key
+        proxy = self._proxy(scheme, host)
+        if proxy is None:
+            if scheme == 'https':
+                return http.client.HTTPSConnection(host, port, timeout=self.timeout), False
+            return http.client.HTTPConnection(host, port, timeout=self.timeout), False
+        if scheme == 'https':
+            # Connect to the proxy and open a CONNECT tunnel to the API host;
+            # TLS is then negotiated with the API host through the tunnel
+            connection = http.client.HTTPSConnection(proxy.hostname, proxy.port, timeout=self.timeout)
+            connection.set_tunnel(host, port, headers=self._proxy_headers(proxy))
+            return connection, False
+        return http.client.HTTPConnection(proxy.hostname, proxy.port, timeout=self.timeout), False
+    
+    def _release(self, key, connection: http.client.HTTPConnection) -> None:
+        with self.lock:
+            idle = self.idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(connection)
+                return
+        connection.close()
+    
+    def close(self) -> None:
+        """Close every idle connection."""
+        with self.lock:
+            connections = [connection for idle in self.idle.values() for connection in idle]
+            self.idle.clear()
+        for connection in connections:
+            connection.close()
+
+
+class ResponseCache:
+    """
+    On-disk cache of API responses for conditional requests.
+    
+    Each URL gets two files named after a hash of the URL: ``<key>.body``
+    holds the raw response and ``<key>.json`` its ETag, Last-Modified,
+    Link header, X-Poll-Interval and fetch time. A hit touches the body
+    file, so the least recently used entries are evicted first once the
+    bodies take up more than ``max_bytes``.
+    """
+    
+    DEFAULT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'github-activity')
+    DEFAULT_MAX_BYTES = 50 * 2 ** 20
+    
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or os.environ.get('GITHUB_ACTIVITY_CACHE') or self.DEFAULT_DIR
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+    
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.body'
+    
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached metadata for ``url``, or None if nothing usable is cached."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url or not os.path.exists(body_path):
+            return None
+        return meta
+    
+    def open_body(self, url: str) -> BinaryIO:
+        """Open the cached body for ``url`` for reading and mark it as recently used."""
+        _, body_path = self._paths(url)
+        file = open(body_path, 'rb')
+        os.utime(body_path)
+        return file
+    
+    @staticmethod
+    def is_fresh(meta: Dict[str, Any]) -> bool:
+        """True while the poll interval GitHub asked for has not passed yet."""
+        return time.time() - meta.get('fetched_at', 0) < meta.get('poll_interval', 0)
+    
+    def store(self, url: str, body: bytes, headers) -> None:
+        """Save a 200 response with its validators, then evict down to ``max_bytes``."""
+        with self.storing(url, headers) as file:
+            file.write(body)
+    
+    @contextmanager
+    def storing(self, url: str, headers) -> Iterator[BinaryIO]:
+        """
+        Yield a file to stream a 200 response body into.
+        
+        The body and its validators are saved only if the block completes,
+        so a response that fails halfway never replaces a good entry.
+        """
+        meta_path, body_path = self._paths(url)
+        meta = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'link': headers.get('Link'),
+            'poll_interval': _poll_interval(headers),
+            'fetched_at': time.time(),
+        }
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                yield file
+            with self.lock:
+                os.replace(temp_path, body_path)
+                atomic_write(meta_path, json.dumps(meta))
+                self._evict()
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    def revalidate(self, url: str, meta: Dict[str, Any], headers) -> Dict[str, Any]:
+        """Record a 304 Not Modified: the cached body is current as of now."""
+        meta = dict(meta, fetched_at=time.time(), poll_interval=_poll_interval(headers, meta.get('poll_interval', 0)))
+        if headers.get('ETag'):
+            meta['etag'] = headers['ETag']
+        meta_path, _ = self._paths(url)
+        with self.lock:
+            atomic_write(meta_path, json.dumps(meta))
+        return meta
+    
+    def _evict(self) -> None:
+        """Remove least recently used entries until the bodies fit in ``max_bytes``."""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith('.body'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        entries.sort()
+        for _, size, body_path in entries:
+            if total <= self.max_bytes:
+                break
+            for path in (body_path, body_path[:-len('.body')] + '.json'):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+
+def _poll_interval(headers, default: int = 0) -> int:
+    """Seconds GitHub asks clients to wait between polls (``X-Poll-Interval``)."""
+    value = headers.get('X-Poll-Interval', '')
+    return int(value) if value.isdigit() else default
 
 
 class GitHubActivityFetcher:
     """Fetches GitHub user activity from the GitHub API."""
     
     BASE_URL = "https://api.github.com"
+    # The events API serves at most 100 events per page
+    PER_PAGE = 100
     
-    def __init__(self):
+    def __init__(self, base_url: Optional[str] = None, max_workers: int = 4,
+                 cache: Optional[ResponseCache] = None, refresh: bool = False,
+                 pool: Optional[ConnectionPool] = None, budget: Optional[RateLimitBudget] = None):
+        self.base_url = (base_url or os.environ.get('GITHUB_API_URL') or self.BASE_URL).rstrip('/')
+        self.max_workers = max(1, max_workers)
+        # With a cache, responses are revalidated with If-None-Match/If-Modified-Since;
+        # ``refresh`` revalidates even within the poll interval
+        self.cache = cache
+        self.refresh = refresh
+        self.pool = pool if pool is not None else ConnectionPool()
+        self.budget = budget if budget is not None else RateLimitBudget()
         self.headers = {
             'User-Agent': 'GitHub-Activity-CLI/1.0',
             'Accept': 'application/vnd.github.v3+json'
         }
     
-    def fetch_user_events(self, username: str) -> List[Dict[str, Any]]:
+    def fetch_user_events(self, username: str, pages: Optional[int] = 1) -> List[Event]:
         """
         Fetch recent events for a GitHub user.
         
+        The first page is fetched on its own. Its ``Link`` header names the
+        last page, so the remaining pages are then fetched concurrently
+        (at most ``max_workers`` at a time). Without a ``last`` link the
+        ``next`` links are followed one by one. Events that shift onto a
+        later page while pages are being fetched are only returned once.
+        
         Args:
             username: GitHub username to fetch events for
+            pages: Number of pages to fetch, or None for every page
             
         Returns:
-            List of event dictionaries from the GitHub API
+            List of events, newest first, each projected to an Event record
             
         Raises:
-            urllib.error.HTTPError: If the API request fails
-            urllib.error.URLError: If there's a network error
+            ValueError: If the user does not exist, the API request fails
+                or the response cannot be parsed
+        """
+        # Every page count asks for full pages, so a single-page run and the
+        # first page of a longer run share one URL (and one cache entry)
+        url = f"{self.base_url}/users/{urllib.parse.quote(username)}/events?per_page={self.PER_PAGE}"
+        events, links = self._get(url, username)
+        if pages == 1:
+            return events
+        results = [events]
+        last = page_number(links['last']) if 'last' in links else None
+        if last is not None:
+            if pages is not None:
+                last = min(last, pages)
+            urls = [with_page(links['last'], page) for page in range(2, last + 1)]
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls) or 1)) as pool:
+                # map() yields in submission order, so pages stay in order
+                results.extend(events for events, _ in pool.map(lambda page_url: self._get(page_url, username), urls))
+        else:
+            while 'next' in links and (pages is None or len(results) < pages):
+                events, links = self._get(links['next'], username)
+                results.append(events)
+        return dedupe_events(event for page in results for event in page)
+    
+    def _get(self, url: str, username: str) -> Tuple[List[Event], Dict[str, str]]:
+        """
+        Fetch one page of events; returns the events and the parsed ``Link`` header.
+        
+        A cached page is served without a request while its poll interval
+        lasts. After that it is revalidated, and a 304 answer (which does
+        not count against the rate limit) is served from the cache.
         """
-        url = f"{self.BASE_URL}/users/{username}/events"
+        meta = self.cache.get(url) if self.cache is not None else None
+        if meta is not None and not self.refresh and ResponseCache.is_fresh(meta):
+            try:
+                return self._cached(url, meta)
+            except ValueError:
+                meta = None
         
+        headers = dict(self.headers)
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        self.budget.acquire()
         try:
-            request = urllib.request.Request(url, headers=self.headers)
-            with urllib.request.urlopen(request) as response:
-                data = response.read()
-                return json.loads(data.decode('utf-8'))
-        except urllib.error.HTTPError as e:
-            if e.code == 404:
-                raise ValueError(f"User '{username}' not found on GitHub")
-            elif e.code == 403:
-                raise ValueError("Rate limit exceeded. Please try again later.")
-            else:
-                raise ValueError(f"GitHub API error: {e.code} - {e.reason}")
-        except urllib.error.URLError as e:
-            raise ValueError(f"Network error: {e.reason}")
-        except json.JSONDecodeError:
-            raise ValueError("Invalid response from GitHub API")
-
-
-class ActivityFormatter:
-    """Formats GitHub events into human-readable text."""
+            with self.pool.open(url, headers) as response:
+                self.budget.update(response.msg)
+                if response.status != 200:
+                    response.read()
+                    return self._failed(url, username, meta, response)
+                links = parse_link_header(response.getheader('Link'))
+                if self.cache is None:
+                    return list(decode_events(response)), links
+                # The body is decoded as it arrives and copied into the cache on the way
+                with self.cache.storing(url, response.msg) as file:
+                    return list(decode_events(_TeeReader(response, file))), links
+        except (OSError, http.client.HTTPException) as e:
+            raise ValueError(f"Network error: {e}")
     
-    @staticmethod
-    def format_event(event: Dict[str, Any]) -> str:
+    def _failed(self, url: str, username: str, meta: Optional[Dict[str, Any]],
+                response: http.client.HTTPResponse) -> Tuple[List[Event], Dict[str, str]]:
+        """Handle a non-200 response: serve a 304 from the cache, raise for anything else."""
+        if response.status == 304 and meta is not None:
+            return self._cached(url, self.cache.revalidate(url, meta, response.msg))
+        if response.status == 404:
+            raise ValueError(f"User '{username}' not found on GitHub")
+        elif response.status in (403, 429):
+            error = rate_limit_error(response.msg)
+            if error is not None:
+                raise error
+            raise ValueError(f"GitHub API refused the request: {response.status} - {response.reason}")
+        else:
+            raise ValueError(f"GitHub API error: {response.status} - {response.reason}")
+    
+    def _cached(self, url: str, meta: Dict[str, Any]) -> Tuple[List[Event], Dict[str, str]]:
+        """Return a page from the cache."""
+        try:
+            with self.cache.open_body(url) as file:
+                return list(decode_events(file)), parse_link_header(meta.get('link'))
+        except (OSError, ValueError):
+            raise ValueError("Cached GitHub API response is unreadable; run again with --no-cache")
+    
+    def fetch_many(self, usernames: Iterable[str], pages: Optional[int] = 1,
+                   workers: int = 8) -> Iterable[Tuple[str, Optional[List[Event]], Optional[ValueError]]]:
         """
-        Format a single GitHub event into a readable string.
+        Fetch events for many users concurrently.
+        
+        Users are fetched on ``workers`` threads that share this fetcher's
+        connection pool and rate-limit budget; once the budget runs out the
+        remaining users fail fast with RateLimitError.
         
         Args:
-            event: GitHub event dictionary
+            usernames: GitHub usernames to fetch events for
+            pages: Number of pages to fetch per user, or None for every page
+            workers: Users fetched at the same time
             
         Returns:
-            Formatted string representation of the event
+            Iterator of ``(username, events, error)`` tuples in the order the
+            users finish; exactly one of ``events`` and ``error`` is None
         """
-        event_type = event.get('type', 'Unknown')
-        repo_name = event.get('repo', {}).get('name', 'Unknown repository')
-        
-        if event_type == 'PushEvent':
-            commits = event.get('payload', {}).get('commits', [])
-            commit_count = len(commits)
-            if commit_count == 1:
-                return f"Pushed 1 commit to {repo_name}"
-            else:
-                return f"Pushed {commit_count} commits to {repo_name}"
-        
-        elif event_type == 'CreateEvent':
-            ref_type = event.get('payload', {}).get('ref_type', 'item')
-            return f"Created a new {ref_type} in {repo_name}"
-        
-        elif event_type == 'DeleteEvent':
-            ref_type = event.get('payload', {}).get('ref_type', 'item')
-            return f"Deleted a {ref_type} in {repo_name}"
-        
-        elif event_type == 'IssuesEvent':
-            action = event.get('payload', {}).get('action', 'modified')
-            return f"{action.capitalize()} an issue in {repo_name}"
-        
-        elif event_type == 'IssueCommentEvent':
-            action = event.get('payload', {}).get('action', 'created')
-            return f"{action.capitalize()} a comment on an issue in {repo_name}"
-        
-        elif event_type == 'PullRequestEvent':
-            action = event.get('payload', {}).get('action', 'opened')
-            return f"{action.capitalize()} a pull request in {repo_name}"
-        
-        elif event_type == 'PullRequestReviewEvent':
-            action = event.get('payload', {}).get('action', 'submitted')
-            return f"{action.capitalized()} a pull request review in {repo_name}"
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(self.fetch_user_events, username, pages): username
+                       for username in usernames}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except ValueError as e:
+                    yield futures[future], None, e
+
+
+def read_usernames(stream) -> List[str]:
+    """Read one username per line, skipping blank lines, ``#`` comments and repeats."""
+    usernames = []
+    seen = set()
+    for line in stream:
+        username = line.split('#', 1)[0].strip()
+        if username and username.lower() not in seen:
+            seen.add(username.lower())
+            usernames.append(username)
+    return usernames
+
+
+def dedupe_events(events: Iterable[Event]) -> List[Event]:
+    """Drop repeated events (same ``id``), keeping the first occurrence and the order."""
+    seen = set()
+    unique = []
+    for event in events:
+        event_id = event.id
+        if event_id is not None:
+            if event_id in seen:
+                continue
+            seen.add(event_id)
+        unique.append(event)
+    return unique
+
+
+UNKNOWN_REPO = 'Unknown repository'
+
+# Values a format template can use, in the order the compiled handler collects them
+TEMPLATE_FIELDS = ('repo', 'action', 'ref_type', 'commits', 'type')
+CONVERSIONS = ('r', 's', 'a')
+_NO_FIELD = len(TEMPLATE_FIELDS)  # Index of the empty string padding templates with fewer than two fields
+
+
+def _parse_template(template: str) -> Tuple[List[Tuple[str, int, str, str]], str]:
+    """
+    Split a format template into ``(literal, field index, conversion, spec)`` fields and trailing text.
+    
+    Raises:
+        ValueError: If the template is malformed, or uses an unknown field,
+            conversion or format spec
+    """
+    fields = []
+    tail = ''  # Literal text not yet followed by a field (escaped braces split it up)
+    for literal, name, spec, conversion in string.Formatter().parse(template):
+        tail += literal
+        if name is None:
+            continue
+        if name not in TEMPLATE_FIELDS:
+            raise ValueError(f"Unknown template field '{name}' in {template!r}")
+        if conversion and conversion not in CONVERSIONS:
+            raise ValueError(f"Unknown conversion '!{conversion}' in {template!r}")
+        if '{' in spec:
+            raise ValueError(f"Nested fields are not supported in {template!r}")
+        try:
+            format('', spec)  # Every field is a string; reject specs a string cannot take now
+        except ValueError as e:
+            raise ValueError(f"Invalid format spec '{spec}' in {template!r}: {e}")
+        fields.append((tail, TEMPLATE_FIELDS.index(name), conversion or '', spec))
+        tail = ''
+    return fields, tail
+
+
+def compile_template(template: str, default_action: str = '') -> Callable[[Union[Event, Dict[str, Any]]], str]:
+    """
+    Compile a format template into an event handler.
+    
+    The template is parsed once, and the handler is a single closure that
+    reads the fields it uses straight from an Event or an event dictionary.
+    Templates with at most two plain fields, which is all the built-in ones,
+    are assembled by string concatenation; format specs and conversions
+    (``{repo:>30}``, ``{action!r}``) go through ``str.format``.
+    
+    Args:
+        template: ``str.format`` template, e.g. ``"{action} an issue in {repo}"``
+        default_action: Action used when an event's payload has none
         
-        elif event_type == 'ForkEvent':
-            return f"Forked {repo_name}"
+    Returns:
+        Function formatting an Event or an event dictionary with the template
         
-        elif event_type == 'WatchEvent':
-            action = event.get('payload', {}).get('action', 'watched')
-            return f"{action.capitalized()} {repo_name}"
+    Raises:
+        ValueError: If the template is malformed, or uses an unknown field,
+            conversion or format spec
+    """
+    fields, tail = _parse_template(template)
+    used = {index for _, index, _, _ in fields}
+    uses_action = TEMPLATE_FIELDS.index('action') in used
+    uses_ref_type = TEMPLATE_FIELDS.index('ref_type') in used
+    uses_commits = TEMPLATE_FIELDS.index('commits') in used
+    
+    fill = None
+    if len(fields) > 2 or any(conversion or spec for _, _, conversion, spec in fields):
+        # Rewritten with positional fields, e.g. {action!r:>10} becomes {1!r:>10}
+        positional = ''
+        for literal, index, conversion, spec in fields:
+            positional += (literal.replace('{', '{{').replace('}', '}}') +
+                           f"{{{index}{'!' + conversion if conversion else ''}{':' + spec if spec else ''}}}")
+        fill = (positional + tail.replace('{', '{{').replace('}', '}}')).format
+    else:
+        (head, first, _, _), (middle, second, _, _) = fields + [('', _NO_FIELD, '', '')] * (2 - len(fields))
+    
+    def handler(event: Union[Event, Dict[str, Any]]) -> str:
+        if isinstance(event, dict):
+            payload = event.get('payload') or {}
+            values = ((event.get('repo') or {}).get('name') or UNKNOWN_REPO,
+                      (payload.get('action') or default_action).capitalize() if uses_action else None,
+                      payload.get('ref_type') or 'item' if uses_ref_type else None,
+                      str(len(payload.get('commits') or ())) if uses_commits else None,
+                      event.get('type', 'Unknown'), '')
+        else:
+            values = (event.repo or UNKNOWN_REPO,
+                      (event.action or default_action).capitalize() if uses_action else None,
+                      event.ref_type or 'item' if uses_ref_type else None,
+                      str(event.commits or 0) if uses_commits else None,
+                      event.type, '')
+        if fill is not None:
+            return fill(*values)
+        return head + values[first] + middle + values[second] + tail
+    return handler
+
+
+def format_push(event: Union[Event, Dict[str, Any]]) -> str:
+    """Format a PushEvent; the template would need a plural."""
+    if isinstance(event, dict):
+        count = len((event.get('payload') or {}).get('commits') or ())
+        repo = (event.get('repo') or {}).get('name')
+    else:
+        count, repo = event.commits or 0, event.repo
+    return f"Pushed {count} commit{'' if count == 1 else 's'} to {repo or UNKNOWN_REPO}"
+
+
+def format_unknown(event: Union[Event, Dict[str, Any]]) -> str:
+    """Format an event type that has no handler."""
+    if isinstance(event, dict):
+        return f"Performed {event.get('type', 'Unknown')} in {(event.get('repo') or {}).get('name') or UNKNOWN_REPO}"
+    return f"Performed {event.type} in {event.repo or UNKNOWN_REPO}"
+
+
+class ActivityFormatter:
+    """
+    Formats GitHub events into human-readable text.
+    
+    Each event type maps to a handler in ``handlers``, most of them compiled
+    from a template, so formatting an event is one dictionary lookup and
+    one call. Every handler takes an Event or an event dictionary, so
+    dictionaries are formatted without first being projected into an Event.
+    Plugins add or replace event types with ``register``; types without a
+    handler fall back to "Performed <type> in <repo>".
+    """
+    
+    # Event type -> (template, default action)
+    TEMPLATES = {
+        'CreateEvent': ("Created a new {ref_type} in {repo}", ''),
+        'DeleteEvent': ("Deleted a {ref_type} in {repo}", ''),
+        'IssuesEvent': ("{action} an issue in {repo}", 'modified'),
+        'IssueCommentEvent': ("{action} a comment on an issue in {repo}", 'created'),
+        'PullRequestEvent': ("{action} a pull request in {repo}", 'opened'),
+        'PullRequestReviewEvent': ("{action} a pull request review in {repo}", 'submitted'),
+        'PullRequestReviewCommentEvent': ("{action} a pull request review comment in {repo}", 'created'),
+        'PullRequestReviewThreadEvent': ("{action} a pull request review thread in {repo}", 'resolved'),
+        'ForkEvent': ("Forked {repo}", ''),
+        'WatchEvent': ("{action} {repo}", 'watched'),
+        'StarEvent': ("{action} {repo}", 'starred'),
+        'GistEvent': ("{action} a gist", 'created'),
+        'GollumEvent': ("Updated the wiki of {repo}", ''),
+        'CommitCommentEvent': ("Commented on a commit in {repo}", ''),
+        'ReleaseEvent': ("{action} a release in {repo}", 'published'),
+        'MemberEvent': ("{action} a member to {repo}", 'added'),
+        'PublicEvent': ("Made {repo} public", ''),
+        'SponsorshipEvent': ("{action} a sponsorship", 'created'),
+    }
+    
+    handlers: Dict[str, Callable[[Union[Event, Dict[str, Any]]], str]] = {'PushEvent': format_push}
+    handlers.update((event_type, compile_template(template, default_action))
+                    for event_type, (template, default_action) in TEMPLATES.items())
+    fallback: Callable[[Union[Event, Dict[str, Any]]], str] = staticmethod(format_unknown)
+    
+    @classmethod
+    def register(cls, event_type: str, template: Optional[str] = None, default_action: str = '',
+                 payload: bool = False):
+        """
+        Add or replace the formatting of an event type.
         
-        elif event_type == 'StarEvent':
-            action = event.get('payload', {}).get('action', 'starred')
-            return f"{action.capitalized()} {repo_name}"
+        With a template the handler is compiled from it; without one this
+        returns a decorator registering the decorated function::
         
-        elif event_type == 'GistEvent':
-            action = event.get('payload', {}).get('action', 'created')
-            return f"{action.capitalized()} a gist"
+            ActivityFormatter.register('DiscussionEvent', "{action} a discussion in {repo}", 'created')
+            
+            @ActivityFormatter.register('ReleaseEvent', payload=True)
+            def format_release(event):
+                return f"Released {event.payload['release']['tag_name']} of {event.repo}"
         
-        elif event_type == 'CommitCommentEvent':
-            return f"Commented on a commit in {repo_name}"
+        Events are decoded into compact Event records, so by default a
+        handler sees only the Event fields. With ``payload=True`` events
+        of this type decoded from then on also keep their full payload in
+        ``event.payload``; register before fetching. A registered function
+        always receives an Event: event dictionaries are projected first.
         
-        elif event_type == 'ReleaseEvent':
-            action = event.get('payload', {}).get('action', 'published')
-            return f"{action.capitalized()} a release in {repo_name}"
+        Args:
+            event_type: GitHub event type, e.g. ``"PushEvent"``
+            template: Format template (see compile_template)
+            default_action: Action used when an event's payload has none
+            payload: Keep the full payload of events of this type
+        """
+        if payload:
+            Event.KEEP_PAYLOAD.add(event_type)
+        if template is not None:
+            cls.handlers[event_type] = compile_template(template, default_action)
+            return None
         
-        elif event_type == 'MemberEvent':
-            action = event.get('payload', {}).get('action', 'added')
-            return f"{action.capitalized()} a member to {repo_name}"
+        def decorator(handler: Callable[[Event], str]) -> Callable[[Event], str]:
+            def project(event: Union[Event, Dict[str, Any]]) -> str:
+                return handler(Event.from_dict(event) if isinstance(event, dict) else event)
+            cls.handlers[event_type] = project
+            return handler
+        return decorator
+    
+    @classmethod
+    def format_event(cls, event: Union[Event, Dict[str, Any]]) -> str:
+        """
+        Format a single GitHub event into a readable string.
         
-        else:
-            return f"Performed {event_type} in {repo_name}"
+        Args:
+            event: Event record, or a GitHub event dictionary
+            
+        Returns:
+            Formatted string representation of the event
+        """
+        event_type = event.get('type', 'Unknown') if isinstance(event, dict) else event.type
+        return cls.handlers.get(event_type, cls.fallback)(event)
     
-    @staticmethod
-    def format_events(events: List[Dict[str, Any]], max_events: int = 10) -> str:
+    @classmethod
+    def format_events(cls, events: List[Union[Event, Dict[str, Any]]], max_events: int = 10) -> str:
         """
         Format a list of GitHub events into a readable string.
         
+        All lines are collected in one list and joined once, with the
+        handler table bound locally, so thousands of events render
+        without a method call per event.
+        
         Args:
-            events: List of GitHub event dictionaries
+            events: List of Event records or GitHub event dictionaries
             max_events: Maximum number of events to display
             
         Returns:
@@ -150,12 +922,12 @@ class ActivityFormatter:
         if not events:
             return "No recent activity found for this user."
         
+        handler_for = cls.handlers.get
+        fallback = cls.fallback
         # Limit the number of events to display
-        events_to_show = events[:max_events]
-        
-        formatted_events = []
-        for event in events_to_show:
-            formatted_events.append(f"- {ActivityFormatter.format_event(event)}")
+        formatted_events = ["- " + handler_for(event.get('type', 'Unknown') if isinstance(event, dict) else event.type,
+                                               fallback)(event)
+                            for event in events[:max_events]]
         
         if len(events) > max_events:
             formatted_events.append(f"\n... and {len(events) - max_events} more events")
@@ -163,16 +935,109 @@ class ActivityFormatter:
         return "\n".join(formatted_events)
 
 
+def load_plugins(names: Iterable[str]) -> None:
+    """
+    Import formatter plugins by module name.
+    
+    A plugin is any importable module that calls ActivityFormatter.register
+    when imported.
+    
+    Raises:
+        ValueError: If a module cannot be imported
+    """
+    # Run as a script this module is __main__; plugins importing github_activity must get it too
+    sys.modules.setdefault('github_activity', sys.modules[__name__])
+    for name in names:
+        name = name.strip()
+        if not name:
+            continue
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            raise ValueError(f"Cannot load formatter plugin '{name}': {e}")
+
+
 def main():
     """Main function to run the GitHub Activity CLI."""
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description="Fetch and display recent activity of a GitHub user",
+        epilog="Examples: python github_activity.py kamranahmedse --pages 3\n"
+               "          python github_activity.py --users team.txt")
+    parser.add_argument('username', nargs='?', help='GitHub username')
+    parser.add_argument('--users', metavar='FILE',
+                        help="File with one username per line ('-' for stdin)")
+    pages = parser.add_mutually_exclusive_group()
+    pages.add_argument('--pages', type=int, default=1,
+                       help='Number of pages of events to fetch (default: 1)')
+    pages.add_argument('--all', action='store_true', help='Fetch every page of events')
+    parser.add_argument('--limit', type=int,
+                        help='Maximum number of events to show (default: 10 for one page, all otherwise)')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Requests in flight at once: pages of one user, '
+                             'or users with --users (default: 4)')
+    parser.add_argument('--wait', action='store_true',
+                        help='Wait for the rate limit to reset instead of failing')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the response cache')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Revalidate cached responses even within the poll interval')
+    args = parser.parse_args()
     
-    # Check if username is provided as command line argument
-    if len(sys.argv) != 2:
-        print("Usage: python github_activity.py <username>")
-        print("Example: python github_activity.py kamranahmedse")
+    try:
+        load_plugins(os.environ.get('GITHUB_ACTIVITY_PLUGINS', '').split(','))
+    except ValueError as e:
+        print(f"Error: {e}")
         sys.exit(1)
+    if args.pages < 1:
+        parser.error("--pages must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if (args.username is None) == (args.users is None):
+        parser.error("give either a username or --users FILE")
+    pages = None if args.all else args.pages
+    limit = args.limit if args.limit is not None else (10 if pages == 1 else None)
+    
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = ResponseCache()
+        except OSError:
+            pass  # No writable cache directory: fetch without one
+    budget = RateLimitBudget(wait=args.wait)
+    
+    if args.users is not None:
+        try:
+            if args.users == '-':
+                usernames = read_usernames(sys.stdin)
+            else:
+                with open(args.users, 'r', encoding='utf-8') as file:
+                    usernames = read_usernames(file)
+        except OSError as e:
+            print(f"Error: Cannot read {args.users}: {e.strerror}")
+            sys.exit(1)
+        if not usernames:
+            print("Error: No usernames given")
+            sys.exit(1)
+        
+        # Pages of one user are fetched in turn; the workers go to users instead
+        fetcher = GitHubActivityFetcher(max_workers=1, cache=cache, refresh=args.refresh,
+                                        pool=ConnectionPool(max_idle=args.workers), budget=budget)
+        formatter = ActivityFormatter()
+        failed = 0
+        for username, events, error in fetcher.fetch_many(usernames, pages, args.workers):
+            lines = [f"Recent activity for GitHub user: {username}", "=" * 50]
+            if error is not None:
+                failed += 1
+                lines.append(f"Error: {error}")
+            else:
+                lines.append(formatter.format_events(events, limit if limit is not None else len(events)))
+            print("\n".join(lines) + "\n", flush=True)
+        fetcher.pool.close()
+        print(f"Fetched {len(usernames) - failed} of {len(usernames)} users")
+        sys.exit(1 if failed else 0)
     
-    username = sys.argv[1].strip()
+    username = args.username.strip()
     
     if not username:
         print("Error: Username cannot be empty")
@@ -183,12 +1048,13 @@ def main():
     
     try:
         # Fetch user activity
-        fetcher = GitHubActivityFetcher()
-        events = fetcher.fetch_user_events(username)
+        fetcher = GitHubActivityFetcher(max_workers=args.workers, cache=cache, refresh=args.refresh,
+                                        budget=budget)
+        events = fetcher.fetch_user_events(username, pages)
         
         # Format and display the activity
         formatter = ActivityFormatter()
-        formatted_activity = formatter.format_events(events)
+        formatted_activity = formatter.format_events(events, limit if limit is not None else len(events))
         
         print(formatted_activity)
         
@@ -0,0 +1,301 @@
+"""Tests for the GitHub API client against local API stubs (run with ``python -m pytest``)."""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from github_activity import (ActivityFormatter, ConnectionPool, Event, GitHubActivityFetcher, ResponseCache,
+                             compile_template, decode_events)
+
+
+TOTAL_EVENTS = 250
+
+
+def make_event(i):
+    return {"id": str(10_000 - i), "type": "WatchEvent", "repo": {"name": f"octocat/repo{i % 5}"},
+            "payload": {"action": "started"}}
+
+
+class EventsHandler(BaseHTTPRequestHandler):
+    """
+    Serve ``/users/<name>/events`` in pages with ``Link`` headers.
+
+    Every page after the first repeats the last event of the page before
+    it, as happens when new activity shifts events while pages are read.
+    ``/users/broken/events`` fails from the second page on.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        parts = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(parts.query))
+        per_page = int(query.get("per_page", 30))
+        page = int(query.get("page", 1))
+        self.server.requests.append((parts.path, per_page, page))
+
+        if parts.path == "/users/broken/events" and page > 1:
+            return self.send_body(500, b'{"message":"Server Error"}')
+        if parts.path == "/users/missing/events":
+            return self.send_body(404, b'{"message":"Not Found"}')
+
+        last = -(-TOTAL_EVENTS // per_page)
+        start = (page - 1) * per_page
+        first = start - 1 if page > 1 else start
+        events = [make_event(i) for i in range(first, min(start + per_page, TOTAL_EVENTS))]
+        base = f"http://{self.headers['Host']}{parts.path}"
+        links = []
+        if page < last:
+            links.append(f'<{base}?per_page={per_page}&page={page + 1}>; rel="next"')
+            if self.server.send_last:
+                links.append(f'<{base}?per_page={per_page}&page={last}>; rel="last"')
+        self.send_body(200, json.dumps(events).encode(), {"Link": ", ".join(links)} if links else {})
+
+    def send_body(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class PaginationTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), EventsHandler)
+        self.server.requests = []
+        self.server.send_last = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address
+        self.server_url = f"http://{host}:{port}"
+        # Connect directly even if the environment names a proxy
+        self.fetcher = GitHubActivityFetcher(base_url=self.server_url, max_workers=2,
+                                             pool=ConnectionPool(proxies={}))
+
+    def tearDown(self):
+        self.fetcher.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def requested_pages(self):
+        return sorted(page for _, _, page in self.server.requests)
+
+    def test_pagination_stops_at_last_page(self):
+        events = self.fetcher.fetch_user_events("octocat", pages=None)
+        self.assertEqual(self.requested_pages(), [1, 2, 3])
+        self.assertTrue(all(per_page == GitHubActivityFetcher.PER_PAGE for _, per_page, _ in self.server.requests))
+        self.assertEqual(len(events), TOTAL_EVENTS)
+
+    def test_page_count_caps_requests(self):
+        self.fetcher.fetch_user_events("octocat", pages=2)
+        self.assertEqual(self.requested_pages(), [1, 2])
+        self.server.requests.clear()
+        self.fetcher.fetch_user_events("octocat", pages=1)
+        self.assertEqual(self.server.requests, [("/users/octocat/events", GitHubActivityFetcher.PER_PAGE, 1)])
+
+    def test_next_links_followed_without_last(self):
+        self.server.send_last = False
+        events = self.fetcher.fetch_user_events("octocat", pages=None)
+        self.assertEqual(self.requested_pages(), [1, 2, 3])
+        self.assertEqual(len(events), TOTAL_EVENTS)
+
+    def test_duplicates_across_pages_removed(self):
+        events = self.fetcher.fetch_user_events("octocat", pages=None)
+        ids = [event.id for event in events]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(ids, [make_event(i)["id"] for i in range(TOTAL_EVENTS)])
+
+    def test_error_page_raises(self):
+        with self.assertRaisesRegex(ValueError, "GitHub API error: 500"):
+            self.fetcher.fetch_user_events("broken", pages=None)
+        with self.assertRaisesRegex(ValueError, "User 'missing' not found"):
+            self.fetcher.fetch_user_events("missing", pages=None)
+
+    def test_requests_go_through_http_proxy(self):
+        # The stub answers absolute-URL requests, so it can stand in for the proxy
+        self.fetcher.pool = ConnectionPool(proxies={"http": self.server_url})
+        self.fetcher.base_url = "http://api.github.invalid"
+        events = self.fetcher.fetch_user_events("octocat", pages=None)
+        self.assertEqual(self.requested_pages(), [1, 2, 3])
+        self.assertEqual(len(events), TOTAL_EVENTS)
+
+
+EVENTS = [{"id": "2", "type": "WatchEvent", "repo": {"name": "octocat/hello"}, "payload": {"action": "started"}},
+          {"id": "1", "type": "CreateEvent", "repo": {"name": "octocat/hello"}, "payload": {"ref_type": "branch"}}]
+
+
+def ids(events):
+    return [event.id for event in events]
+
+
+class ConditionalHandler(BaseHTTPRequestHandler):
+    """
+    Serve ``/users/<name>/events`` with an ETag and ``X-Poll-Interval``.
+
+    A request carrying the current ETag in ``If-None-Match`` gets a 304.
+    Every request is recorded with its ``If-None-Match`` header.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        etag = f'"v{self.server.version}"'
+        self.server.requests.append((self.path, self.headers.get("If-None-Match")))
+        headers = {"ETag": etag, "X-Poll-Interval": str(self.server.poll_interval)}
+        if self.headers.get("If-None-Match") == etag:
+            return self.send_body(304, b"", headers)
+        self.send_body(200, json.dumps(EVENTS[:self.server.version]).encode(), headers)
+
+    def send_body(self, status, body, headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="github-cache-test-")
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ConditionalHandler)
+        self.server.requests = []
+        self.server.version = 1
+        self.server.poll_interval = 60
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address
+        self.cache = ResponseCache(self.directory)
+        self.fetcher = GitHubActivityFetcher(base_url=f"http://{host}:{port}", cache=self.cache,
+                                             pool=ConnectionPool(proxies={}))
+
+    def tearDown(self):
+        self.fetcher.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_poll_interval_serves_from_cache(self):
+        self.assertEqual(ids(self.fetcher.fetch_user_events("octocat")), ["2"])
+        self.server.version = 2
+        self.assertEqual(ids(self.fetcher.fetch_user_events("octocat")), ["2"])
+        self.assertEqual(len(self.server.requests), 1)
+
+        # --refresh revalidates even within the poll interval
+        self.fetcher.refresh = True
+        self.assertEqual(ids(self.fetcher.fetch_user_events("octocat")), ["2", "1"])
+        self.assertEqual(self.server.requests[-1][1], '"v1"')
+
+    def test_not_modified_is_served_from_cache(self):
+        self.server.poll_interval = 0
+        events = ids(self.fetcher.fetch_user_events("octocat"))
+        url = self.fetcher.base_url + self.server.requests[0][0]
+        fetched_at = self.cache.get(url)["fetched_at"]
+        self.server.poll_interval = 30
+
+        self.assertEqual(ids(self.fetcher.fetch_user_events("octocat")), events)
+        self.assertEqual([etag for _, etag in self.server.requests], [None, '"v1"'])
+        meta = self.cache.get(url)
+        self.assertGreaterEqual(meta["fetched_at"], fetched_at)
+        # The poll interval sent with the 304 applies from now on
+        self.assertEqual(meta["poll_interval"], 30)
+        self.fetcher.fetch_user_events("octocat")
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_changed_response_replaces_cache_entry(self):
+        self.server.poll_interval = 0
+        self.fetcher.fetch_user_events("octocat")
+        self.server.version = 2
+        self.assertEqual(ids(self.fetcher.fetch_user_events("octocat")), ["2", "1"])
+        self.server.version = 1
+        self.assertEqual(len(self.fetcher.fetch_user_events("octocat")), 1)
+        self.assertEqual([etag for _, etag in self.server.requests], [None, '"v1"', '"v2"'])
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ResponseCache(self.directory, max_bytes=300)
+        urls = [f"https://api.github.com/users/user{i}/events" for i in range(3)]
+        now = time.time()
+        for age, url in zip((30, 20, 10), urls):
+            cache.store(url, b"x" * 100, {})
+            body_path = cache._paths(url)[1]
+            os.utime(body_path, (now - age, now - age))
+        # Reading the oldest entry makes it the most recently used
+        cache.open_body(urls[0]).close()
+        cache.store("https://api.github.com/users/new/events", b"y" * 100, {})
+
+        self.assertIsNone(cache.get(urls[1]))
+        for url in (urls[0], urls[2], "https://api.github.com/users/new/events"):
+            self.assertIsNotNone(cache.get(url))
+        self.assertEqual(len(os.listdir(self.directory)), 6)
+
+
+class CompileTemplateTest(unittest.TestCase):
+    def test_matches_str_format(self):
+        event = Event("1", "IssuesEvent", "octocat/hello", None, "branch", 3)
+        handler = compile_template("{{{action}}} {ref_type!r:>10}: {commits} in {repo}", "opened")
+        self.assertEqual(handler(event), "{Opened}   'branch': 3 in octocat/hello")
+        self.assertEqual(compile_template("Plain text")(event), "Plain text")
+
+    def test_dicts_format_like_records(self):
+        dicts = [
+            {"id": "1", "type": "IssuesEvent", "repo": {"name": "octocat/hello"}, "payload": {"action": "closed"}},
+            {"id": "2", "type": "PushEvent", "repo": {"name": "octocat/hello"}, "payload": {"commits": [{}]}},
+            {"id": "3", "type": "CreateEvent", "payload": {"ref_type": "tag"}},
+            {"id": "4", "type": "WatchEvent", "repo": {"name": "octocat/hello"}},
+            {"id": "5", "repo": {"name": "octocat/hello"}},
+        ]
+        for template in ("Plain text", "{repo}", "{action} {repo}", "{type}: {commits} in {repo}",
+                         "{repo!r}", "{action!r} {{{ref_type:>8}}}"):
+            handler = compile_template(template, "opened")
+            for event in dicts:
+                with self.subTest(template=template, event=event["id"]):
+                    self.assertEqual(handler(event), handler(Event.from_dict(event)))
+        self.assertEqual(ActivityFormatter.format_events(dicts),
+                         ActivityFormatter.format_events([Event.from_dict(event) for event in dicts]))
+        self.assertEqual(ActivityFormatter.format_event(dicts[1]), "Pushed 1 commit to octocat/hello")
+        self.assertEqual(ActivityFormatter.format_event(dicts[4]), "Performed Unknown in octocat/hello")
+
+    def test_invalid_templates_raise_value_error(self):
+        for template in ("{repo!x}", "{unknown}", "{}", "{repo:>10d}", "{repo:{width}}", "{repo"):
+            with self.subTest(template=template), self.assertRaises(ValueError):
+                compile_template(template)
+
+
+class PluginPayloadTest(unittest.TestCase):
+    def tearDown(self):
+        ActivityFormatter.handlers.pop("DiscussionEvent", None)
+        Event.KEEP_PAYLOAD.discard("DiscussionEvent")
+
+    def test_payload_kept_only_for_registered_types(self):
+        @ActivityFormatter.register("DiscussionEvent", payload=True)
+        def format_discussion(event):
+            return f"Opened '{event.payload['discussion']['title']}' in {event.repo}"
+
+        body = json.dumps([
+            {"id": "2", "type": "DiscussionEvent", "repo": {"name": "octocat/hello"},
+             "payload": {"action": "created", "discussion": {"title": "Roadmap"}}},
+            {"id": "1", "type": "WatchEvent", "repo": {"name": "octocat/hello"}, "payload": {"action": "started"}},
+        ]).encode()
+        discussion, watch = decode_events(io.BytesIO(body))
+        self.assertIsNone(watch.payload)
+        self.assertEqual(ActivityFormatter.format_event(discussion), "Opened 'Roadmap' in octocat/hello")
+        # Dictionaries are projected into an Event before reaching a registered function
+        self.assertEqual(ActivityFormatter.format_event(json.loads(body)[0]), "Opened 'Roadmap' in octocat/hello")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Task Tracker CLI.
+
+``run`` generates synthetic task stores, times TaskTracker operations both
+in-process and through the CLI, reports p50/p99 latency and memory, and saves
+the results as JSON. ``compare`` diffs two result files so regressions between
+commits stand out. ``records`` compares the legacy dict-per-task model with
+the compact ``Task`` record. ``render`` times list output written to the
+null device: a print per row against the buffered renderer in every format.
+
+Examples:
+  python benchmark.py run
+  python benchmark.py run --sizes 1k,100k,1m --backends json,sqlite
+  python benchmark.py compare before.json after.json
+  python benchmark.py records --tasks 100000
+  python benchmark.py render --tasks 200000
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from task_cli import (STORAGE_BACKENDS, SqliteStorage, TABLE_FORMATS, Task, TaskTracker, VALID_STATUSES,
+                      format_timestamp, make_storage, render_task_table, write_chunked)
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "task_cli.py")
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def make_task_dicts(count: int) -> List[Dict]:
+    """Generate ``count`` tasks in the JSON layout written by task_cli.py."""
+    start = datetime(2024, 1, 1)
+    tasks = []
+    for i in range(1, count + 1):
+        created = start + timedelta(seconds=i * 7, microseconds=i)
+        updated = created + timedelta(minutes=i % 90, microseconds=i % 1000)
+        tasks.append({
+            "id": i,
+            "description": f"Synthetic task number {i}",
+            "status": VALID_STATUSES[i % len(VALID_STATUSES)],
+            "createdAt": created.isoformat(),
+            "updatedAt": updated.isoformat()
+        })
+    return tasks
+
+
+def measure_memory(build: Callable[[], object]) -> int:
+    """Return the bytes still allocated by the object ``build`` returns."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def measure_time(func: Callable[[], object], repeat: int = 3) -> float:
+    """Return the best of ``repeat`` runs of ``func`` in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def render_dicts(tasks: List[Dict]) -> None:
+    """Format timestamps the way list_tasks did before the Task record."""
+    for task in tasks:
+        datetime.fromisoformat(task["createdAt"]).strftime("%Y-%m-%d %H:%M")
+        datetime.fromisoformat(task["updatedAt"]).strftime("%Y-%m-%d %H:%M")
+
+
+def render_records(tasks: List[Task]) -> None:
+    """Format timestamps through the per-minute label cache."""
+    for task in tasks:
+        format_timestamp(task.created)
+        format_timestamp(task.updated)
+
+
+def compare_records(count: int) -> None:
+    """Print a memory/latency comparison of dict tasks and Task records."""
+    # Both models are built from freshly decoded JSON, as when loading tasks.json
+    payload = json.dumps(make_task_dicts(count))
+
+    dict_bytes = measure_memory(lambda: json.loads(payload))
+    record_bytes = measure_memory(lambda: [Task.from_dict(task) for task in json.loads(payload)])
+
+    dicts = json.loads(payload)
+    records = [Task.from_dict(task) for task in dicts]
+
+    rows = [
+        ("memory (MB)", dict_bytes / 2 ** 20, record_bytes / 2 ** 20),
+        ("memory per task (bytes)", dict_bytes / count, record_bytes / count),
+        ("format timestamps (ms)", measure_time(lambda: render_dicts(dicts)),
+         measure_time(lambda: render_records(records))),
+        ("sort by updated (ms)", measure_time(lambda: sorted(dicts, key=lambda t: t["updatedAt"])),
+         measure_time(lambda: sorted(records, key=lambda t: t.updated))),
+    ]
+
+    print(f"Task records at {count:,} tasks")
+    print(f"{'Metric':<26} {'dict':>12} {'Task':>12} {'ratio':>8}")
+    print("-" * 61)
+    for name, before, after in rows:
+        ratio = before / after if after else float("inf")
+        print(f"{name:<26} {before:>12.1f} {after:>12.1f} {ratio:>7.1f}x")
+
+
+def print_per_row(tasks: List[Task]) -> None:
+    """The task table written with one print per row, as list_tasks did before chunking."""
+    print(f"\n{'ID':<4} {'Status':<12} {'Description':<50} {'Created':<20} {'Updated':<20}")
+    print("-" * 110)
+    for task in tasks:
+        description = task.description[:47] + "..." if len(task.description) > 47 else task.description
+        print(f"{task.id:<4} {task.status:<12} {description:<50} "
+              f"{format_timestamp(task.created):<20} {format_timestamp(task.updated):<20}")
+
+
+def compare_renderers(count: int) -> None:
+    """Print how long listing ``count`` tasks to the null device takes per renderer."""
+    tasks = [Task.from_dict(task) for task in make_task_dicts(count)]
+    with open(os.devnull, "w", encoding="utf-8") as sink:
+        def per_row():
+            with contextlib.redirect_stdout(sink):
+                print_per_row(tasks)
+        
+        timings = [("print per row", measure_time(per_row))]
+        for fmt in TABLE_FORMATS:
+            timings.append((fmt, measure_time(lambda: write_chunked(render_task_table(tasks, fmt), sink))))
+    
+    baseline = timings[0][1]
+    print(f"Listing {count:,} tasks")
+    print(f"{'Renderer':<16} {'ms':>10} {'rows/s':>12} {'speedup':>8}")
+    print("-" * 49)
+    for name, ms in timings:
+        print(f"{name:<16} {ms:>10.1f} {count / ms * 1000:>12,.0f} {baseline / ms:>7.1f}x")
+
+
+def parse_size(value: str) -> int:
+    """Parse '1k', '100k' or '1m' into a task count."""
+    value = value.strip().lower()
+    if value and value[-1] in SIZE_SUFFIXES:
+        return int(float(value[:-1]) * SIZE_SUFFIXES[value[-1]])
+    return int(value)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def summarize(samples: List[float]) -> Dict:
+    """Latency summary in milliseconds."""
+    return {
+        "samples": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 4),
+        "p99_ms": round(percentile(samples, 99) * 1000, 4),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 4),
+    }
+
+
+def build_store(directory: str, count: int, backend: str) -> None:
+    """Write a synthetic store of ``count`` tasks for ``backend`` into ``directory``."""
+    data_file = os.path.join(directory, "tasks.json")
+    with open(data_file, 'w', encoding='utf-8') as file:
+        json.dump({"nextId": count + 1, "tasks": make_task_dicts(count)}, file)
+    if backend == "sqlite":
+        storage = SqliteStorage(data_file)
+        storage.import_json(data_file)
+        storage.conn.close()
+        os.remove(data_file)
+
+
+def time_calls(func: Callable[[int], object], args: List[int]) -> List[float]:
+    """Call ``func`` once per argument and return each call's duration in seconds."""
+    samples = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for arg in args:
+            start = time.perf_counter()
+            func(arg)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_in_process(directory: str, count: int, backend: str, ops: int) -> Dict:
+    """Time load and add/update/mark/delete/find/list on a resident TaskTracker."""
+    data_file = os.path.join(directory, "tasks.json")
+    rng = random.Random(count)
+    
+    # Memory is traced on a separate load since tracing slows allocation down
+    memory_bytes = measure_memory(lambda: TaskTracker(data_file, storage=make_storage(data_file, backend)))
+    gc.collect()
+    start = time.perf_counter()
+    tracker = TaskTracker(data_file, storage=make_storage(data_file, backend))
+    load_seconds = time.perf_counter() - start
+    
+    ids = rng.sample(range(1, count + 1), min(ops * 2, count))
+    to_update, to_delete = ids[:len(ids) // 2], ids[len(ids) // 2:]
+    sink = io.StringIO()
+    
+    def list_page(_):
+        sink.seek(0)
+        write_chunked(render_task_table(tracker.store.page(limit=20)), sink)
+    
+    def list_status(_):
+        sink.seek(0)
+        write_chunked(render_task_table(tracker.store.page("done", limit=20)), sink)
+    
+    operations = {
+        "add": time_calls(lambda i: tracker.add_task(f"Benchmark task {i}"), list(range(ops))),
+        "update": time_calls(lambda i: tracker.update_task(i, f"Updated task {i}"), to_update),
+        "mark": time_calls(lambda i: tracker.mark_task_status(i, "done"), to_update),
+        "delete": time_calls(tracker.delete_task, to_delete),
+        "find": time_calls(tracker._find_task_by_id, [rng.randint(1, count) for _ in range(ops * 50)]),
+        "list --limit 20": time_calls(list_page, list(range(ops))),
+        "list done --limit 20": time_calls(list_status, list(range(ops))),
+    }
+    tracker.flush()
+    return {
+        "load_ms": round(load_seconds * 1000, 3),
+        "memory_mb": round(memory_bytes / 2 ** 20, 2),
+        "operations": {name: summarize(samples) for name, samples in operations.items()},
+    }
+
+
+def bench_cli(directory: str, count: int, backend: str, runs: int) -> Dict:
+    """Time whole CLI invocations (interpreter start, load, command, save)."""
+    env = dict(os.environ, TASK_STORAGE=backend)
+    env.pop("TASK_SOCKET", None)
+    commands = {
+        "add": lambda i: ["add", f"CLI task {i}"],
+        "mark-done": lambda i: ["mark-done", str(i + 1)],
+        "list --limit 20": lambda i: ["list", "--limit", "20"],
+    }
+    results = {}
+    for name, make_args in commands.items():
+        samples = []
+        for i in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, SCRIPT] + make_args(i), cwd=directory, env=env,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            samples.append(time.perf_counter() - start)
+        results[name] = summarize(samples)
+    return results
+
+
+def git_revision() -> Optional[str]:
+    """Current commit of the repository, if available."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(SCRIPT), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes: List[int], backends: List[str], ops: int, cli_runs: int) -> Dict:
+    """Run every size/backend combination and return the results document."""
+    results = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": [],
+    }
+    for count in sizes:
+        for backend in backends:
+            directory = tempfile.mkdtemp(prefix="task-bench-")
+            try:
+                print(f"Benchmarking {backend} store with {count:,} tasks...", file=sys.stderr)
+                build_store(directory, count, backend)
+                run = {"tasks": count, "backend": backend}
+                run["in_process"] = bench_in_process(directory, count, backend, ops)
+                if cli_runs:
+                    run["cli"] = bench_cli(directory, count, backend, cli_runs)
+                results["runs"].append(run)
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def print_results(results: Dict) -> None:
+    """Print a results document as a table."""
+    print(f"\n{'Tasks':>9} {'Backend':<8} {'Mode':<6} {'Operation':<22} {'p50 ms':>10} {'p99 ms':>10}")
+    print("-" * 70)
+    for run in results["runs"]:
+        label = f"{run['tasks']:>9,} {run['backend']:<8}"
+        in_process = run["in_process"]
+        print(f"{label} {'load':<6} {'load':<22} {in_process['load_ms']:>10.2f} "
+              f"{'':>10}  ({in_process['memory_mb']:.1f} MB)")
+        for mode in ("in_process", "cli"):
+            operations = run.get(mode, {})
+            operations = operations.get("operations", operations)
+            for name, stats in operations.items():
+                mode_label = "proc" if mode == "in_process" else "cli"
+                print(f"{label} {mode_label:<6} {name:<22} {stats['p50_ms']:>10.3f} {stats['p99_ms']:>10.3f}")
+
+
+def iter_metrics(results: Dict):
+    """Yield ((tasks, backend, mode, operation), p50_ms) for every measurement."""
+    for run in results["runs"]:
+        key = (run["tasks"], run["backend"])
+        yield key + ("load", "load"), run["in_process"]["load_ms"]
+        for name, stats in run["in_process"]["operations"].items():
+            yield key + ("proc", name), stats["p50_ms"]
+        for name, stats in run.get("cli", {}).items():
+            yield key + ("cli", name), stats["p50_ms"]
+
+
+def compare_results(before_file: str, after_file: str, threshold: float) -> bool:
+    """Print p50 changes between two result files; return False if any regressed."""
+    with open(before_file, encoding='utf-8') as file:
+        before = dict(iter_metrics(json.load(file)))
+    with open(after_file, encoding='utf-8') as file:
+        after = dict(iter_metrics(json.load(file)))
+    
+    regressed = False
+    print(f"{'Tasks':>9} {'Backend':<8} {'Mode':<6} {'Operation':<22} {'before':>10} {'after':>10} {'change':>8}")
+    print("-" * 79)
+    for key in sorted(set(before) & set(after)):
+        old, new = before[key], after[key]
+        change = (new - old) / old * 100 if old else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        tasks, backend, mode, name = key
+        print(f"{tasks:>9,} {backend:<8} {mode:<6} {name:<22} {old:>10.3f} {new:>10.3f} {change:>+7.1f}%{flag}")
+    return not regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Task Tracker benchmarks",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog=__doc__.split("Examples:")[1])
+    subparsers = parser.add_subparsers(dest="command")
+    
+    run_parser = subparsers.add_parser("run", help="Benchmark synthetic task stores")
+    run_parser.add_argument("--sizes", default="1k,100k", help="Comma-separated store sizes (e.g. 1k,100k,1m)")
+    run_parser.add_argument("--backends", default=",".join(STORAGE_BACKENDS),
+                            help="Comma-separated storage backends")
+    run_parser.add_argument("--ops", type=int, default=50, help="Operations timed per measurement")
+    run_parser.add_argument("--cli-runs", type=int, default=10,
+                            help="CLI invocations per command (0 to skip the CLI)")
+    run_parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    
+    compare_parser = subparsers.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--threshold", type=float, default=10.0,
+                                help="Percent slowdown of p50 reported as a regression")
+    
+    records_parser = subparsers.add_parser("records", help="Compare dict tasks with Task records")
+    records_parser.add_argument("--tasks", type=int, default=100_000, help="Number of synthetic tasks")
+    
+    render_parser = subparsers.add_parser("render", help="Time list output per format")
+    render_parser.add_argument("--tasks", type=int, default=200_000, help="Number of synthetic tasks")
+    
+    args = parser.parse_args()
+    if args.command == "run":
+        backends = [backend.strip() for backend in args.backends.split(",")]
+        unknown = [backend for backend in backends if backend not in STORAGE_BACKENDS]
+        if unknown:
+            parser.error(f"unknown backend(s): {', '.join(unknown)}")
+        sizes = [parse_size(size) for size in args.sizes.split(",")]
+        results = run_benchmarks(sizes, backends, args.ops, args.cli_runs)
+        print_results(results)
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+        print(f"\nResults saved to {args.output}")
+    elif args.command == "compare":
+        if not compare_results(args.before, args.after, args.threshold):
+            sys.exit(1)
+    elif args.command == "records":
+        compare_records(args.tasks)
+    elif args.command == "render":
+        compare_renderers(args.tasks)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
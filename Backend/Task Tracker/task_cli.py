@@ -3,22 +3,282 @@
 Task Tracker CLI - A simple command line interface to track and manage tasks.
 """
 
+import bisect
+import csv
+import heapq
+import io
 import json
+import re
+import shlex
+import signal
+import socket
+import socketserver
+import sqlite3
 import sys
 import os
-from datetime import datetime
-from typing import Dict, List, Optional
+import threading
+import time
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import chain, count, islice
+from operator import attrgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
+from shared.durability import GroupCommitter, atomic_write
+from shared.rendering import TABLE_FORMATS, render_records, render_rows, tsv_cell, write_chunked
 
-class TaskTracker:
-    """Main class for managing tasks and CLI operations."""
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory file locks
+    fcntl = None
+
+
+VALID_STATUSES = ["todo", "in-progress", "done"]
+SORT_FIELDS = {"id": "id", "created": "createdAt", "updated": "updatedAt"}
+TASK_HEADERS = ("ID", "Status", "Description", "Created", "Updated")
+TASK_WIDTHS = (4, 12, 50, 20, 20)
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def iso_to_micros(value: str) -> int:
+    """Convert an ISO timestamp to integer microseconds since 1970-01-01 (naive local time)."""
+    return (datetime.fromisoformat(value).replace(tzinfo=None) - EPOCH) // MICROSECOND
+
+
+def micros_to_iso(micros: int) -> str:
+    """Convert integer microseconds back to the ISO string the tracker writes."""
+    return (EPOCH + micros * MICROSECOND).isoformat()
+
+
+@lru_cache(maxsize=4096)
+def _minute_label(minute: int) -> str:
+    return (EPOCH + timedelta(minutes=minute)).strftime("%Y-%m-%d %H:%M")
+
+
+def format_timestamp(micros: int) -> str:
+    """Format a timestamp as 'YYYY-MM-DD HH:MM', caching one label per minute."""
+    return _minute_label(micros // 60_000_000)
+
+
+class Task:
+    """
+    Compact task record.
+    
+    ``__slots__`` avoids a per-task dict, and both timestamps are kept as
+    integer microseconds instead of ISO strings, so sorting compares ints and
+    listings never re-parse a string. ``from_dict``/``to_dict`` convert to and
+    from the JSON layout on disk; timestamps are naive local times, as the
+    tracker has always written them.
+    """
+    
+    __slots__ = ("id", "description", "status", "created", "updated")
+    
+    def __init__(self, task_id: int, description: str, status: str, created: int, updated: int):
+        self.id = task_id
+        self.description = description
+        self.status = status
+        self.created = created
+        self.updated = updated
+    
+    def __repr__(self) -> str:
+        return f"Task(id={self.id}, status={self.status!r}, description={self.description!r})"
+    
+    @staticmethod
+    def now() -> int:
+        """Current local time as integer microseconds."""
+        return (datetime.now() - EPOCH) // MICROSECOND
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Task":
+        """Build a record from the JSON task layout."""
+        return cls(data["id"], data["description"], data["status"],
+                   iso_to_micros(data["createdAt"]), iso_to_micros(data["updatedAt"]))
+    
+    def to_dict(self) -> Dict:
+        """Return the JSON task layout."""
+        return {
+            "id": self.id,
+            "description": self.description,
+            "status": self.status,
+            "createdAt": micros_to_iso(self.created),
+            "updatedAt": micros_to_iso(self.updated)
+        }
+
+
+class TaskStore:
+    """
+    In-memory task collection indexed by ID and by status.
+    
+    Tasks live in a dict keyed by ID, and each status keeps its own bucket of
+    IDs (a sorted list maintained with bisect) that is updated on every
+    mutation, so lookups, deletes and filtered listings don't scan the whole
+    collection. IDs come from a monotonic counter that is saved in the file
+    header as ``nextId`` and is never reused after a delete.
+    
+    ``by_id`` is kept in ID order. A sorted ``(created, id)`` or
+    ``(updated, id)`` list is built the first time a listing sorts by that
+    timestamp and is then maintained with bisect on every change. IDs only
+    follow creation order for tasks added here, not for imported ones.
+    """
+    
+    def __init__(self, tasks: Optional[List[Task]] = None, next_id: Optional[int] = None):
+        self.by_id: Dict[int, Task] = {}
+        self.by_status: Dict[str, List[int]] = {status: [] for status in VALID_STATUSES}
+        self.time_index: Dict[str, List[Tuple[int, int]]] = {}
+        self.next_id = 1
+        for task in tasks or []:
+            self.add(task)
+        self.next_id = max(self.next_id, next_id or 1)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TaskStore":
+        """Build a store from the on-disk ``{"nextId": ..., "tasks": [...]}`` layout."""
+        return cls([Task.from_dict(task) for task in data.get("tasks", [])], data.get("nextId"))
+    
+    def to_dict(self) -> Dict:
+        """Return the on-disk layout for this store."""
+        return {"nextId": self.next_id, "tasks": [task.to_dict() for task in list(self.by_id.values())]}
+    
+    def __len__(self) -> int:
+        return len(self.by_id)
+    
+    def __iter__(self):
+        return iter(self.by_id.values())
+    
+    def allocate_id(self) -> int:
+        """Hand out the next task ID."""
+        task_id = self.next_id
+        self.next_id += 1
+        return task_id
+    
+    def get(self, task_id: int) -> Optional[Task]:
+        """Find a task by its ID."""
+        return self.by_id.get(task_id)
+    
+    def add(self, task: Task) -> None:
+        """Insert a task, or replace the stored task with the same ID."""
+        existing = self.by_id.get(task.id)
+        if existing is not None:
+            self._unindex_status(existing.status, task.id)
+            self._unindex_times(existing)
+        self.by_id[task.id] = task
+        self._index_status(task.status, task.id)
+        self._index_times(task)
+        if task.id >= self.next_id:
+            self.next_id = task.id + 1
+    
+    def remove(self, task_id: int) -> Optional[Task]:
+        """Remove a task by ID and return it."""
+        task = self.by_id.pop(task_id, None)
+        if task is not None:
+            self._unindex_status(task.status, task_id)
+            self._unindex_times(task)
+        return task
+    
+    def touch(self, task: Task, updated: int) -> None:
+        """Set a task's update time and keep the update-time index in order."""
+        self._unindex_times(task, "updated")
+        task.updated = updated
+        self._index_times(task, "updated")
+    
+    def _index_status(self, status: str, task_id: int) -> None:
+        bucket = self.by_status.setdefault(status, [])
+        if not bucket or bucket[-1] < task_id:
+            bucket.append(task_id)
+        else:
+            bisect.insort(bucket, task_id)
     
-    def __init__(self, data_file: str = "tasks.json"):
-        """Initialize the TaskTracker with a JSON file for data storage."""
+    def _unindex_status(self, status: str, task_id: int) -> None:
+        bucket = self.by_status.get(status)
+        if not bucket:
+            return
+        position = bisect.bisect_left(bucket, task_id)
+        if position < len(bucket) and bucket[position] == task_id:
+            del bucket[position]
+    
+    def _sorted_by(self, field: str) -> List[Tuple[int, int]]:
+        index = self.time_index.get(field)
+        if index is None:
+            index = sorted((getattr(task, field), task.id) for task in self.by_id.values())
+            self.time_index[field] = index
+        return index
+    
+    def _index_times(self, task: Task, *fields: str) -> None:
+        for field in fields or list(self.time_index):
+            index = self.time_index.get(field)
+            if index is not None:
+                bisect.insort(index, (getattr(task, field), task.id))
+    
+    def _unindex_times(self, task: Task, *fields: str) -> None:
+        for field in fields or list(self.time_index):
+            index = self.time_index.get(field)
+            if index is None:
+                continue
+            entry = (getattr(task, field), task.id)
+            position = bisect.bisect_left(index, entry)
+            if position < len(index) and index[position] == entry:
+                del index[position]
+    
+    def set_status(self, task: Task, status: str) -> None:
+        """Change a task's status and move it to the matching bucket."""
+        self._unindex_status(task.status, task.id)
+        task.status = status
+        self._index_status(status, task.id)
+    
+    def with_status(self, status: str) -> List[Task]:
+        """Return the tasks in one status bucket, in ID order."""
+        return [self.by_id[task_id] for task_id in self.by_status.get(status, [])]
+    
+    def count(self, status: Optional[str] = None) -> int:
+        """Count all tasks, or the tasks with one status."""
+        return len(self.by_status.get(status, [])) if status else len(self.by_id)
+    
+    def page(self, status: Optional[str] = None, sort: str = "id", descending: bool = False,
+             offset: int = 0, limit: Optional[int] = None) -> Iterator[Task]:
+        """
+        Yield one page of tasks, optionally filtered by status.
+        
+        Only ``offset + limit`` entries of the relevant index are walked, so
+        the first page of a huge store costs the same as that of a small one.
+        A status filter walks that status's bucket instead of the whole
+        store; sorted by a timestamp, the bucket's tasks are ranked with a
+        bounded heap. Ties on a timestamp are broken by ID in the same
+        direction.
+        """
+        stop = offset + limit if limit is not None else None
+        if status:
+            bucket = self.by_status.get(status, [])
+            if sort == "id":
+                ids = reversed(bucket) if descending else iter(bucket)
+                return (self.by_id[task_id] for task_id in islice(ids, offset, stop))
+            tasks = (self.by_id[task_id] for task_id in bucket)
+            key = attrgetter(sort, "id")
+            if stop is None:
+                ranked = sorted(tasks, key=key, reverse=descending)
+            else:
+                ranked = (heapq.nlargest if descending else heapq.nsmallest)(stop, tasks, key=key)
+            return iter(ranked[offset:])
+        
+        if sort != "id":
+            index = self._sorted_by(sort)
+            ids = (task_id for _, task_id in (reversed(index) if descending else index))
+        else:
+            ids = reversed(self.by_id) if descending else iter(self.by_id)
+        return (self.by_id[task_id] for task_id in islice(ids, offset, stop))
+
+
+class JsonStorage:
+    """Stores the whole task structure as a single JSON document."""
+    
+    def __init__(self, data_file: str, commit_window: Optional[float] = None):
         self.data_file = data_file
-        self.tasks = self._load_tasks()
+        if commit_window is None:
+            commit_window = float(os.environ.get("TASK_FSYNC_WINDOW", "0"))
+        self.committer = GroupCommitter(commit_window)
     
-    def _load_tasks(self) -> Dict[str, List[Dict]]:
+    def load(self) -> Dict[str, List[Dict]]:
         """Load tasks from JSON file or create empty structure if file doesn't exist."""
         try:
             if os.path.exists(self.data_file):
@@ -31,28 +291,589 @@ class TaskTracker:
             print(f"Error loading tasks: {e}")
             return {"tasks": []}
     
-    def _save_tasks(self) -> bool:
-        """Save tasks to JSON file."""
+    def open_store(self) -> TaskStore:
+        """Load the file and index it in memory, folding in a journal left by ``TASK_STORAGE=journal``."""
+        if os.path.exists(self.data_file + ".log"):
+            self._fold_journal()
+        return TaskStore.from_dict(self.load())
+    
+    def _fold_journal(self) -> None:
+        """
+        Compact a leftover operation log into the snapshot.
+        
+        This store never reads the log, so without this the logged changes
+        would be invisible, and switching back to the journal later would
+        replay them over newer data. If the log can't be folded in, the
+        store refuses to open.
+        """
+        journal = JournalStorage(self.data_file, commit_window=0)
+        if not journal.compact(journal.open_store()):
+            raise ValueError(f"Could not fold {journal.log_file} into {self.data_file}; "
+                             f"run 'compact' with TASK_STORAGE=journal first")
+    
+    def save(self, data: Dict[str, List[Dict]]) -> bool:
+        """Atomically replace the JSON file with ``data``."""
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as file:
-                json.dump(self.tasks, file, indent=2, ensure_ascii=False)
+            atomic_write(self.data_file, json.dumps(data, indent=2, ensure_ascii=False))
             return True
-        except IOError as e:
+        except (IOError, OSError) as e:
             print(f"Error saving tasks: {e}")
             return False
     
+    def write(self, op: str, task: Task, store: TaskStore) -> None:
+        """Stage a single operation. The plain JSON store has nothing to stage."""
+    
+    def commit(self, store: TaskStore) -> bool:
+        """Make staged operations durable. The plain JSON store rewrites the whole file."""
+        return self.committer.submit(self.data_file, lambda: self.save(store.to_dict()))
+    
+    def append(self, op: str, task: Task, store: TaskStore) -> bool:
+        """Persist a single operation."""
+        self.write(op, task, store)
+        return self.commit(store)
+    
+    def flush(self) -> bool:
+        """Run any write still waiting in the commit window."""
+        return self.committer.flush()
+    
+    def compact(self, store: TaskStore) -> bool:
+        """Nothing to compact for a plain JSON store."""
+        self.committer.flush()
+        return self.save(store.to_dict())
+
+
+class JournalStorage(JsonStorage):
+    """
+    Snapshot plus append-only operation log.
+    
+    Each mutation appends one JSON line ({"op": ..., "task": ...}) to
+    ``<data_file>.log`` so a write costs O(1) bytes regardless of store size.
+    The log is replayed on top of the snapshot at startup and folded back
+    into the snapshot every ``compact_every`` operations. Records carry the
+    full task, so replaying a log over a snapshot that already contains it is
+    harmless if a crash lands between the two steps of compaction.
+    
+    Appended records are fsynced through the group committer, so with a
+    commit window several commits share one fsync.
+    """
+    
+    COMPACT_EVERY = 1000
+    
+    def __init__(self, data_file: str, compact_every: int = COMPACT_EVERY,
+                 commit_window: Optional[float] = None):
+        super().__init__(data_file, commit_window)
+        self.log_file = data_file + ".log"
+        self.log = None
+        self.compact_every = compact_every
+        self.pending_ops = 0
+        self.staged: List[str] = []
+    
+    def open_store(self) -> TaskStore:
+        """Load the snapshot and log and index them in memory."""
+        return TaskStore.from_dict(self.load())
+    
+    def load(self) -> Dict[str, List[Dict]]:
+        """Load the snapshot and replay any logged operations on top of it."""
+        data = super().load()
+        if not os.path.exists(self.log_file):
+            return data
+        
+        by_id = {task["id"]: task for task in data["tasks"]}
+        next_id = data.get("nextId", 1)
+        try:
+            with open(self.log_file, 'r', encoding='utf-8') as log:
+                for line in log:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final record from an interrupted write; stop replaying
+                        break
+                    self.pending_ops += 1
+                    task = entry["task"]
+                    if entry["op"] == "delete":
+                        by_id.pop(task["id"], None)
+                    else:
+                        by_id[task["id"]] = task
+                    next_id = max(next_id, task["id"] + 1)
+        except IOError as e:
+            print(f"Error loading task journal: {e}")
+        
+        data["tasks"] = list(by_id.values())
+        data["nextId"] = next_id
+        return data
+    
+    def write(self, op: str, task: Task, store: TaskStore) -> None:
+        """Serialize one operation record for the next commit."""
+        record = {"op": op, "task": {"id": task.id} if op == "delete" else task.to_dict()}
+        self.staged.append(json.dumps(record, ensure_ascii=False) + "\n")
+    
+    def commit(self, store: TaskStore) -> bool:
+        """Append staged records to the log in one write, compacting when it grows too long."""
+        staged, self.staged = self.staged, []
+        if not staged:
+            return True
+        try:
+            if self.log is None:
+                self.log = open(self.log_file, 'a', encoding='utf-8')
+            self.log.write("".join(staged))
+            self.log.flush()
+        except IOError as e:
+            print(f"Error writing task journal: {e}")
+            return False
+        
+        self.pending_ops += len(staged)
+        if self.pending_ops >= self.compact_every:
+            return self.compact(store)
+        return self.committer.submit(self.log_file, self._sync_log)
+    
+    def _sync_log(self) -> bool:
+        """fsync everything appended to the log so far."""
+        try:
+            if self.log is not None:
+                os.fsync(self.log.fileno())
+            return True
+        except OSError as e:
+            print(f"Error syncing task journal: {e}")
+            return False
+    
+    def compact(self, store: TaskStore) -> bool:
+        """Write a fresh snapshot and truncate the operation log."""
+        self.staged = []
+        self.committer.flush()
+        if not self.save(store.to_dict()):
+            return False
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+        try:
+            if os.path.exists(self.log_file):
+                os.remove(self.log_file)
+        except OSError as e:
+            print(f"Error truncating task journal: {e}")
+            return False
+        self.pending_ops = 0
+        return True
+
+
+class SqliteTaskStore:
+    """
+    Task collection backed by a SQLite table.
+    
+    Offers the same read interface as ``TaskStore`` but answers each query
+    with SQL, so only the rows a command needs are read. Writes are issued by
+    ``SqliteStorage.append``; the mutators here only update the task record.
+    """
+    
+    COLUMNS = ("id", "description", "status", "createdAt", "updatedAt")
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+    
+    def _rows(self, sql: str, params: tuple = ()):
+        for row in self.conn.execute(sql, params):
+            yield Task.from_dict(dict(zip(self.COLUMNS, row)))
+    
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+    
+    def __iter__(self):
+        return self._rows("SELECT id, description, status, createdAt, updatedAt FROM tasks ORDER BY id")
+    
+    def allocate_id(self) -> int:
+        """Hand out the next task ID from the meta table."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'nextId'").fetchone()
+        task_id = row[0] if row else 1
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('nextId', ?)", (task_id + 1,))
+        return task_id
+    
+    def get(self, task_id: int) -> Optional[Task]:
+        """Find a task by its ID."""
+        rows = list(self._rows(
+            "SELECT id, description, status, createdAt, updatedAt FROM tasks WHERE id = ?", (task_id,)))
+        return rows[0] if rows else None
+    
+    def add(self, task: Task) -> None:
+        """Rows are inserted when the operation is persisted."""
+    
+    def remove(self, task_id: int) -> Optional[Task]:
+        """Rows are deleted when the operation is persisted."""
+        return self.get(task_id)
+    
+    def set_status(self, task: Task, status: str) -> None:
+        """Change a task's status; the row is updated when persisted."""
+        task.status = status
+    
+    def touch(self, task: Task, updated: int) -> None:
+        """Set a task's update time; the row is updated when persisted."""
+        task.updated = updated
+    
+    def with_status(self, status: str) -> List[Task]:
+        """Return the tasks with one status using the status index."""
+        return list(self._rows(
+            "SELECT id, description, status, createdAt, updatedAt FROM tasks WHERE status = ? ORDER BY id",
+            (status,)))
+    
+    def count(self, status: Optional[str] = None) -> int:
+        """Count all tasks, or the tasks with one status."""
+        if status:
+            return self.conn.execute("SELECT COUNT(*) FROM tasks WHERE status = ?", (status,)).fetchone()[0]
+        return len(self)
+    
+    def page(self, status: Optional[str] = None, sort: str = "id", descending: bool = False,
+             offset: int = 0, limit: Optional[int] = None) -> Iterator[Task]:
+        """Yield one page of tasks with ORDER BY/LIMIT/OFFSET pushed into SQL."""
+        where = "WHERE status = ? " if status else ""
+        params = (status,) if status else ()
+        direction = "DESC" if descending else "ASC"
+        order = f"{SORT_FIELDS[sort]} {direction}, id {direction}"
+        return self._rows(
+            f"SELECT id, description, status, createdAt, updatedAt FROM tasks {where}"
+            f"ORDER BY {order} LIMIT ? OFFSET ?",
+            params + (limit if limit is not None else -1, offset))
+
+
+class SqliteStorage:
+    """
+    Stores tasks in a SQLite database (``tasks.db`` next to ``tasks.json``).
+    
+    The database runs in WAL mode with indexes on ``status``, ``createdAt``
+    and ``updatedAt``; ``id`` is the primary key.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            status TEXT NOT NULL,
+            createdAt TEXT NOT NULL,
+            updatedAt TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status);
+        CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks (createdAt);
+        CREATE INDEX IF NOT EXISTS idx_tasks_updated ON tasks (updatedAt);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+    
+    def __init__(self, data_file: str):
+        self.data_file = data_file
+        self.db_file = os.path.splitext(data_file)[0] + ".db"
+        # The daemon serves clients from several threads, one command at a time
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.error: Optional[sqlite3.Error] = None
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+    
+    def open_store(self) -> SqliteTaskStore:
+        """Return a store that queries the database directly."""
+        return SqliteTaskStore(self.conn)
+    
+    def write(self, op: str, task: Task, store: SqliteTaskStore) -> None:
+        """Apply a single operation to the tasks table inside the open transaction."""
+        if self.error is not None:
+            return
+        try:
+            if op == "delete":
+                self.conn.execute("DELETE FROM tasks WHERE id = ?", (task.id,))
+            else:
+                row = task.to_dict()
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO tasks (id, description, status, createdAt, updatedAt) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    tuple(row[column] for column in SqliteTaskStore.COLUMNS))
+        except sqlite3.Error as e:
+            self.error = e
+    
+    def commit(self, store: SqliteTaskStore) -> bool:
+        """Commit the open transaction, or roll it back if any write failed."""
+        error, self.error = self.error, None
+        try:
+            if error is None:
+                self.conn.commit()
+                return True
+        except sqlite3.Error as e:
+            error = e
+        self.conn.rollback()
+        print(f"Error saving tasks: {error}")
+        return False
+    
+    def append(self, op: str, task: Task, store: SqliteTaskStore) -> bool:
+        """Write a single operation to the tasks table and commit it."""
+        self.write(op, task, store)
+        return self.commit(store)
+    
+    def flush(self) -> bool:
+        """Every commit is already durable."""
+        return True
+    
+    def compact(self, store: SqliteTaskStore) -> bool:
+        """Checkpoint the WAL into the main database file and reclaim free pages."""
+        try:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.conn.execute("VACUUM")
+            return True
+        except sqlite3.Error as e:
+            print(f"Error compacting task database: {e}")
+            return False
+    
+    def import_json(self, json_file: str) -> int:
+        """
+        Copy every task from a tasks.json file into the database and return the count.
+        
+        The file is read through the journal backend, so operations still
+        waiting in ``<json_file>.log`` are replayed rather than lost.
+        """
+        data = JournalStorage(json_file, commit_window=0).load()
+        tasks = data.get("tasks", [])
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO tasks (id, description, status, createdAt, updatedAt) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (tuple(task[column] for column in SqliteTaskStore.COLUMNS) for task in tasks))
+            highest = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM tasks").fetchone()[0]
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'nextId'").fetchone()
+            next_id = max(data.get("nextId", 1), highest + 1, row[0] if row else 1)
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('nextId', ?)", (next_id,))
+        return len(tasks)
+
+
+STORAGE_BACKENDS = {
+    "json": JsonStorage,
+    "journal": JournalStorage,
+    "sqlite": SqliteStorage,
+}
+
+Storage = Union[JsonStorage, SqliteStorage]
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+    """
+    Inverted index over task descriptions (token -> task IDs).
+    
+    The index lives next to the store as a snapshot (``<data_file>.idx``) and
+    an append-only delta log (``<data_file>.idx.log``). Every mutation appends
+    one delta with the task's new tokens, so keeping the index current never
+    requires loading it. ``load`` replays the log and checks each entry's
+    update time against the store; the index is rebuilt only if the two have
+    drifted apart (for example after a hand edit of tasks.json).
+    
+    Nothing is logged until the first search has built the snapshot.
+    """
+    
+    COMPACT_EVERY = 1000
+    
+    def __init__(self, data_file: str):
+        self.index_file = data_file + ".idx"
+        self.log_file = self.index_file + ".log"
+        self.postings: Dict[str, Set[int]] = {}
+        self.docs: Dict[int, Tuple[int, List[str]]] = {}
+        self.sorted_tokens: Optional[List[str]] = None
+        self.loaded = False
+        self.logged = 0
+        self.staged: List[str] = []
+    
+    def record(self, op: str, task: Task) -> None:
+        """Stage the index change for one task operation."""
+        tokens = [] if op == "delete" else sorted(set(tokenize(task.description)))
+        updated = None if op == "delete" else task.updated
+        if self.loaded:
+            self._apply(task.id, updated, tokens)
+        if self.loaded or os.path.exists(self.index_file):
+            self.staged.append(json.dumps([task.id, updated, tokens], ensure_ascii=False) + "\n")
+    
+    def commit(self) -> None:
+        """Append staged deltas to the index log."""
+        staged, self.staged = self.staged, []
+        if not staged:
+            return
+        try:
+            with open(self.log_file, 'a', encoding='utf-8') as log:
+                log.write("".join(staged))
+            self.logged += len(staged)
+        except IOError as e:
+            # A stale index is detected and rebuilt by the next search
+            print(f"Error writing search index: {e}")
+    
+    def _apply(self, task_id: int, updated: Optional[int], tokens: List[str]) -> None:
+        previous = self.docs.pop(task_id, None)
+        if previous is not None:
+            for token in previous[1]:
+                ids = self.postings.get(token)
+                if ids is not None:
+                    ids.discard(task_id)
+                    if not ids:
+                        del self.postings[token]
+                        self.sorted_tokens = None
+        if updated is None:
+            return
+        self.docs[task_id] = (updated, tokens)
+        for token in tokens:
+            ids = self.postings.get(token)
+            if ids is None:
+                self.postings[token] = ids = set()
+                self.sorted_tokens = None
+            ids.add(task_id)
+    
+    def load(self, store: TaskStore) -> None:
+        """Load the snapshot and delta log, rebuilding if they don't match ``store``."""
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as file:
+                for task_id, (updated, tokens) in json.load(file)["docs"].items():
+                    self._apply(int(task_id), updated, tokens)
+            if os.path.exists(self.log_file):
+                with open(self.log_file, 'r', encoding='utf-8') as log:
+                    for line in log:
+                        try:
+                            task_id, updated, tokens = json.loads(line)
+                        except ValueError:
+                            break
+                        self._apply(task_id, updated, tokens)
+                        self.logged += 1
+        except (IOError, ValueError, KeyError, TypeError):
+            self.docs = {}
+        
+        current = {task.id: task.updated for task in store}
+        if current != {task_id: doc[0] for task_id, doc in self.docs.items()}:
+            self.rebuild(store)
+        elif self.logged >= self.COMPACT_EVERY:
+            self.save()
+    
+    def rebuild(self, store: TaskStore) -> None:
+        """Re-tokenize every task and write a fresh snapshot."""
+        self.postings, self.docs, self.sorted_tokens = {}, {}, None
+        for task in store:
+            self._apply(task.id, task.updated, sorted(set(tokenize(task.description))))
+        self.save()
+    
+    def save(self) -> None:
+        """Write the snapshot atomically and truncate the delta log."""
+        payload = {"docs": {str(task_id): doc for task_id, doc in self.docs.items()}}
+        try:
+            atomic_write(self.index_file, json.dumps(payload, ensure_ascii=False))
+            if os.path.exists(self.log_file):
+                os.remove(self.log_file)
+            self.logged = 0
+        except OSError as e:
+            print(f"Error saving search index: {e}")
+    
+    def _match_term(self, term: str) -> Set[int]:
+        """IDs containing a token, or any token starting with ``term*``."""
+        if not term.endswith("*"):
+            tokens = tokenize(term)
+            if not tokens:
+                return set()
+            ids = set(self.postings.get(tokens[0], ()))
+            for token in tokens[1:]:
+                ids &= self.postings.get(token, set())
+            return ids
+        
+        prefix = term[:-1].lower()
+        if self.sorted_tokens is None:
+            self.sorted_tokens = sorted(self.postings)
+        ids: Set[int] = set()
+        position = bisect.bisect_left(self.sorted_tokens, prefix)
+        while position < len(self.sorted_tokens) and self.sorted_tokens[position].startswith(prefix):
+            ids |= self.postings[self.sorted_tokens[position]]
+            position += 1
+        return ids
+    
+    def query(self, query: str) -> Set[int]:
+        """
+        Return the IDs matching ``query``.
+        
+        Terms are ANDed; ``OR`` separates alternatives (AND binds tighter);
+        a trailing ``*`` matches any token with that prefix.
+        """
+        matches: Set[int] = set()
+        for group in re.split(r"\s+OR\s+", query.strip()):
+            terms = [term for term in group.split() if term != "AND"]
+            if not terms:
+                continue
+            ids = self._match_term(terms[0])
+            for term in terms[1:]:
+                if not ids:
+                    break
+                ids &= self._match_term(term)
+            matches |= ids
+        return matches
+
+
+def make_storage(data_file: str, backend: Optional[str] = None) -> Storage:
+    """Create the storage backend named by ``backend`` or the TASK_STORAGE env var."""
+    backend = (backend or os.environ.get("TASK_STORAGE", "json")).lower()
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend '{backend}'. "
+                         f"Must be one of: {', '.join(STORAGE_BACKENDS)}")
+    return STORAGE_BACKENDS[backend](data_file)
+
+
+class TaskTracker:
+    """Main class for managing tasks and CLI operations."""
+    
+    def __init__(self, data_file: str = "tasks.json", storage: Optional[Storage] = None):
+        """Initialize the TaskTracker with a storage backend (plain JSON file by default)."""
+        self.data_file = data_file
+        self.storage = storage or make_storage(data_file)
+        self.store = self._load_tasks()
+        self.search_index = SearchIndex(data_file)
+        self.batching = False
+    
+    def _load_tasks(self) -> TaskStore:
+        """Open the task collection through the configured storage backend."""
+        return self.storage.open_store()
+    
+    def _save_tasks(self, op: str, task: Task) -> bool:
+        """Persist a single add/update/delete/mark operation."""
+        self.search_index.record(op, task)
+        if self.batching:
+            self.storage.write(op, task, self.store)
+            return True
+        saved = self.storage.append(op, task, self.store)
+        self.search_index.commit()
+        return saved
+    
+    def begin_batch(self) -> None:
+        """Stage operations instead of saving after each one."""
+        self.batching = True
+    
+    def commit_batch(self) -> bool:
+        """Persist every operation staged since begin_batch() in a single save."""
+        self.batching = False
+        saved = self.storage.commit(self.store)
+        self.search_index.commit()
+        return saved
+    
+    def compact(self) -> bool:
+        """Fold any logged operations into a fresh snapshot."""
+        return self.storage.compact(self.store)
+    
+    def flush(self) -> bool:
+        """Write out anything still waiting in a group-commit window."""
+        return self.storage.flush()
+    
     def _get_next_id(self) -> int:
         """Get the next available task ID."""
-        if not self.tasks["tasks"]:
-            return 1
-        return max(task["id"] for task in self.tasks["tasks"]) + 1
+        return self.store.allocate_id()
     
-    def _find_task_by_id(self, task_id: int) -> Optional[Dict]:
+    def _find_task_by_id(self, task_id: int) -> Optional[Task]:
         """Find a task by its ID."""
-        for task in self.tasks["tasks"]:
-            if task["id"] == task_id:
-                return task
-        return None
+        return self.store.get(task_id)
     
     def add_task(self, description: str) -> bool:
         """Add a new task."""
@@ -60,18 +881,13 @@ class TaskTracker:
             print("Error: Task description cannot be empty.")
             return False
         
-        task = {
-            "id": self._get_next_id(),
-            "description": description.strip(),
-            "status": "todo",
-            "createdAt": datetime.now().isoformat(),
-            "updatedAt": datetime.now().isoformat()
-        }
+        now = Task.now()
+        task = Task(self._get_next_id(), description.strip(), "todo", now, now)
         
-        self.tasks["tasks"].append(task)
+        self.store.add(task)
         
-        if self._save_tasks():
-            print(f"Task added successfully (ID: {task['id']})")
+        if self._save_tasks("add", task):
+            print(f"Task added successfully (ID: {task.id})")
             return True
         else:
             print("Error: Failed to save task.")
@@ -88,10 +904,10 @@ class TaskTracker:
             print(f"Error: Task with ID {task_id} not found.")
             return False
         
-        task["description"] = new_description.strip()
-        task["updatedAt"] = datetime.now().isoformat()
+        task.description = new_description.strip()
+        self.store.touch(task, Task.now())
         
-        if self._save_tasks():
+        if self._save_tasks("update", task):
             print(f"Task {task_id} updated successfully.")
             return True
         else:
@@ -105,9 +921,9 @@ class TaskTracker:
             print(f"Error: Task with ID {task_id} not found.")
             return False
         
-        self.tasks["tasks"].remove(task)
+        self.store.remove(task_id)
         
-        if self._save_tasks():
+        if self._save_tasks("delete", task):
             print(f"Task {task_id} deleted successfully.")
             return True
         else:
@@ -116,9 +932,8 @@ class TaskTracker:
     
     def mark_task_status(self, task_id: int, status: str) -> bool:
         """Mark a task as in-progress or done."""
-        valid_statuses = ["todo", "in-progress", "done"]
-        if status not in valid_statuses:
-            print(f"Error: Invalid status. Must be one of: {', '.join(valid_statuses)}")
+        if status not in VALID_STATUSES:
+            print(f"Error: Invalid status. Must be one of: {', '.join(VALID_STATUSES)}")
             return False
         
         task = self._find_task_by_id(task_id)
@@ -126,46 +941,230 @@ class TaskTracker:
             print(f"Error: Task with ID {task_id} not found.")
             return False
         
-        old_status = task["status"]
-        task["status"] = status
-        task["updatedAt"] = datetime.now().isoformat()
+        old_status = task.status
+        self.store.set_status(task, status)
+        self.store.touch(task, Task.now())
         
-        if self._save_tasks():
+        if self._save_tasks("mark", task):
             print(f"Task {task_id} marked as {status} (was: {old_status}).")
             return True
         else:
             print("Error: Failed to save task status.")
             return False
     
-    def list_tasks(self, status_filter: Optional[str] = None) -> None:
-        """List all tasks or tasks filtered by status."""
-        if not self.tasks["tasks"]:
+    def list_tasks(self, status_filter: Optional[str] = None, limit: Optional[int] = None,
+                   offset: int = 0, sort: str = "id", descending: bool = False,
+                   fmt: str = "table") -> None:
+        """
+        List all tasks or tasks filtered by status, one page at a time.
+        
+        ``fmt`` is one of TABLE_FORMATS. Only the table gets the "No tasks
+        found" and total lines, so tsv, json and ndjson stay machine-readable.
+        """
+        if status_filter and status_filter not in VALID_STATUSES:
+            print(f"Error: Invalid status filter. Must be one of: {', '.join(VALID_STATUSES)}")
+            return
+        if sort not in SORT_FIELDS:
+            print(f"Error: Invalid sort field. Must be one of: {', '.join(SORT_FIELDS)}")
+            return
+        if fmt not in TABLE_FORMATS:
+            print(f"Error: Invalid format. Must be one of: {', '.join(TABLE_FORMATS)}")
+            return
+        
+        if fmt != "table":
+            write_chunked(render_task_table(self.store.page(status_filter, sort, descending, offset, limit),
+                                            fmt), sys.stdout)
+            return
+        if not self.store:
             print("No tasks found.")
             return
+        total = self.store.count(status_filter)
+        if status_filter and not total:
+            print(f"No tasks found with status: {status_filter}")
+            return
         
-        filtered_tasks = self.tasks["tasks"]
-        if status_filter:
-            valid_statuses = ["todo", "in-progress", "done"]
-            if status_filter not in valid_statuses:
-                print(f"Error: Invalid status filter. Must be one of: {', '.join(valid_statuses)}")
-                return
-            filtered_tasks = [task for task in self.tasks["tasks"] if task["status"] == status_filter]
-            
-            if not filtered_tasks:
-                print(f"No tasks found with status: {status_filter}")
-                return
+        # zip() stops before drawing from the counter once the page runs out
+        counter = count()
+        rows = (task for task, _ in zip(self.store.page(status_filter, sort, descending, offset, limit),
+                                        counter))
+        write_chunked(render_task_table(rows), sys.stdout)
+        shown = next(counter)
         
-        print(f"\n{'ID':<4} {'Status':<12} {'Description':<50} {'Created':<20} {'Updated':<20}")
-        print("-" * 110)
+        if limit is None and offset == 0:
+            print(f"\nTotal tasks: {total}")
+        elif shown:
+            print(f"\nShowing tasks {offset + 1}-{offset + shown} of {total}")
+        else:
+            print(f"\nNo tasks on this page (total tasks: {total})")
+    
+    def search_tasks(self, query: str) -> None:
+        """List tasks whose description matches a search query."""
+        if not query.strip():
+            print("Error: Search query cannot be empty.")
+            return
         
-        for task in filtered_tasks:
-            created = datetime.fromisoformat(task["createdAt"]).strftime("%Y-%m-%d %H:%M")
-            updated = datetime.fromisoformat(task["updatedAt"]).strftime("%Y-%m-%d %H:%M")
-            description = task["description"][:47] + "..." if len(task["description"]) > 47 else task["description"]
-            
-            print(f"{task['id']:<4} {task['status']:<12} {description:<50} {created:<20} {updated:<20}")
+        self.search_index.load(self.store)
+        task_ids = sorted(self.search_index.query(query))
+        if not task_ids:
+            print(f"No tasks found matching: {query}")
+            return
         
-        print(f"\nTotal tasks: {len(filtered_tasks)}")
+        matches = (task for task in map(self.store.get, task_ids) if task is not None)
+        write_chunked(render_task_table(matches), sys.stdout)
+        print(f"\nFound {len(task_ids)} tasks matching: {query}")
+
+
+def render_task_table(tasks: Iterable[Task], fmt: str = "table") -> Iterator[str]:
+    """Yield a task listing line by line in one of TABLE_FORMATS."""
+    if fmt in ("json", "ndjson"):
+        return render_records((task.to_dict() for task in tasks), fmt)
+    if fmt == "tsv":
+        return render_rows(TASK_HEADERS, ((task.id, task.status, tsv_cell(task.description),
+                                           micros_to_iso(task.created), micros_to_iso(task.updated))
+                                          for task in tasks))
+    rows = ((task.id, task.status,
+             task.description[:47] + "..." if len(task.description) > 47 else task.description,
+             format_timestamp(task.created), format_timestamp(task.updated))
+            for task in tasks)
+    return chain(("",), render_rows(TASK_HEADERS, rows, TASK_WIDTHS))
+
+
+def parse_list_args(args: List[str]) -> Dict:
+    """Parse 'list [status] [--limit N] [--offset N] [--sort id|created|updated] [--desc] [--format F]'."""
+    options = {"status_filter": None, "limit": None, "offset": 0, "sort": "id", "descending": False,
+               "fmt": "table"}
+    args = list(args)
+    while args:
+        arg = args.pop(0)
+        if arg in ("--limit", "--offset"):
+            value = args.pop(0) if args else ""
+            if not value.isdigit():
+                raise ValueError(f"{arg} requires a non-negative number")
+            value = int(value)
+            options[arg[2:]] = value
+        elif arg == "--sort":
+            if not args:
+                raise ValueError("--sort requires a field")
+            options["sort"] = args.pop(0).lower()
+        elif arg == "--desc":
+            options["descending"] = True
+        elif arg == "--format":
+            if not args:
+                raise ValueError("--format requires one of: " + ", ".join(TABLE_FORMATS))
+            options["fmt"] = args.pop(0).lower()
+        elif arg.startswith("--"):
+            raise ValueError(f"Unknown option '{arg}'")
+        else:
+            options["status_filter"] = arg
+    return options
+
+
+BATCH_COMMANDS = {
+    "add": "add",
+    "update": "update",
+    "delete": "delete",
+    "mark-in-progress": "in-progress",
+    "mark-done": "done",
+    "mark-todo": "todo",
+}
+
+
+def apply_operation(tracker: TaskTracker, operation: Dict) -> bool:
+    """Apply one {"op": add|update|mark|delete, ...} record to the tracker."""
+    op = str(operation.get("op", "")).lower()
+    if op not in ("add", "update", "mark", "delete"):
+        print(f"Error: Unknown operation '{op}'")
+        return False
+    try:
+        if op == "add":
+            return tracker.add_task(str(operation.get("description", "")))
+        task_id = int(operation["id"])
+    except (KeyError, TypeError, ValueError):
+        print("Error: Task ID must be a number.")
+        return False
+    
+    if op == "update":
+        return tracker.update_task(task_id, str(operation.get("description", "")))
+    elif op == "mark":
+        return tracker.mark_task_status(task_id, str(operation.get("status", "")))
+    return tracker.delete_task(task_id)
+
+
+def parse_batch_line(line: str) -> Dict:
+    """Turn a CLI-style line such as 'mark-done 3' into an operation record."""
+    args = shlex.split(line)
+    command = args[0].lower()
+    if command not in BATCH_COMMANDS:
+        return {"op": command}
+    if command == "add":
+        return {"op": "add", "description": " ".join(args[1:])}
+    operation = {"op": command, "id": args[1] if len(args) > 1 else None}
+    if command == "update":
+        operation["description"] = " ".join(args[2:])
+    elif command != "delete":
+        operation.update(op="mark", status=BATCH_COMMANDS[command])
+    return operation
+
+
+def read_operations(source: str, fmt: str) -> Iterator[Tuple[int, Optional[Dict]]]:
+    """
+    Yield (line number, operation) pairs from a file or stdin ('-').
+    
+    ``fmt`` is one of ndjson, csv or batch. Lines that cannot be parsed are
+    yielded with ``None`` so the caller can report them.
+    """
+    stream = sys.stdin if source == "-" else open(source, 'r', encoding='utf-8', newline='')
+    try:
+        if fmt == "csv":
+            for line_no, row in enumerate(csv.DictReader(stream), start=2):
+                yield line_no, {key: value for key, value in row.items() if value not in (None, "")}
+            return
+        
+        for line_no, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                operation = json.loads(line) if fmt == "ndjson" else parse_batch_line(line)
+            except ValueError:
+                operation = None
+            yield line_no, operation if isinstance(operation, dict) else None
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def run_operations(tracker: TaskTracker, operations: Iterable[Tuple[int, Optional[Dict]]]) -> bool:
+    """Apply many operations with a single save at the end and report throughput."""
+    applied = 0
+    errors = []
+    output = io.StringIO()
+    start = time.perf_counter()
+    
+    tracker.begin_batch()
+    for line_no, operation in operations:
+        if operation is None:
+            errors.append(f"line {line_no}: could not parse operation")
+            continue
+        with redirect_stdout(output):
+            ok = apply_operation(tracker, operation)
+        if ok:
+            applied += 1
+        else:
+            errors.append(f"line {line_no}: {output.getvalue().strip()}")
+        output.seek(0)
+        output.truncate()
+    saved = tracker.commit_batch()
+    
+    elapsed = time.perf_counter() - start
+    for error in errors:
+        print(error)
+    if not saved:
+        print("Error: Failed to save batch.")
+        return False
+    rate = applied / elapsed if elapsed > 0 else float(applied)
+    print(f"Applied {applied} operations ({len(errors)} failed) in {elapsed:.3f}s ({rate:,.0f} ops/sec)")
+    return not errors
 
 
 def print_usage():
@@ -182,87 +1181,167 @@ Commands:
   delete <id>                Delete a task
   mark-in-progress <id>      Mark a task as in progress
   mark-done <id>             Mark a task as done
-  list [status]              List all tasks or tasks by status
+  list [status] [options]    List all tasks or tasks by status
+      --limit N / --offset N   Show one page of tasks
+      --sort id|created|updated --desc
+                               Order of the listing (default: id, ascending)
+      --format table|tsv|json|ndjson
+                               Output format (default: table)
+  search <query>             Find tasks by words in their description
+                             (terms are ANDed, OR for alternatives,
+                             word* for prefix matches)
+  compact                    Fold the operation journal into tasks.json
+  migrate [json-file]        Import tasks.json into the SQLite store (tasks.db),
+                             replaying its operation journal first
+  import <file|-> [format]   Apply NDJSON or CSV operations in one save
+  batch <file|->             Apply CLI-style command lines in one save
+  serve                      Keep the task store loaded and serve commands
+                             over a local socket until stopped
+  stop                       Stop a running daemon
   help                       Show this help message
 
 Status values:
   todo, in-progress, done
 
+Storage:
+  Set TASK_STORAGE=journal to append each change to tasks.json.log
+  instead of rewriting tasks.json, or TASK_STORAGE=sqlite to keep
+  tasks in tasks.db (default: json).
+
 Examples:
   python task_cli.py add "Buy groceries"
   python task_cli.py update 1 "Buy groceries and cook dinner"
   python task_cli.py mark-done 1
   python task_cli.py list
   python task_cli.py list done
+  python task_cli.py list --sort updated --desc --limit 20
+  python task_cli.py list done --format ndjson > done.ndjson
+  python task_cli.py search "buy milk OR groc*"
+  python task_cli.py import ops.ndjson
+  cat commands.txt | python task_cli.py batch -
 """)
 
 
-def main():
-    """Main function to handle CLI arguments and execute commands."""
-    if len(sys.argv) < 2:
-        print_usage()
-        return
-    
-    command = sys.argv[1].lower()
-    tracker = TaskTracker()
+def run_command(tracker: TaskTracker, argv: List[str]) -> None:
+    """Execute one CLI command (``argv`` as in ``sys.argv``) against a tracker."""
+    command = argv[1].lower()
     
     try:
         if command == "add":
-            if len(sys.argv) < 3:
+            if len(argv) < 3:
                 print("Error: Task description is required.")
                 print("Usage: python task_cli.py add <description>")
                 return
-            description = " ".join(sys.argv[2:])
+            description = " ".join(argv[2:])
             tracker.add_task(description)
         
         elif command == "update":
-            if len(sys.argv) < 4:
+            if len(argv) < 4:
                 print("Error: Task ID and new description are required.")
                 print("Usage: python task_cli.py update <id> <description>")
                 return
             try:
-                task_id = int(sys.argv[2])
-                new_description = " ".join(sys.argv[3:])
+                task_id = int(argv[2])
+                new_description = " ".join(argv[3:])
                 tracker.update_task(task_id, new_description)
             except ValueError:
                 print("Error: Task ID must be a number.")
         
         elif command == "delete":
-            if len(sys.argv) < 3:
+            if len(argv) < 3:
                 print("Error: Task ID is required.")
                 print("Usage: python task_cli.py delete <id>")
                 return
             try:
-                task_id = int(sys.argv[2])
+                task_id = int(argv[2])
                 tracker.delete_task(task_id)
             except ValueError:
                 print("Error: Task ID must be a number.")
         
         elif command == "mark-in-progress":
-            if len(sys.argv) < 3:
+            if len(argv) < 3:
                 print("Error: Task ID is required.")
                 print("Usage: python task_cli.py mark-in-progress <id>")
                 return
             try:
-                task_id = int(sys.argv[2])
+                task_id = int(argv[2])
                 tracker.mark_task_status(task_id, "in-progress")
             except ValueError:
                 print("Error: Task ID must be a number.")
         
         elif command == "mark-done":
-            if len(sys.argv) < 3:
+            if len(argv) < 3:
                 print("Error: Task ID is required.")
                 print("Usage: python task_cli.py mark-done <id>")
                 return
             try:
-                task_id = int(sys.argv[2])
+                task_id = int(argv[2])
                 tracker.mark_task_status(task_id, "done")
             except ValueError:
                 print("Error: Task ID must be a number.")
         
         elif command == "list":
-            status_filter = sys.argv[2] if len(sys.argv) > 2 else None
-            tracker.list_tasks(status_filter)
+            try:
+                options = parse_list_args(argv[2:])
+            except ValueError as e:
+                print(f"Error: {e}")
+                print("Usage: python task_cli.py list [status] [--limit N] [--offset N] "
+                      "[--sort id|created|updated] [--desc] [--format table|tsv|json|ndjson]")
+                return
+            tracker.list_tasks(**options)
+        
+        elif command == "search":
+            if len(argv) < 3:
+                print("Error: Search query is required.")
+                print("Usage: python task_cli.py search <query>")
+                return
+            tracker.search_tasks(" ".join(argv[2:]))
+        
+        elif command == "compact":
+            if tracker.compact():
+                print("Task store compacted successfully.")
+            else:
+                print("Error: Failed to compact task store.")
+        
+        elif command == "migrate":
+            json_file = argv[2] if len(argv) > 2 else "tasks.json"
+            if not os.path.exists(json_file):
+                print(f"Error: File '{json_file}' not found.")
+                return
+            storage = SqliteStorage(tracker.data_file)
+            count = storage.import_json(json_file)
+            print(f"Imported {count} tasks from {json_file} into {storage.db_file}")
+            print("Set TASK_STORAGE=sqlite to use it.")
+        
+        elif command == "import":
+            if len(argv) < 3:
+                print("Error: Source file is required.")
+                print("Usage: python task_cli.py import <file|-> [ndjson|csv]")
+                return
+            source = argv[2]
+            fmt = argv[3].lower() if len(argv) > 3 else (
+                "csv" if source.lower().endswith(".csv") else "ndjson")
+            if fmt not in ("ndjson", "csv"):
+                print("Error: Import format must be ndjson or csv.")
+                return
+            if source != "-" and not os.path.exists(source):
+                print(f"Error: File '{source}' not found.")
+                return
+            run_operations(tracker, read_operations(source, fmt))
+        
+        elif command == "batch":
+            if len(argv) < 3:
+                print("Error: Source file is required.")
+                print("Usage: python task_cli.py batch <file|->")
+                return
+            source = argv[2]
+            if source != "-" and not os.path.exists(source):
+                print(f"Error: File '{source}' not found.")
+                return
+            run_operations(tracker, read_operations(source, "batch"))
+        
+        elif command == "stop":
+            print("No task tracker daemon is running.")
         
         elif command in ["help", "--help", "-h"]:
             print_usage()
@@ -277,5 +1356,237 @@ def main():
         print(f"An unexpected error occurred: {e}")
 
 
+DAEMON_FILE_COMMANDS = ("import", "batch", "migrate")
+
+
+def default_data_file() -> str:
+    """Absolute path of the task store used by the CLI (tasks.json in the current directory)."""
+    return os.path.abspath("tasks.json")
+
+
+def socket_path(data_file: str) -> str:
+    """Unix socket the daemon for ``data_file`` listens on (override with TASK_SOCKET)."""
+    return os.environ.get("TASK_SOCKET", data_file + ".sock")
+
+
+@contextmanager
+def store_lock(data_file: str, blocking: bool = True):
+    """
+    Hold an exclusive lock on ``<data_file>.lock`` for the duration of the block.
+    
+    Yields whether the lock was acquired, which is always true when
+    ``blocking``. On platforms without ``fcntl`` no lock is taken.
+    """
+    if fcntl is None:
+        yield True
+        return
+    with open(data_file + ".lock", 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            acquired = True
+        except BlockingIOError:
+            acquired = False
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class DaemonClient:
+    """
+    Sends commands to a running ``task_cli.py serve`` daemon.
+    
+    One connection carries any number of newline-delimited JSON requests, so
+    a long-lived client pays the connect cost once.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.connect(path or socket_path(default_data_file()))
+        except OSError:
+            self.sock.close()
+            raise
+        self.reader = self.sock.makefile('rb')
+    
+    def request(self, argv: List[str], stdin: Optional[str] = None) -> str:
+        """Run one command (``argv`` as in ``sys.argv``) and return its output."""
+        request = {"argv": argv}
+        if stdin is not None:
+            request["stdin"] = stdin
+        try:
+            self.sock.sendall(json.dumps(request).encode('utf-8') + b"\n")
+            line = self.reader.readline()
+        except OSError:
+            line = b""
+        if not line:
+            return "Error: Lost connection to the task daemon.\n"
+        return json.loads(line)["output"]
+    
+    def run(self, *args: str) -> str:
+        """Convenience wrapper: ``client.run("add", "Buy milk")``."""
+        return self.request(["task_cli.py", *args])
+    
+    def close(self) -> None:
+        self.reader.close()
+        self.sock.close()
+
+
+def send_to_daemon(argv: List[str]) -> Optional[str]:
+    """Forward a command to the daemon if one is running; return None otherwise."""
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path(default_data_file())):
+        return None
+    try:
+        client = DaemonClient()
+    except OSError:
+        # Stale socket file from a daemon that did not shut down cleanly
+        return None
+    
+    argv = list(argv)
+    stdin = None
+    if len(argv) > 2 and argv[1].lower() in DAEMON_FILE_COMMANDS:
+        # The daemon runs elsewhere: send stdin along and make file paths absolute
+        if argv[2] == "-":
+            stdin = sys.stdin.read()
+        else:
+            argv[2] = os.path.abspath(argv[2])
+    try:
+        return client.request(argv, stdin)
+    finally:
+        client.close()
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    """Serves newline-delimited JSON command requests on one connection."""
+    
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                argv = [str(arg) for arg in request["argv"]]
+            except (ValueError, KeyError, TypeError):
+                output = "Error: Malformed request.\n"
+            else:
+                if len(argv) > 1 and argv[1].lower() == "stop":
+                    # Reply first: once the server shuts down the process may exit
+                    self._reply("Task tracker daemon stopped.\n")
+                    self.server.stop()
+                    return
+                output = self.server.execute(argv, request.get("stdin"))
+            self._reply(output)
+    
+    def _reply(self, output: str) -> None:
+        self.wfile.write(json.dumps({"output": output}).encode('utf-8') + b"\n")
+        self.wfile.flush()
+
+
+# Windows has no Unix domain sockets; serve() refuses to start there
+_UnixStreamServer = getattr(socketserver, "ThreadingUnixStreamServer", socketserver.ThreadingTCPServer)
+
+
+class TaskDaemon(_UnixStreamServer):
+    """Keeps one TaskTracker resident and runs client commands against it one at a time."""
+    
+    daemon_threads = True
+    
+    def __init__(self, path: str, tracker: TaskTracker):
+        self.path = path
+        self.tracker = tracker
+        self.command_lock = threading.Lock()
+        committer = getattr(tracker.storage, "committer", None)
+        if committer is not None:
+            # A commit window closes on a timer thread; keep it out of running commands
+            committer.guard = self.command_lock
+        super().__init__(path, DaemonHandler)
+    
+    def stop(self) -> None:
+        """Stop accepting clients; new CLI calls fall back to the store lock."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        threading.Thread(target=self.shutdown).start()
+    
+    def execute(self, argv: List[str], stdin: Optional[str] = None) -> str:
+        """Run one command and return everything it printed."""
+        output = io.StringIO()
+        with self.command_lock, redirect_stdout(output):
+            saved_stdin = sys.stdin
+            if stdin is not None:
+                sys.stdin = io.StringIO(stdin)
+            try:
+                run_command(self.tracker, argv)
+            finally:
+                sys.stdin = saved_stdin
+        return output.getvalue()
+
+
+def serve() -> None:
+    """Run the task tracker daemon until interrupted or sent 'stop'."""
+    if not hasattr(socket, "AF_UNIX"):
+        print("Error: Daemon mode requires Unix domain sockets.")
+        return
+    
+    data_file = default_data_file()
+    path = socket_path(data_file)
+    with store_lock(data_file, blocking=False) as acquired:
+        if not acquired:
+            print("Error: Another task tracker process is using this task store.")
+            return
+        if os.path.exists(path):
+            # We hold the store lock, so no live daemon owns this socket
+            os.remove(path)
+        
+        try:
+            tracker = TaskTracker(data_file)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        server = TaskDaemon(path, tracker)
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        print(f"Task tracker daemon listening on {path}")
+        print("Press Ctrl+C or run 'python task_cli.py stop' to exit.")
+        sys.stdout.flush()
+        try:
+            server.serve_forever(poll_interval=0.1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if os.path.exists(path):
+                os.remove(path)
+            tracker.flush()
+
+
+def main():
+    """Main function to handle CLI arguments and execute commands."""
+    if len(sys.argv) < 2:
+        print_usage()
+        return
+    
+    command = sys.argv[1].lower()
+    if command == "serve":
+        serve()
+        return
+    if command in ["help", "--help", "-h"]:
+        print_usage()
+        return
+    
+    # Hand the command to a running daemon; fall back to direct file access
+    response = send_to_daemon(sys.argv)
+    if response is not None:
+        sys.stdout.write(response)
+        return
+    
+    with store_lock(default_data_file()):
+        try:
+            tracker = TaskTracker(default_data_file())
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        run_command(tracker, sys.argv)
+        # Write out a commit window now; after the lock is released another process could overwrite it
+        tracker.flush()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,447 @@
+"""Tests for the Task Tracker CLI (run with ``python -m pytest``)."""
+
+import io
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from shared.durability import GroupCommitter
+
+from task_cli import (SORT_FIELDS, STORAGE_BACKENDS, DaemonClient, JournalStorage, SearchIndex, SqliteStorage,
+                      TASK_HEADERS, Task, TaskDaemon, TaskStore, TaskTracker, main, make_storage, parse_batch_line,
+                      read_operations, run_command, run_operations, send_to_daemon)
+
+
+SECOND = 1_000_000
+
+
+def snapshot(tracker):
+    """Map each task ID to its (description, status)."""
+    return {task.id: (task.description, task.status) for task in tracker.store}
+
+
+class BulkOperationsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="task-test-")
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+        return path
+    
+    def run_bulk(self, backend, source, fmt):
+        """Apply ``source`` with a fresh tracker; return (ok, output, reloaded tracker)."""
+        data_file = os.path.join(self.directory, f"{backend}-{fmt}.json")
+        tracker = TaskTracker(data_file, make_storage(data_file, backend))
+        saves = []
+        commit = tracker.storage.commit
+        tracker.storage.commit = lambda store: saves.append(store) or commit(store)
+        tracker.storage.append = lambda *args: self.fail("operation saved outside the batch")
+        with redirect_stdout(io.StringIO()) as output:
+            ok = run_operations(tracker, read_operations(source, fmt))
+        self.assertEqual(len(saves), 1)
+        return ok, output.getvalue(), TaskTracker(data_file, make_storage(data_file, backend))
+    
+    def test_ndjson_import_saves_once_per_backend(self):
+        source = self.write("ops.ndjson", "\n".join([
+            '{"op": "add", "description": "Buy milk"}',
+            '{"op": "add", "description": "Walk the dog"}',
+            '{"op": "update", "id": 1, "description": "Buy oat milk"}',
+            '{"op": "mark", "id": 1, "status": "done"}',
+            '{"op": "delete", "id": 2}',
+            'not json',
+            '{"op": "delete", "id": 9}',
+        ]) + "\n")
+        for backend in STORAGE_BACKENDS:
+            with self.subTest(backend=backend):
+                ok, output, reloaded = self.run_bulk(backend, source, "ndjson")
+                self.assertFalse(ok)
+                self.assertIn("line 6: could not parse operation", output)
+                self.assertIn("line 7: Error: Task with ID 9 not found.", output)
+                self.assertIn("Applied 5 operations (2 failed)", output)
+                self.assertEqual(snapshot(reloaded), {1: ("Buy oat milk", "done")})
+    
+    def test_csv_import(self):
+        source = self.write("ops.csv", "op,id,description,status\n"
+                                       "add,,Write report,\n"
+                                       "add,,Review PR,\n"
+                                       "mark,2,,in-progress\n"
+                                       "update,1,Write the report,\n")
+        ok, output, reloaded = self.run_bulk("json", source, "csv")
+        self.assertTrue(ok, output)
+        self.assertEqual(snapshot(reloaded), {1: ("Write the report", "todo"), 2: ("Review PR", "in-progress")})
+    
+    def test_batch_commands(self):
+        source = self.write("commands.txt", "\n".join([
+            'add "Buy milk"',
+            "# comments and blank lines are skipped",
+            "",
+            'add "Call mom"',
+            "mark-in-progress 1",
+            "mark-done 1",
+            'update 2 "Call mom tonight"',
+            "delete 3",
+            "frobnicate 1",
+        ]) + "\n")
+        ok, output, reloaded = self.run_bulk("journal", source, "batch")
+        self.assertFalse(ok)
+        self.assertIn("line 8: Error: Task with ID 3 not found.", output)
+        self.assertIn("line 9: Error: Unknown operation 'frobnicate'", output)
+        self.assertEqual(snapshot(reloaded), {1: ("Buy milk", "done"), 2: ("Call mom tonight", "todo")})
+    
+    def test_parse_batch_line(self):
+        self.assertEqual(parse_batch_line('update 3 "New text"'), {"op": "update", "id": "3", "description": "New text"})
+        self.assertEqual(parse_batch_line("mark-done 4"), {"op": "mark", "id": "4", "status": "done"})
+        self.assertEqual(parse_batch_line("delete 5"), {"op": "delete", "id": "5"})
+
+
+class ListFormatTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="task-test-")
+        data_file = os.path.join(self.directory, "tasks.json")
+        self.tracker = TaskTracker(data_file, make_storage(data_file, "json"))
+        with redirect_stdout(io.StringIO()):
+            self.tracker.add_task("Buy milk")
+            self.tracker.add_task("Call\tmom")
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def run_cli(self, *args):
+        # A StringIO is not a terminal, like a pipe or a redirected file
+        with redirect_stdout(io.StringIO()) as output:
+            run_command(self.tracker, ["task_cli.py", *args])
+        return output.getvalue()
+    
+    def test_piped_list_defaults_to_table(self):
+        output = self.run_cli("list")
+        self.assertEqual(output, self.run_cli("list", "--format", "table"))
+        self.assertRegex(output, r"\nID +Status +Description")
+        self.assertIn("\nTotal tasks: 2\n", output)
+        self.assertIn("\nShowing tasks 2-2 of 2\n", self.run_cli("list", "--offset", "1"))
+    
+    def test_piped_search_defaults_to_table(self):
+        output = self.run_cli("search", "milk")
+        self.assertRegex(output, r"\nID +Status +Description")
+        self.assertIn("Found 1 tasks matching: milk", output)
+    
+    def test_tsv(self):
+        lines = self.run_cli("list", "--format", "tsv").splitlines()
+        self.assertEqual(lines[0].split("\t"), list(TASK_HEADERS))
+        self.assertEqual([line.split("\t")[:3] for line in lines[1:]], [["1", "todo", "Buy milk"],
+                                                                        ["2", "todo", "Call mom"]])
+    
+    def test_json_and_ndjson(self):
+        tasks = json.loads(self.run_cli("list", "--format", "json"))
+        self.assertEqual([(task["id"], task["description"]) for task in tasks], [(1, "Buy milk"), (2, "Call\tmom")])
+        lines = self.run_cli("list", "todo", "--format", "ndjson").splitlines()
+        self.assertEqual([json.loads(line) for line in lines], tasks)
+    
+    def test_empty_listing(self):
+        self.assertEqual(self.run_cli("list", "done"), "No tasks found with status: done\n")
+        self.assertEqual(self.run_cli("list", "done", "--format", "tsv"), "\t".join(TASK_HEADERS) + "\n")
+        self.assertEqual(json.loads(self.run_cli("list", "done", "--format", "json")), [])
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="task-test-")
+        self.data_file = os.path.join(self.directory, "tasks.json")
+        self.tracker = self.open()
+        with redirect_stdout(io.StringIO()):
+            self.tracker.add_task("Buy milk")
+            self.tracker.add_task("Call mom")
+            self.tracker.search_tasks("milk")
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def open(self):
+        return TaskTracker(self.data_file, make_storage(self.data_file, "json"))
+    
+    def ids(self, tracker, query):
+        tracker.search_index.load(tracker.store)
+        return tracker.search_index.query(query)
+    
+    def assert_matches_rebuild(self, tracker):
+        """The incrementally maintained index equals one rebuilt from the store."""
+        rebuilt = SearchIndex(os.path.join(self.directory, "rebuilt.json"))
+        rebuilt.rebuild(tracker.store)
+        self.assertEqual(tracker.search_index.postings, rebuilt.postings)
+        self.assertEqual(tracker.search_index.docs, rebuilt.docs)
+    
+    def mutate(self, tracker):
+        with redirect_stdout(io.StringIO()):
+            tracker.add_task("Buy bread")
+            tracker.update_task(2, "Call dad")
+            tracker.delete_task(1)
+    
+    def test_add_update_delete_keep_index_current(self):
+        self.mutate(self.tracker)
+        self.assertEqual(self.ids(self.tracker, "buy"), {3})
+        self.assertEqual(self.ids(self.tracker, "mom"), set())
+        self.assertEqual(self.ids(self.tracker, "dad OR milk"), {2})
+        self.assert_matches_rebuild(self.tracker)
+    
+    def test_reload_replays_log_without_rebuilding(self):
+        self.mutate(self.tracker)
+        with open(self.tracker.search_index.log_file, encoding="utf-8") as log:
+            self.assertEqual(len(log.readlines()), 3)
+        
+        reloaded = self.open()
+        with mock.patch.object(SearchIndex, "rebuild", side_effect=AssertionError("index rebuilt")):
+            self.assertEqual(self.ids(reloaded, "b*"), {3})
+        self.assertEqual(reloaded.search_index.logged, 3)
+        self.assert_matches_rebuild(reloaded)
+    
+    def test_torn_log_line_is_ignored(self):
+        self.mutate(self.tracker)
+        with open(self.tracker.search_index.log_file, "a", encoding="utf-8") as log:
+            log.write('[4, 1')
+        
+        reloaded = self.open()
+        self.assertEqual(self.ids(reloaded, "bread"), {3})
+        self.assert_matches_rebuild(reloaded)
+    
+    def test_store_edited_behind_index_triggers_rebuild(self):
+        other = self.open()
+        other.search_index.index_file = os.path.join(self.directory, "elsewhere.idx")
+        self.mutate(other)
+        
+        reloaded = self.open()
+        self.assertEqual(self.ids(reloaded, "dad"), {2})
+        self.assertEqual(self.ids(reloaded, "milk"), set())
+        self.assert_matches_rebuild(reloaded)
+        self.assertFalse(os.path.exists(reloaded.search_index.log_file))
+    
+    def test_long_log_is_compacted_on_load(self):
+        self.mutate(self.tracker)
+        reloaded = self.open()
+        with mock.patch.object(SearchIndex, "COMPACT_EVERY", 3):
+            self.ids(reloaded, "buy")
+        self.assertFalse(os.path.exists(reloaded.search_index.log_file))
+        self.assertEqual(self.ids(self.open(), "buy"), {3})
+
+
+class GroupCommitterTest(unittest.TestCase):
+    def test_window_flush_waits_for_guard(self):
+        guard = threading.Lock()
+        committer = GroupCommitter(0.01, guard)
+        ran = []
+        with guard:
+            self.assertTrue(committer.submit("tasks.json", lambda: ran.append("first")))
+            committer.submit("tasks.json", lambda: ran.append("second"))
+            time.sleep(0.1)
+            self.assertEqual(ran, [])
+        deadline = time.monotonic() + 5
+        while not ran and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(ran, ["second"])
+    
+    def test_zero_window_writes_immediately(self):
+        committer = GroupCommitter(0)
+        self.assertFalse(committer.submit("tasks.json", lambda: False))
+        self.assertIsNone(committer.timer)
+
+
+class MainTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="task-test-")
+        self.cwd = os.getcwd()
+        os.chdir(self.directory)
+    
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def test_commit_window_is_written_before_the_store_lock_is_released(self):
+        environ = {"TASK_FSYNC_WINDOW": "60", "TASK_STORAGE": "json",
+                   "TASK_SOCKET": os.path.join(self.directory, "no-daemon.sock")}
+        with mock.patch.dict(os.environ, environ), redirect_stdout(io.StringIO()):
+            for description in ("Buy milk", "Walk the dog"):
+                with mock.patch("sys.argv", ["task_cli.py", "add", description]):
+                    main()
+        tracker = TaskTracker("tasks.json", make_storage("tasks.json", "json"))
+        self.assertEqual(snapshot(tracker), {1: ("Buy milk", "todo"), 2: ("Walk the dog", "todo")})
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "daemon mode needs Unix domain sockets")
+class DaemonTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="task-test-")
+        self.data_file = os.path.join(self.directory, "tasks.json")
+        self.path = self.data_file + ".sock"
+        self.server = TaskDaemon(self.path, TaskTracker(self.data_file))
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05})
+        self.thread.start()
+        self.client = DaemonClient(self.path)
+    
+    def tearDown(self):
+        self.client.close()
+        if self.thread.is_alive():
+            self.server.shutdown()
+        self.thread.join(5)
+        self.server.server_close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def test_round_trip_on_one_connection(self):
+        self.assertEqual(self.client.run("add", "Buy milk"), "Task added successfully (ID: 1)\n")
+        self.assertIn("marked as done", self.client.run("mark-done", "1"))
+        self.assertIn("Buy milk", self.client.run("list", "done"))
+        reloaded = TaskTracker(self.data_file)
+        self.assertEqual(snapshot(reloaded), {1: ("Buy milk", "done")})
+    
+    def test_commit_window_closes_under_command_lock(self):
+        self.server.tracker.storage.committer.window = 0.01
+        self.assertIs(self.server.tracker.storage.committer.guard, self.server.command_lock)
+        with self.server.command_lock:
+            self.server.tracker.add_task("Buy milk")
+            time.sleep(0.1)
+            self.assertFalse(os.path.exists(self.data_file))
+        deadline = time.monotonic() + 5
+        while not os.path.exists(self.data_file) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(snapshot(TaskTracker(self.data_file)), {1: ("Buy milk", "todo")})
+    
+    def test_stdin_is_forwarded(self):
+        output = self.client.request(["task_cli.py", "batch", "-"], stdin='add "First"\nadd "Second"\n')
+        self.assertIn("Applied 2 operations (0 failed)", output)
+        self.assertEqual(len(self.server.tracker.store), 2)
+    
+    def test_cli_forwards_to_running_daemon(self):
+        with mock.patch.dict(os.environ, {"TASK_SOCKET": self.path}):
+            self.assertEqual(send_to_daemon(["task_cli.py", "add", "From the CLI"]),
+                             "Task added successfully (ID: 1)\n")
+            self.assertEqual(self.client.run("stop"), "Task tracker daemon stopped.\n")
+            self.thread.join(5)
+            self.assertFalse(self.thread.is_alive())
+            self.assertFalse(os.path.exists(self.path))
+            # With the daemon gone the CLI falls back to opening the store itself
+            self.assertIsNone(send_to_daemon(["task_cli.py", "list"]))
+
+
+class TaskStorePageTest(unittest.TestCase):
+    def setUp(self):
+        self.store = TaskStore([Task(i, f"task {i}", "todo", i, i) for i in range(1, 101)])
+        for task_id in (90, 10, 50):
+            task = self.store.get(task_id)
+            self.store.set_status(task, "done")
+            self.store.touch(task, 1000 - task_id)
+    
+    def test_status_page_follows_id_order(self):
+        ids = [task.id for task in self.store.page("done")]
+        self.assertEqual(ids, [10, 50, 90])
+        ids = [task.id for task in self.store.page("done", descending=True, offset=1, limit=1)]
+        self.assertEqual(ids, [50])
+    
+    def test_status_page_by_update_time(self):
+        ids = [task.id for task in self.store.page("done", sort="updated", limit=2)]
+        self.assertEqual(ids, [90, 50])
+        ids = [task.id for task in self.store.page("done", sort="updated", descending=True)]
+        self.assertEqual(ids, [10, 50, 90])
+    
+    def test_created_sort_matches_sqlite(self):
+        # Imported tasks: creation order differs from ID order, with ties
+        tasks = [Task(task_id, f"task {task_id}", "done" if task_id % 3 else "todo",
+                      SECOND * (task_id * 7 % 10), SECOND * (task_id % 4)) for task_id in range(1, 21)]
+        store = TaskStore(tasks)
+        directory = tempfile.mkdtemp(prefix="task-test-")
+        self.addCleanup(shutil.rmtree, directory, True)
+        storage = SqliteStorage(os.path.join(directory, "tasks.json"))
+        self.addCleanup(storage.conn.close)
+        for task in tasks:
+            storage.write("add", task, None)
+        self.assertTrue(storage.commit(None))
+        sqlite_store = storage.open_store()
+        
+        created = [task.id for task in store.page(sort="created")]
+        self.assertEqual(created, [task.id for task in sorted(tasks, key=lambda task: (task.created, task.id))])
+        for sort in SORT_FIELDS:
+            for status in (None, "done"):
+                for descending in (False, True):
+                    for offset, limit in ((0, None), (3, 5)):
+                        with self.subTest(sort=sort, status=status, descending=descending, offset=offset):
+                            args = (status, sort, descending, offset, limit)
+                            self.assertEqual([task.id for task in store.page(*args)],
+                                             [task.id for task in sqlite_store.page(*args)])
+    
+    def test_removed_task_leaves_bucket(self):
+        self.store.remove(50)
+        self.assertEqual([task.id for task in self.store.with_status("done")], [10, 90])
+        self.assertEqual(self.store.count("todo"), 97)
+
+
+class MigrateTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="task-test-")
+        self.data_file = os.path.join(self.directory, "tasks.json")
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def test_migrate_replays_uncompacted_journal(self):
+        tracker = TaskTracker(self.data_file, JournalStorage(self.data_file, commit_window=0))
+        for i in range(1, 4):
+            tracker.add_task(f"task {i}")
+        self.assertTrue(tracker.compact())
+        for i in range(4, 8):
+            tracker.add_task(f"task {i}")
+        tracker.delete_task(7)
+        tracker.mark_task_status(2, "done")
+        self.assertTrue(os.path.getsize(self.data_file + ".log") > 0)
+        
+        storage = SqliteStorage(self.data_file)
+        self.assertEqual(storage.import_json(self.data_file), 6)
+        migrated = TaskTracker(self.data_file, storage)
+        self.assertEqual([task.id for task in migrated.store], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(migrated.store.get(2).status, "done")
+        
+        # The deleted task's ID stays retired after the move
+        migrated.add_task("task 8")
+        self.assertIsNotNone(migrated.store.get(8))
+        storage.conn.close()
+    
+    def journaled_tracker(self):
+        tracker = TaskTracker(self.data_file, JournalStorage(self.data_file, commit_window=0))
+        with redirect_stdout(io.StringIO()):
+            tracker.add_task("task 1")
+            tracker.add_task("task 2")
+            tracker.compact()
+            tracker.add_task("task 3")
+            tracker.delete_task(1)
+        return tracker
+    
+    def test_switching_to_json_folds_journal(self):
+        self.journaled_tracker()
+        tracker = TaskTracker(self.data_file, make_storage(self.data_file, "json"))
+        self.assertEqual(snapshot(tracker), {2: ("task 2", "todo"), 3: ("task 3", "todo")})
+        self.assertFalse(os.path.exists(self.data_file + ".log"))
+        
+        # Going back to the journal must not replay the old log over newer changes
+        with redirect_stdout(io.StringIO()):
+            tracker.add_task("task 4")
+            tracker.delete_task(3)
+        reopened = TaskTracker(self.data_file, make_storage(self.data_file, "journal"))
+        self.assertEqual(snapshot(reopened), {2: ("task 2", "todo"), 4: ("task 4", "todo")})
+    
+    def test_switching_to_json_refuses_unfoldable_journal(self):
+        self.journaled_tracker()
+        with mock.patch.object(JournalStorage, "save", return_value=False):
+            with self.assertRaisesRegex(ValueError, "Could not fold"):
+                TaskTracker(self.data_file, make_storage(self.data_file, "json"))
+        self.assertTrue(os.path.exists(self.data_file + ".log"))
+
+
+if __name__ == "__main__":
+    unittest.main()
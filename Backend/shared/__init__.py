@@ -0,0 +1,6 @@
+"""
+Helpers shared by the Python CLI projects (Task Tracker, Expense Tracker, GitHub User Activity).
+
+Install the package once with ``pip install -e .`` from the ``Backend``
+directory; the scripts then import it like any other package.
+"""
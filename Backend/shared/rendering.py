@@ -0,0 +1,89 @@
+"""
+Buffered listing output shared by the Task Tracker and Expense Tracker.
+
+Rows are filled from one precompiled template, JSON is encoded in batches and
+lines are written in large chunks, so long listings cost a handful of
+``write`` calls instead of one ``print`` per row.
+"""
+
+import json
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+TABLE_FORMATS = ("table", "tsv", "json", "ndjson")
+_TSV_SAFE = str.maketrans("\t\r\n", "   ")
+
+
+def render_rows(headers: Tuple[str, ...], rows: Iterable[Tuple],
+                widths: Optional[Tuple[int, ...]] = None) -> Iterator[str]:
+    """
+    Yield a header and one line per row, each filled from one precompiled template.
+    
+    With ``widths`` cells are padded and a rule follows the header; without
+    them cells are tab-separated, so free-text cells should go through
+    ``tsv_cell`` first.
+    """
+    if widths is None:
+        template = "\t".join(["{}"] * len(headers))
+        yield template.format(*headers)
+    else:
+        template = " ".join(f"{{:<{width}}}" for width in widths)
+        yield template.format(*headers)
+        yield "-" * (sum(widths) + len(widths) - 1)
+    fill = template.format
+    for row in rows:
+        yield fill(*row)
+
+
+def tsv_cell(text: str) -> str:
+    """Replace tabs and newlines, which would break a TSV row, with spaces."""
+    return text if text.isprintable() else text.translate(_TSV_SAFE)
+
+
+def render_records(records: Iterable[Dict], fmt: str, batch_size: int = 1000) -> Iterator[str]:
+    """
+    Yield records as NDJSON lines, or as the pieces of one JSON array.
+    
+    For a JSON array ``batch_size`` records at a time go through a single
+    ``encode`` call, which keeps the loop inside the C encoder. Values JSON
+    cannot represent (dates, decimals) are written as strings.
+    """
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str).encode
+    if fmt == "ndjson":
+        yield from map(encode, records)
+        return
+    records = iter(records)
+    yield "["
+    separator = ""
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            break
+        yield separator + encode(batch)[1:-1]
+        separator = ","
+    yield "]"
+
+
+def write_chunked(lines: Iterable[str], stream, chunk_size: int = 2000) -> int:
+    """
+    Write lines to ``stream`` in chunks of ``chunk_size`` lines.
+    
+    Each chunk is joined into one string and handed to a single ``write``,
+    so a long listing costs a few large writes instead of one per line.
+    Returns the number of lines written.
+    """
+    written = 0
+    chunk: List[str] = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            written += len(chunk)
+            chunk.append("")
+            stream.write("\n".join(chunk))
+            chunk = []
+    if chunk:
+        written += len(chunk)
+        chunk.append("")
+        stream.write("\n".join(chunk))
+    stream.flush()
+    return written